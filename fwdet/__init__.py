@@ -0,0 +1,15 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+FwDET 2.1 in-memory engine (NumPy/GDAL, no QGIS)
+    see fwdet.engine.run_algo() for the main entry point
+    and python -m fwdet for the command line (cli.py)
+
+module level imports are NumPy and the standard library only. GDAL (raster_io)
+and SciPy (k-d tree and cost allocation) are imported inside the functions
+that need them, so importing the engine stays cheap (see tests/test_imports.py)
+'''
+
+__version__ = '2026.10.16'
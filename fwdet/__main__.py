@@ -0,0 +1,12 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+python -m fwdet (see cli.py)
+'''
+
+import sys
+from .cli import main
+
+sys.exit(main())
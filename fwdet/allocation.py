@@ -0,0 +1,407 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+nearest-boundary allocation (replaces grass7:r.grow.distance value=)
+
+each cell is assigned the value of its nearest boundary cell. only the allocated
+value is returned (no distance raster).
+
+metrics (FwDET.grow_metric_d)
+    euclidean, squared: exact linear-time EDT with nearest-feature indices
+        (Maurer et al. 2003, scipy.ndimage.distance_transform_edt). squared has
+        the same nearest cell as euclidean
+    manhattan, maximum: two-pass chamfer transform (exact for these metrics on
+        square cells). non-square cells use the jump flood below
+    geodesic: jump flood allocation (Rong and Tan 2006) with great-circle distances
+        between cell centres. only meaningful for geographic grids
+
+when only some cells need a value (e.g., those inside the inundation polygon),
+grow_cells queries a KD-tree of the boundary cells instead (BoundaryIndex)
+
+coarse-to-fine queries (BoundaryIndex.query w/ block, euclidean metrics): each
+block of cells is first allocated from its centre (boundary cell b). the cells
+closer to a boundary cell s than to b form a half-plane, so s can only be
+nearest to a cell of the block if it is at least as close as b to one of the
+block's corners. blocks where all these candidates hold values within tol of
+b's are resolved as a whole: every cell gets a value within tol of the exact
+one. the others (near the Voronoi edges and the shore) are refined at half the
+block size. tol=0 gives the exact values
+'''
+
+import numpy as np
+
+from .encoding import get_index_dtype
+
+grow_metrics = ('euclidean', 'squared', 'maximum', 'manhattan', 'geodesic')
+
+#fraction of the grid below which grow_cells uses the KD-tree (dense transforms are linear in the grid)
+kdtree_max_frac = 0.5
+
+#coarse-to-fine queries (BoundaryIndex.query w/ block): smallest block, and the share of the
+#cells a level must resolve to continue (otherwise the remaining cells are queried directly)
+coarse_block_min = 8
+coarse_resolved_min = 0.02
+
+
+def grow_boundary(boundary, grow_metric,
+                  cell_size=(1.0, 1.0),
+                  coords=None,
+                  feedback=None,
+                  ):
+    """assign each cell the value of its nearest boundary cell
+
+    Params
+    ---------
+    boundary: np.ndarray
+        boundary values (np.nan off the boundary)
+    grow_metric: str
+        see grow_metrics
+    cell_size: tuple
+        (dy, dx) sampling
+    coords: tuple, optional
+        (lat, lon) of the cell centres in degrees (one per row, one per column).
+        required for geodesic
+
+    Returns
+    ---------
+    np.ndarray
+        allocated boundary values (same dtype as boundary)
+    """
+    rows, cols = nearest_index(np.isnan(boundary), grow_metric, cell_size=cell_size, coords=coords,
+                               feedback=feedback)
+    return boundary[rows, cols]
+
+
+def grow_cells(bnd, rows, cols, grow_metric, **kwargs):
+    """value of the nearest boundary cell for the requested cells only
+
+    Params
+    ---------
+    bnd: BoundaryCells
+        boundary cells with valid values
+    rows, cols: np.ndarray
+        cells to allocate (e.g., those inside the inundation polygon)
+    kwargs:
+        see nearest_boundary
+
+    Returns
+    ---------
+    np.ndarray
+        allocated boundary values (same dtype as bnd.values)
+    """
+    return bnd.values[nearest_boundary(bnd, rows, cols, grow_metric, **kwargs)]
+
+
+def nearest_boundary(bnd, rows, cols, grow_metric,
+                     cell_size=(1.0, 1.0),
+                     coords=None,
+                     method=None,
+                     block=None,
+                     tol=0.0,
+                     feedback=None,
+                     ):
+    """position (in bnd) of the nearest boundary cell to each requested cell
+
+    Params
+    ---------
+    method: str, optional
+        'kdtree': batched nearest-neighbour queries of a BoundaryIndex
+        'transform': nearest_index on the full grid then sample
+        defaults to kdtree when the cells are less than kdtree_max_frac of the grid
+        (always kdtree w/ block)
+    block, tol: optional
+        coarse-to-fine kdtree queries. see BoundaryIndex.query
+
+    Returns
+    ---------
+    np.ndarray
+        positions (int32 unless bnd needs int64. see encoding.get_index_dtype)
+    """
+    if method is None:
+        method = 'kdtree' if (len(rows) < kdtree_max_frac * bnd.shape[0] * bnd.shape[1] or not block is None) \
+            else 'transform'
+
+    if not feedback is None:
+        feedback.pushDebugInfo(f'allocating {len(rows)} cells w/ {method}')
+
+    if method == 'kdtree':
+        return BoundaryIndex(bnd, grow_metric, cell_size=cell_size, coords=coords,
+                             feedback=feedback).query(rows, cols, block=block, tol=tol)
+
+    elif method == 'transform':
+        nodata_mask = np.ones(bnd.shape, dtype=bool)
+        nodata_mask[bnd.rows, bnd.cols] = False
+        near_r, near_c = nearest_index(nodata_mask, grow_metric, cell_size=cell_size, coords=coords,
+                                     feedback=feedback)
+        lin = bnd.lin
+        assert np.all(np.diff(lin) > 0), 'boundary cells must be sorted and unique'
+        return np.searchsorted(lin, near_r[rows, cols].astype(np.int64) * bnd.shape[1] + near_c[rows, cols]
+                               ).astype(get_index_dtype(len(bnd)))
+
+    else:
+        raise KeyError(f'unrecognized allocation method \'{method}\'')
+
+
+def nearest_index(nodata_mask, grow_metric,
+                  cell_size=(1.0, 1.0),
+                  coords=None,
+                  feedback=None,
+                  ):
+    """row and column of the nearest feature (False) cell for every cell
+
+    Returns
+    ---------
+    rows, cols: np.ndarray
+        int32 indexers
+    """
+    if not grow_metric in grow_metrics:
+        raise KeyError(f'unrecognized grow metric \'{grow_metric}\'. expected one of {grow_metrics}')
+
+    if nodata_mask.all():
+        raise AssertionError('no boundary cells left to grow. check the filter parameters')
+
+    dy, dx = cell_size
+    square = np.isclose(dy, dx)
+
+    #===========================================================================
+    # geodesic
+    #===========================================================================
+    if grow_metric == 'geodesic':
+        if coords is None:
+            if not feedback is None:
+                feedback.pushWarning('geodesic metric requires a geographic grid... using euclidean')
+            grow_metric = 'euclidean'
+        else:
+            return _jump_flood(nodata_mask, _get_chord_func(*coords))
+
+    #===========================================================================
+    # exact transforms
+    #===========================================================================
+    from scipy import ndimage
+
+    if grow_metric in ('euclidean', 'squared'):
+        indices = np.empty((2,) + nodata_mask.shape, dtype=np.int32)
+        ndimage.distance_transform_edt(nodata_mask, sampling=cell_size,
+                                       return_distances=False, return_indices=True, indices=indices)
+
+    elif square:
+        indices = ndimage.distance_transform_cdt(nodata_mask,
+                                                 metric={'manhattan': 'taxicab', 'maximum': 'chessboard'}[grow_metric],
+                                                 return_distances=False, return_indices=True)
+
+    else:
+        return _jump_flood(nodata_mask, _get_grid_func(grow_metric, dy, dx))
+
+    return indices[0], indices[1]
+
+
+#===============================================================================
+# jump flood----------
+#===============================================================================
+
+def _get_grid_func(grow_metric, dy, dx):
+    """distance on the grid between cells (r0, c0) and (r1, c1)"""
+    if grow_metric == 'manhattan':
+        return lambda r0, c0, r1, c1: np.abs(r1 - r0) * dy + np.abs(c1 - c0) * dx
+    elif grow_metric == 'maximum':
+        return lambda r0, c0, r1, c1: np.maximum(np.abs(r1 - r0) * dy, np.abs(c1 - c0) * dx)
+    else:
+        return lambda r0, c0, r1, c1: ((r1 - r0) * dy) ** 2 + ((c1 - c0) * dx) ** 2
+
+
+def _get_chord_func(lat_ar, lon_ar):
+    """squared chord length on the unit sphere (monotonic with great-circle distance)"""
+    lat, lon = np.radians(lat_ar), np.radians(lon_ar)
+    cos_lat, sin_lat = np.cos(lat), np.sin(lat)
+    cos_lon, sin_lon = np.cos(lon), np.sin(lon)
+
+    def func(r0, c0, r1, c1):
+        x = cos_lat[r0] * cos_lon[c0] - cos_lat[r1] * cos_lon[c1]
+        y = cos_lat[r0] * sin_lon[c0] - cos_lat[r1] * sin_lon[c1]
+        z = sin_lat[r0] - sin_lat[r1]
+        return x * x + y * y + z * z
+
+    return func
+
+
+def _jump_flood(nodata_mask, dist_func, extra_passes=2):
+    """nearest feature indices for an arbitrary metric by jump flooding
+
+    log2(n) vectorized passes with 8 neighbours at halving steps, followed by
+    extra_passes at steps 2 and 1 (JFA+2) to remove nearly all of the
+    (rare) misassignments of the plain algorithm"""
+    nrows, ncols = nodata_mask.shape
+
+    #initial seeds
+    row_ar, col_ar = np.indices(nodata_mask.shape, dtype=np.int32)
+    near_r = np.where(nodata_mask, -1, row_ar).astype(np.int32)
+    near_c = np.where(nodata_mask, -1, col_ar).astype(np.int32)
+    dist_ar = np.where(nodata_mask, np.inf, 0.0)
+
+    #step sequence
+    step = 1
+    while step * 2 < max(nrows, ncols):
+        step *= 2
+
+    steps = []
+    while step >= 1:
+        steps.append(step)
+        step //= 2
+    steps += [2, 1][-extra_passes:] if extra_passes else []
+
+    for step in steps:
+        for oy in (-step, 0, step):
+            for ox in (-step, 0, step):
+                if oy == 0 and ox == 0:
+                    continue
+
+                #destination and source windows of the shift
+                d_r = slice(max(0, -oy), nrows - max(0, oy))
+                d_c = slice(max(0, -ox), ncols - max(0, ox))
+                s_r = slice(max(0, oy), nrows - max(0, -oy))
+                s_c = slice(max(0, ox), ncols - max(0, -ox))
+
+                cand_r, cand_c = near_r[s_r, s_c], near_c[s_r, s_c]
+                valid = cand_r >= 0
+                if not valid.any():
+                    continue
+
+                cand_d = np.full(cand_r.shape, np.inf)
+                cand_d[valid] = dist_func(row_ar[d_r, d_c][valid], col_ar[d_r, d_c][valid],
+                                          cand_r[valid], cand_c[valid])
+
+                better = cand_d < dist_ar[d_r, d_c]
+                dist_ar[d_r, d_c][better] = cand_d[better]
+                near_r[d_r, d_c][better] = cand_r[better]
+                near_c[d_r, d_c][better] = cand_c[better]
+
+    return near_r, near_c
+
+
+#===============================================================================
+# boundary index----------
+#===============================================================================
+
+class BoundaryIndex(object):
+    """spatial index (KD-tree) over the boundary cell centres
+
+    answers nearest-boundary queries for any set of cells, so a window of the
+    grid can be allocated without the boundary cells outside of it (tiling)
+
+    Params
+    ---------
+    bnd: BoundaryCells
+        boundary cells with valid values
+    grow_metric: str
+        see grow_metrics
+    cell_size: tuple
+        (dy, dx)
+    coords: tuple, optional
+        (lat, lon) of the cell centres in degrees. required for geodesic
+    """
+
+    def __init__(self, bnd, grow_metric='euclidean',
+                 cell_size=(1.0, 1.0),
+                 coords=None,
+                 feedback=None,
+                 ):
+        from scipy.spatial import cKDTree
+
+        if not grow_metric in grow_metrics:
+            raise KeyError(f'unrecognized grow metric \'{grow_metric}\'. expected one of {grow_metrics}')
+
+        if len(bnd) == 0:
+            raise AssertionError('no boundary cells left to grow. check the filter parameters')
+
+        if grow_metric == 'geodesic' and coords is None:
+            if not feedback is None:
+                feedback.pushWarning('geodesic metric requires a geographic grid... using euclidean')
+            grow_metric = 'euclidean'
+
+        self.values = bnd.values
+        self.grow_metric, self.cell_size, self.coords = grow_metric, cell_size, coords
+        self.p = {'manhattan': 1, 'maximum': np.inf}.get(grow_metric, 2)
+
+        self.tree = cKDTree(self._get_points(bnd.rows, bnd.cols))
+
+    def _get_points(self, rows, cols):
+        if self.grow_metric == 'geodesic':
+            lat, lon = np.radians(self.coords[0][rows]), np.radians(self.coords[1][cols])
+            return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+        dy, dx = self.cell_size
+        return np.column_stack([rows * float(dy), cols * float(dx)])
+
+    def query(self, rows, cols, batch_size=2 ** 20, workers=1, block=None, tol=0.0):
+        """position (in bnd) of the nearest boundary cell to each (row, col)
+
+        Params
+        ---------
+        block: int, optional
+            coarse-to-fine: resolve blocks of block x block cells from their centres
+            first (see module help). euclidean and squared only
+        tol: float
+            w/ block, accept any boundary cell w/ a value within tol of the nearest
+            one's (0: exact values. ties between equal values may return either)
+        """
+        if not block is None and self.p == 2 and self.grow_metric != 'geodesic':
+            return self._query_coarse(np.asarray(rows), np.asarray(cols), block, tol,
+                                      batch_size=batch_size, workers=workers)
+
+        res_ar = np.empty(len(rows), dtype=get_index_dtype(len(self.values)))
+        for i in range(0, len(rows), batch_size):
+            j = i + batch_size
+            _, res_ar[i:j] = self.tree.query(self._get_points(rows[i:j], cols[i:j]), k=1, p=self.p,
+                                             workers=workers)
+        return res_ar
+
+    def _query_coarse(self, rows, cols, block, tol, **kwargs):
+        if block < coarse_block_min or len(rows) < 4:
+            return self.query(rows, cols, **kwargs)
+        workers = kwargs.get('workers', 1)
+        k = min(2 * block, 64, len(self.values))  #candidates per corner (about the block side on smooth shores)
+
+        #blocks holding requested cells
+        br, bc = rows // block, cols // block
+        ncb = int(bc.max()) + 1
+        block_lin = br.astype(np.int64) * ncb + bc
+        present = np.zeros(int(block_lin.max()) + 1, dtype=bool)
+        present[block_lin] = True
+        block_ar = np.flatnonzero(present)
+        inv = (np.cumsum(present) - 1)[block_lin]
+
+        #allocate the block centres (the coarse level)
+        r0, c0 = block_ar // ncb * block, block_ar % ncb * block
+        centre = (block - 1) / 2.0
+        _, idx_ar = self.tree.query(self._get_points(r0 + centre, c0 + centre), k=1, p=self.p, workers=workers)
+
+        #candidates: boundary cells at least as close as the centre's to a corner
+        corner_pts = self._get_points(np.column_stack([r0, r0, r0 + block - 1, r0 + block - 1]).ravel(),
+                                      np.column_stack([c0, c0 + block - 1, c0, c0 + block - 1]).ravel())
+        ref_ar = np.sqrt(((corner_pts - self.tree.data[np.repeat(idx_ar, 4)]) ** 2).sum(axis=1))
+        dist_ar, cand_ar = self.tree.query(corner_pts, k=k, p=self.p, workers=workers)
+        dist_ar, cand_ar = dist_ar.reshape(-1, k), cand_ar.reshape(-1, k)
+
+        limit = (ref_ar * (1 + 1e-9) + 1e-9)[:, None]
+        within = dist_ar <= limit
+        complete = (dist_ar[:, -1] > limit[:, 0]) | (k == len(self.values))
+
+        vals = self.values[cand_ar]
+        v0 = self.values[np.repeat(idx_ar, 4)][:, None]
+        spread = np.where(within, np.abs(vals - v0), 0.0).max(axis=1)
+        resolved = (complete & (spread <= tol)).reshape(-1, 4).all(axis=1)
+
+        #resolved blocks take their centre's allocation. refine the others
+        res_ar = idx_ar[inv].astype(get_index_dtype(len(self.values)))
+        refine = ~resolved[inv]
+        if refine.all() or refine.mean() > 1 - coarse_resolved_min:  #not worth refining (e.g., noisy shores)
+            return self.query(rows, cols, **kwargs)
+        if refine.any():
+            res_ar[refine] = self._query_coarse(rows[refine], cols[refine], block // 2, tol, **kwargs)
+        return res_ar
+
+    def allocate(self, rows, cols, **kwargs):
+        """value of the nearest boundary cell for each (row, col)"""
+        return self.values[self.query(rows, cols, **kwargs)]
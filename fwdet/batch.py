@@ -0,0 +1,241 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+multi-event batch: one DEM, many inundation layers
+
+the DEM is read once over the union extent of the events (replaces one
+gdal:cliprasterbyextent per event). the DEM-only products of CalculateBoundary
+(circular focal minimum for the ocean filter and slope) are computed once and
+shared by every event.
+'''
+
+import os
+import numpy as np
+
+from .focal import focal_min, slope_percent
+
+
+class DemProducts(object):
+    """DEM window and its event-independent derivatives
+
+    Params
+    ---------
+    dem_ar: np.ndarray
+        DEM (float32, np.nan for NoData)
+    meta_d: dict, optional
+        grid metadata of dem_ar. see raster_io.open_raster
+    neighborhood_size: int
+        size of the ocean filter minimum
+    slope_cell_size, grow_cell_size, grow_coords:
+        see engine.fwdet_array
+    cache: cache.DiskCache, optional
+        persist the derivatives across runs
+    dem_key: str, optional
+        identifies the DEM window in the cache (e.g., content hash + window). required with cache
+    """
+
+    def __init__(self, dem_ar,
+                 meta_d=None,
+                 neighborhood_size=5,
+                 slope_cell_size=(1.0, 1.0),
+                 grow_cell_size=(1.0, 1.0),
+                 grow_coords=None,
+                 cache=None,
+                 dem_key=None,
+                 feedback=None,
+                 ):
+        self.dem_ar, self.meta_d, self.neighborhood_size = dem_ar, meta_d, neighborhood_size
+        self.slope_cell_size, self.grow_cell_size, self.grow_coords = slope_cell_size, grow_cell_size, grow_coords
+
+        assert cache is None or not dem_key is None, 'dem_key required with cache'
+        self.cache, self.dem_key, self.feedback = cache, dem_key, feedback
+
+        self._dem_min_ar, self._slope_ar = None, None
+
+    @classmethod
+    def from_file(cls, dem_fp, extent=None, halo=0, scratch=None, cache=None, **kwargs):
+        """read the DEM (optionally only the window covering extent (xmin, xmax, ymin, ymax))
+
+        the window is read straight from the source (any GDAL raster, e.g., a VRT
+        mosaic) on its grid. see raster_io.get_extent_window
+
+        Params
+        ---------
+        halo: int
+            cells added around the extent window
+        scratch: scratch.ScratchStore, optional
+            read the DEM into a memory map of the store
+
+        with a cache, the DEM is identified by its content hash and the window"""
+        from . import raster_io
+        ds, meta_d = raster_io.open_raster(dem_fp)
+
+        window = (0, 0) + meta_d['shape'] if extent is None else raster_io.get_extent_window(meta_d, extent,
+                                                                                              halo=halo)
+        out = None if scratch is None else scratch.empty('dem', window[2:], dtype=np.float32)
+        dem_ar = raster_io.read_window(ds, *window, out=out)
+        ds = None
+
+        dem_key = None
+        if not cache is None:
+            dem_key = f'{cache.file_hash(dem_fp)}_{window}'
+
+        meta_d = raster_io.get_window_meta(meta_d, *window)
+        return cls(dem_ar, meta_d=meta_d, cache=cache, dem_key=dem_key,
+                   slope_cell_size=raster_io.get_cell_size(meta_d, ground=True),
+                   grow_cell_size=raster_io.get_cell_size(meta_d),
+                   grow_coords=raster_io.get_cell_coords(meta_d) if raster_io.is_geographic(meta_d) else None,
+                   **kwargs)
+
+    @property
+    def dem_min_ar(self):
+        """circular focal minimum (ocean filter). computed once"""
+        if self._dem_min_ar is None:
+            self._dem_min_ar = self._get(lambda: focal_min(self.dem_ar, size=self.neighborhood_size, circular=True),
+                                         product='focal_min', size=self.neighborhood_size, circular=True)
+        return self._dem_min_ar
+
+    @property
+    def slope_ar(self):
+        """slope (percent). computed once"""
+        if self._slope_ar is None:
+            self._slope_ar = self._get(lambda: slope_percent(self.dem_ar, self.slope_cell_size),
+                                       product='slope_percent', method='horn',
+                                       cell_size=self.slope_cell_size)
+        return self._slope_ar
+
+    def _get(self, func, **key_d):
+        if self.cache is None:
+            return func()
+        return self.cache.get_or_compute(self.cache.make_key(dem=self.dem_key, **key_d), func,
+                                         feedback=self.feedback)
+
+    def fwdet_array(self, inun_mask, line_mask, numIterations, slopeTH, **kwargs):
+        """engine.fwdet_array with the shared DEM products"""
+        from .engine import fwdet_array
+        return fwdet_array(self.dem_ar, inun_mask, line_mask, numIterations, slopeTH,
+                           slope_cell_size=self.slope_cell_size,
+                           grow_cell_size=self.grow_cell_size,
+                           grow_coords=self.grow_coords,
+                           neighborhood_size=self.neighborhood_size,
+                           dem_min_ar=self.dem_min_ar,
+                           slope_ar=self.slope_ar if slopeTH > 0.0 else None,
+                           **kwargs)
+
+
+def run_batch(dem_fp, inun_fp_l, numIterations, slopeTH, out_dir,
+              grow_metric='euclidean',
+              boundary_mode='polyline',
+              connectivity=8,
+              outputs=('water_depth',),
+              neighborhood_size=5,
+              continue_on_error=False,
+              cache_dir=None,
+              max_workers=None,
+              halo=0,
+              grow_block=None,
+              grow_tol=0.0,
+              cog_kwargs=None,
+              feedback=None,
+              ):
+    """FwDET on many inundation layers over one DEM
+
+    Params
+    ------------
+    inun_fp_l: list
+        inundation polygon vectors (or rasters). see engine.run_algo
+    out_dir: str
+        outputs are written as {out_dir}/{event name}_{output name}.tif
+    outputs: iterable
+        output names to write. see engine.OUTPUT_*
+    continue_on_error: bool
+        log failed events and continue (their result is None)
+    cache_dir: str, optional
+        persistent cache for the DEM products. see cache.DiskCache
+    max_workers: int, optional
+        run the events on a process pool w/ the DEM products in shared memory
+        (see parallel.run_events). failed events are logged (continue_on_error)
+    halo: int
+        cells added around the union extent of the events
+    grow_block, grow_tol: optional
+        coarse-to-fine allocation. see engine.fwdet_array
+    cog_kwargs: dict, optional
+        write Cloud-Optimized GeoTIFFs. see engine.run_algo
+
+    Returns
+    -----------
+    dict
+        {event name: {output name: filepath}}
+    """
+    from . import raster_io
+    from .engine import LogFeedback, get_cog_kwargs, output_decimals
+    from .cache import DiskCache
+    if feedback is None: feedback = LogFeedback()
+    assert len(inun_fp_l) > 0, 'no inundation layers passed'
+    os.makedirs(out_dir, exist_ok=True)
+
+    #===========================================================================
+    # shared DEM products (union extent)
+    #===========================================================================
+    extents = np.array([raster_io.get_vector_extent(fp) for fp in inun_fp_l])
+    extent = (extents[:, 0].min(), extents[:, 1].max(), extents[:, 2].min(), extents[:, 3].max())
+
+    feedback.pushInfo(f'loading DEM from {dem_fp} for {len(inun_fp_l)} events on {extent}')
+    prod = DemProducts.from_file(dem_fp, extent=extent, halo=halo, neighborhood_size=neighborhood_size,
+                                 cache=None if cache_dir is None else DiskCache(cache_dir), feedback=feedback)
+
+    #===========================================================================
+    # events
+    #===========================================================================
+    if not max_workers is None and max_workers > 1:
+        from .parallel import run_events
+        res_d = run_events(prod, inun_fp_l, numIterations, slopeTH, out_dir, outputs=outputs,
+                           max_workers=max_workers, cog_kwargs=cog_kwargs, feedback=feedback,
+                           grow_metric=grow_metric, boundary_mode=boundary_mode, connectivity=connectivity,
+                           grow_block=grow_block, grow_tol=grow_tol)
+        if not continue_on_error:
+            failed_l = [k for k, v in res_d.items() if v is None]
+            assert len(failed_l) == 0, f'{len(failed_l)} events failed: {failed_l}'
+        return res_d
+
+    res_d = dict()
+    for i, inun_fp in enumerate(inun_fp_l):
+        name = _get_event_name(inun_fp, res_d)
+        feedback.pushInfo(f'({i + 1}/{len(inun_fp_l)}) {name}')
+        if feedback.isCanceled():
+            break
+
+        ofp_d = {k: os.path.join(out_dir, f'{name}_{k}.tif') for k in outputs}
+        try:
+            inun_mask, line_mask = raster_io.read_inundation(inun_fp, prod.meta_d,
+                                                             lines=boundary_mode == 'polyline')
+
+            ar_d = prod.fwdet_array(inun_mask, line_mask, numIterations, slopeTH,
+                                    grow_metric=grow_metric, boundary_mode=boundary_mode,
+                                    grow_block=grow_block, grow_tol=grow_tol,
+                                    connectivity=connectivity, outputs=ofp_d.keys(), feedback=feedback)
+
+            for k, ofp in ofp_d.items():
+                raster_io.write_output(ar_d[k], ofp, prod.meta_d, cog_kwargs=get_cog_kwargs(cog_kwargs, k),
+                                       decimals=output_decimals)
+
+        except Exception as e:
+            if not continue_on_error:
+                raise
+            feedback.pushWarning(f'{name} failed w/\n    {e}')
+            ofp_d = None
+
+        res_d[name] = ofp_d
+
+    return res_d
+
+
+def _get_event_name(fp, res_d):
+    """unique name from the file name"""
+    name = os.path.splitext(os.path.basename(fp.partition('|')[0]))[0]
+    base, i = name, 1
+    while name in res_d:
+        name, i = f'{base}_{i}', i + 1
+    return name
@@ -0,0 +1,292 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+benchmark suite for the FwDET pipeline
+
+runs the pipeline (each stage recorded by report.RunReport) on
+    test cases: test_case/PeeDee and test_case/FtMac (file based, requires GDAL)
+    synthetic scenarios of increasing size (1e6 to 1e9 cells. see synthetic.py)
+over a grid of numIterations x slopeTH x grow_metric
+
+results are appended to a JSON lines file (one record per case x parameters x
+stage) tagged with the git commit, so runs can be compared across commits
+(see compare). scaling exponents per stage come from a log-log fit of the
+stage time against the grid size (see get_scaling).
+
+each case runs in a fresh process by default so its peak RSS is its own.
+synthetic sizes above ~1e8 cells need several GB of memory per case
+
+usage
+    python -m fwdet.bench --sizes 1e6 1e7 1e8 --ofp bench_results.jsonl
+    python -m fwdet.bench --compare <commit> <commit> --ofp bench_results.jsonl
+'''
+
+import os, sys, json, datetime, platform, subprocess, tempfile, itertools, importlib.util
+import numpy as np
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#file based cases {name: (dem, inundation)} in test_case/
+test_cases = {
+    'PeeDee': ('NEDelevation.tif', 'WaterExtent_fixed.geojson'),
+    'FtMac': ('bilinear.tif', 'flood.geojson'),
+}
+
+#default grids
+sizes_default = (1e6, 1e7)
+numIterations_default = (0, 3, 10)
+slopeTH_default = (0.0, 1.0)
+grow_metric_default = ('euclidean', 'manhattan')
+
+
+#===============================================================================
+# cases----------
+#===============================================================================
+
+def get_synthetic_shape(ncells):
+    """near square grid of about ncells"""
+    ncols = int(round(np.sqrt(ncells)))
+    return int(round(ncells / ncols)), ncols
+
+
+def get_test_case_fps(name):
+    dem_fn, inun_fn = test_cases[name]
+    return os.path.join(src_dir, 'test_case', name, dem_fn), os.path.join(src_dir, 'test_case', name, inun_fn)
+
+
+#===============================================================================
+# runners----------
+#===============================================================================
+
+def run_synthetic(ncells, numIterations, slopeTH, grow_metric, kind='valley', seed=0):
+    """one synthetic case (see synthetic.make_scenario). returns the run report dict
+
+    the depth error against the true depths is stored in the report meta (see synthetic.score)"""
+    from .engine import fwdet_array, OUTPUT_WSH
+    from .report import RunReport
+    from .synthetic import make_scenario, score
+
+    report = RunReport(case='synthetic', kind=kind, ncells=int(ncells), numIterations=numIterations,
+                       slopeTH=slopeTH, grow_metric=grow_metric)
+    with report.stage('generate', cells=int(ncells)):
+        d = make_scenario(get_synthetic_shape(ncells), kind=kind, seed=seed)
+
+    res_d = fwdet_array(d['dem'], d['inun_mask'], None, numIterations, slopeTH, grow_metric=grow_metric,
+                        boundary_mode='inner', outputs=[OUTPUT_WSH], report=report)
+
+    report.meta_d.update(score(res_d[OUTPUT_WSH], d['depth']))
+    return report.to_dict()
+
+
+def run_test_case(name, numIterations, slopeTH, grow_metric):
+    """one file based case (full run_algo incl. reads and writes). returns the run report dict"""
+    from .engine import run_algo, OUTPUT_WSH, OUTPUT_WSH_SMOOTH
+    dem_fp, inun_fp = get_test_case_fps(name)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        report_fp = os.path.join(tmp_dir, 'report.json')
+        run_algo(dem_fp, inun_fp, numIterations, slopeTH, grow_metric=grow_metric,
+                 ofp_d={k: os.path.join(tmp_dir, f'{k}.tif') for k in (OUTPUT_WSH, OUTPUT_WSH_SMOOTH)},
+                 report_fp=report_fp)
+        with open(report_fp, 'r') as f:
+            d = json.load(f)
+
+    d['meta'].update(case=name, ncells=sum(rec['cells'] for rec in d['stages'] if rec['name'] == 'clip'))
+    return d
+
+
+def run_suite(ofp='bench_results.jsonl',
+              sizes=sizes_default,
+              cases=tuple(test_cases.keys()),
+              numIterations_l=numIterations_default,
+              slopeTH_l=slopeTH_default,
+              grow_metric_l=grow_metric_default,
+              isolate=True,
+              feedback=None,
+              ):
+    """run the benchmark grid and append the records to ofp
+
+    Params
+    ------------
+    sizes: iterable
+        synthetic grid sizes (cells)
+    cases: iterable
+        test cases to include (see test_cases). skipped w/ a warning if GDAL is missing
+    isolate: bool
+        run each case in a fresh process (separate peak RSS)
+
+    Returns
+    -----------
+    list
+        records written
+    """
+    from .engine import LogFeedback
+    if feedback is None: feedback = LogFeedback()
+
+    if len(cases) > 0:
+        if importlib.util.find_spec('osgeo') is None:
+            feedback.pushWarning(f'GDAL not available... skipping test cases {list(cases)}')
+            cases = tuple()
+
+    jobs = [(run_test_case, (name,)) for name in cases] + [(run_synthetic, (n,)) for n in sizes]
+    params_l = list(itertools.product(numIterations_l, slopeTH_l, grow_metric_l))
+
+    run_d = dict(commit=get_commit(), timestamp=datetime.datetime.now().isoformat(),
+                 host=platform.node(), cpu_count=os.cpu_count())
+
+    res_l = list()
+    for i, ((func, args), params) in enumerate(itertools.product(jobs, params_l)):
+        feedback.pushInfo(f'({i + 1}/{len(jobs) * len(params_l)}) {func.__name__}{args + params}')
+        report_d = _call(func, args + params, isolate)
+
+        rec_l = to_records(report_d, run_d)
+        _append(ofp, rec_l)
+        res_l.extend(rec_l)
+
+    feedback.pushInfo(f'wrote {len(res_l)} records to {ofp}')
+    return res_l
+
+
+def _call(func, args, isolate):
+    if not isolate:
+        return func(*args)
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(func, *args).result()
+
+
+#===============================================================================
+# results----------
+#===============================================================================
+
+def to_records(report_d, run_d):
+    """flat records (one per stage + one 'total') from a run report"""
+    meta_d = report_d['meta']
+    base_d = dict(run_d, case=meta_d['case'], ncells=meta_d['ncells'], numIterations=meta_d['numIterations'],
+                  slopeTH=meta_d['slopeTH'], grow_metric=meta_d['grow_metric'],
+                  rmse=meta_d.get('rmse', None), hit_rate=meta_d.get('hit_rate', None))
+
+    rec_l = list()
+    for rec in report_d['stages'] + [dict(name='total', wall_s=report_d['wall_s'], cpu_s=report_d['cpu_s'],
+                                         peak_rss=report_d['peak_rss'], cells=meta_d['ncells'])]:
+        cells = rec.get('cells', None)
+        rec_l.append(dict(base_d, stage=rec['name'], wall_s=rec['wall_s'], cpu_s=rec['cpu_s'],
+                          peak_rss=rec['peak_rss'], cells=cells,
+                          cells_per_s=None if (cells is None or rec['wall_s'] <= 0) else cells / rec['wall_s']))
+    return rec_l
+
+
+def load(fp):
+    with open(fp, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _append(ofp, rec_l):
+    with open(ofp, 'a') as f:
+        for rec in rec_l:
+            f.write(json.dumps(rec) + '\n')
+
+
+def _get_key(rec):
+    return (rec['case'], rec['ncells'], rec['numIterations'], rec['slopeTH'], rec['grow_metric'], rec['stage'])
+
+
+def compare(rec_l, base_commit, new_commit, stat='wall_s'):
+    """ratio new/base of a statistic per (case, ncells, parameters, stage)
+
+    repeated runs of a commit are reduced to their minimum
+
+    Returns
+    -----------
+    dict
+        {key: (base, new, new/base)}
+    """
+    d = {base_commit: dict(), new_commit: dict()}
+    for rec in rec_l:
+        if rec['commit'] in d and not rec[stat] is None:
+            k = _get_key(rec)
+            d[rec['commit']][k] = min(rec[stat], d[rec['commit']].get(k, np.inf))
+
+    return {k: (v, d[new_commit][k], d[new_commit][k] / v if v > 0 else np.nan)
+            for k, v in d[base_commit].items() if k in d[new_commit]}
+
+
+def get_scaling(rec_l, commit=None, stat='wall_s'):
+    """scaling exponent of each stage over the synthetic sizes (log-log slope of stat vs cells)
+
+    1.0 is linear. stages are compared at the same parameters
+
+    Returns
+    -----------
+    dict
+        {(numIterations, slopeTH, grow_metric, stage): exponent}
+    """
+    group_d = dict()
+    for rec in rec_l:
+        if rec['case'] != 'synthetic' or (not commit is None and rec['commit'] != commit):
+            continue
+        if rec[stat] is None or rec[stat] <= 0:
+            continue
+        k = (rec['numIterations'], rec['slopeTH'], rec['grow_metric'], rec['stage'])
+        group_d.setdefault(k, dict())
+        group_d[k][rec['ncells']] = min(rec[stat], group_d[k].get(rec['ncells'], np.inf))
+
+    res_d = dict()
+    for k, d in group_d.items():
+        if len(d) < 2:
+            continue
+        x, y = np.log(list(d.keys())), np.log(list(d.values()))
+        res_d[k] = float(np.polyfit(x, y, 1)[0])
+    return res_d
+
+
+def get_commit():
+    """short hash of the checked out commit (None outside a git repository)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=src_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+#===============================================================================
+# command line----------
+#===============================================================================
+
+def main(argv=None):
+    import argparse, logging
+    from .engine import LogFeedback
+    parser = argparse.ArgumentParser(prog='python -m fwdet.bench', description=__doc__.split('\n\n')[1])
+    parser.add_argument('--ofp', default='bench_results.jsonl', help='JSON lines results file (appended)')
+    parser.add_argument('--sizes', type=float, nargs='*', default=sizes_default, help='synthetic sizes (cells)')
+    parser.add_argument('--cases', nargs='*', default=list(test_cases.keys()), help='test cases')
+    parser.add_argument('--iterations', type=int, nargs='+', default=numIterations_default)
+    parser.add_argument('--slope', type=float, nargs='+', default=slopeTH_default)
+    parser.add_argument('--grow-metric', nargs='+', default=grow_metric_default)
+    parser.add_argument('--no-isolate', action='store_true', help='run all cases in this process')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='compare two commits in ofp')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if not args.compare is None:
+        res_d = compare(load(args.ofp), *args.compare)
+        for k, (base, new, ratio) in sorted(res_d.items(), key=lambda kv: -kv[1][2]):
+            print(f'{str(k):<70}{base:>10.3f}{new:>10.3f}{ratio:>8.2f}')
+        return 0
+
+    rec_l = run_suite(ofp=args.ofp, sizes=[int(n) for n in args.sizes], cases=args.cases,
+                      numIterations_l=args.iterations, slopeTH_l=args.slope, grow_metric_l=args.grow_metric,
+                      isolate=not args.no_isolate, feedback=LogFeedback())
+
+    for k, v in sorted(get_scaling(rec_l).items()):
+        print(f'{str(k):<60} n^{v:.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+sparse shore/boundary cells
+
+the boundary is O(perimeter) while the DEM is O(area). every CalculateBoundary
+stage is re-masked to the boundary, so the smoothing, ocean filter and slope
+filter are evaluated only at the boundary cells by gathering from the DEM (or
+from the other boundary cells) with precomputed stencil offsets.
+'''
+
+import numpy as np
+
+from .focal import get_footprint, binary_dilate, binary_erode
+from .report import NullReport
+
+#how the shore line cells are found
+#    polyline: cells touched by the polygon rings (QGIS port, ArcPy)
+#    outer: dry cells next to the inundation (FwDET2p1_GEE.txt focal_max edge)
+#    inner: inundated cells next to a dry cell
+boundary_modes = ('polyline', 'outer', 'inner')
+
+
+class BoundaryCells(object):
+    """shore/boundary cells held as coordinate and value arrays
+
+    rows, cols: int32 (sorted row-major)
+    values: float32 (np.nan for NoData)
+    shape: (nrows, ncols) of the grid
+    """
+
+    __slots__ = ('rows', 'cols', 'values', 'shape')
+
+    def __init__(self, rows, cols, values, shape):
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.cols = np.asarray(cols, dtype=np.int32)
+        self.values = np.asarray(values, dtype=np.float32)
+        self.shape = tuple(shape)
+        assert len(self.rows) == len(self.cols) == len(self.values)
+
+    @classmethod
+    def from_mask(cls, line_mask, dem_ar):
+        """sample the DEM on the boundary mask"""
+        rows, cols = np.nonzero(line_mask)
+        return cls(rows, cols, dem_ar[rows, cols], line_mask.shape)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def lin(self):
+        """row-major linear index on the grid"""
+        return self.rows.astype(np.int64) * self.shape[1] + self.cols
+
+    def subset(self, sel):
+        return BoundaryCells(self.rows[sel], self.cols[sel], self.values[sel], self.shape)
+
+    def dropna(self):
+        return self.subset(~np.isnan(self.values))
+
+    def to_dense(self, fill=np.nan, dtype=np.float32):
+        ar = np.full(self.shape, fill, dtype=dtype)
+        ar[self.rows, self.cols] = self.values
+        return ar
+
+
+def mask_edge(inun_mask, side='outer', connectivity=8):
+    """morphological edge of the inundation mask (bool)
+
+    Params
+    ---------
+    side: str
+        'outer': dilation minus the mask. 'inner': the mask minus its erosion
+    connectivity: int
+        4 or 8 neighbours"""
+    if side == 'outer':
+        return binary_dilate(inun_mask, connectivity) & ~inun_mask
+    elif side == 'inner':
+        return inun_mask & ~binary_erode(inun_mask, connectivity)
+    else:
+        raise KeyError(f'unrecognized edge side \'{side}\'')
+
+
+#===============================================================================
+# stencils----------
+#===============================================================================
+
+def gather(ar, bnd, footprint, fill=np.nan):
+    """values of ar at each footprint offset from the boundary cells
+
+    Returns
+    ---------
+    np.ndarray
+        shape (len(footprint), len(bnd)). cells off the grid are fill
+    """
+    nrows, ncols = ar.shape
+    assert (nrows, ncols) == bnd.shape, 'grid mismatch'
+    flat_ar, lin = ar.ravel(), bnd.lin
+
+    res_ar = np.full((len(footprint), len(bnd)), fill, dtype=ar.dtype)
+    for k, (dy, dx) in enumerate(footprint):
+        inside = _get_inside(bnd, dy, dx)
+        res_ar[k, inside] = flat_ar[lin[inside] + (dy * ncols + dx)]
+
+    return res_ar
+
+
+def neighbour_table(bnd, footprint):
+    """position of each boundary cell's neighbours within bnd (-1 if not a boundary cell)
+
+    Returns
+    ---------
+    np.ndarray
+        int32, shape (len(footprint), len(bnd))
+    """
+    ncols = bnd.shape[1]
+    lin = bnd.lin
+    assert np.all(np.diff(lin) > 0), 'boundary cells must be sorted and unique'
+
+    nbr_ar = np.full((len(footprint), len(bnd)), -1, dtype=np.int32)
+    if len(bnd) == 0:
+        return nbr_ar
+
+    for k, (dy, dx) in enumerate(footprint):
+        inside = np.flatnonzero(_get_inside(bnd, dy, dx))
+        target = lin[inside] + (dy * ncols + dx)
+        pos = np.searchsorted(lin, target)
+        pos[pos == len(lin)] = 0
+        found = lin[pos] == target
+        nbr_ar[k, inside[found]] = pos[found]
+
+    return nbr_ar
+
+
+def _get_inside(bnd, dy, dx):
+    nrows, ncols = bnd.shape
+    return (bnd.rows + dy >= 0) & (bnd.rows + dy < nrows) & (bnd.cols + dx >= 0) & (bnd.cols + dx < ncols)
+
+
+#===============================================================================
+# boundary stages----------
+#===============================================================================
+
+def smooth(bnd, numIterations, size=5, report=None):
+    """numIterations of the NoData-aware rectangular mean over neighbouring boundary cells
+
+    sparse equivalent of focal.smooth_masked(boundary, line_mask, ...)
+
+    report: report.RunReport, optional
+        records the neighbour table and each iteration"""
+    if numIterations == 0:
+        return bnd
+    if report is None: report = NullReport()
+
+    with report.stage('smooth_table', cells=len(bnd)):
+        nbr_ar = neighbour_table(bnd, get_footprint(size))
+        has_nbr = nbr_ar >= 0
+        nbr_ar[~has_nbr] = 0
+
+    values = bnd.values.astype(np.float64)
+    for i in range(numIterations):
+        with report.stage(f'smooth_{i + 1}', cells=len(bnd)):
+            v_ar = values[nbr_ar]
+            valid = has_nbr & ~np.isnan(v_ar)
+            cnt = valid.sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = np.where(cnt > 0, np.where(valid, v_ar, 0.0).sum(axis=0) / cnt, np.nan)
+
+    return BoundaryCells(bnd.rows, bnd.cols, values, bnd.shape)
+
+
+def focal_min(dem_ar, bnd, size=5, circular=True):
+    """NoData-aware focal minimum of the DEM at the boundary cells"""
+    with np.errstate(invalid='ignore'):
+        v_ar = gather(dem_ar, bnd, get_footprint(size, circular=circular))
+        return np.fmin.reduce(v_ar, axis=0)
+
+
+def slope_percent(dem_ar, bnd, cell_size):
+    """Horn slope (percent rise) of the DEM at the boundary cells. see focal.slope_percent"""
+    dy, dx = cell_size
+    dx = np.asarray(dx, dtype=np.float64)
+    if dx.ndim == 1:  #one per row
+        dx = dx[bnd.rows]
+
+    a, b, c, d, _, f, g, h, i = gather(dem_ar, bnd, get_footprint(3)).astype(np.float64)
+
+    dzdx = ((c + 2 * f + i) - (a + 2 * d + g)) / (8.0 * dx)
+    dzdy = ((g + 2 * h + i) - (a + 2 * b + c)) / (8.0 * dy)
+
+    return (100.0 * np.sqrt(dzdx ** 2 + dzdy ** 2)).astype(np.float32)
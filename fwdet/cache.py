@@ -0,0 +1,171 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+persistent content-addressed cache for DEM derivatives
+
+entries are .npy files named by the hash of their key (DEM content hash, window,
+product, kernel and parameters). they are read back as memory maps so callers
+only touch the cells they sample (e.g., the boundary cells).
+
+concurrency
+    entries are written to a temporary file and renamed into place (atomic), so
+    readers never see a partial entry. two writers of the same key write the
+    same content; the last rename wins.
+
+eviction
+    least recently used first (file mtime is touched on every hit) once the
+    cache exceeds max_bytes. file hash memos count against the budget like entries
+'''
+
+import os, hashlib, json, tempfile
+import xml.etree.ElementTree as ET
+import numpy as np
+
+entry_suffixes = ('.npy', '.hash')
+
+
+class DiskCache(object):
+    """on-disk array cache with a size budget
+
+    Params
+    ---------
+    cache_dir: str
+        directory for the entries (created if needed)
+    max_bytes: int
+        size budget. least recently used entries are evicted past this
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 ** 32):
+        self.cache_dir, self.max_bytes = cache_dir, max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    #===========================================================================
+    # keys
+    #===========================================================================
+    @staticmethod
+    def make_key(**kwargs):
+        """hash of the key items (json serializable or arrays)"""
+        default = lambda o: o.tolist() if hasattr(o, 'tolist') else str(o)
+        return hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=default).encode()).hexdigest()
+
+    def file_hash(self, fp, chunk_size=2 ** 24):
+        """content hash of a file
+
+        memoized in the cache by (path, size, mtime) so unchanged files are only read once.
+        a VRT hash also covers its source files (edits to a tile change the key)"""
+        src_l = get_vrt_sources(fp) if fp.lower().endswith('.vrt') else list()
+        stat_l = list()
+        for p in [fp] + src_l:
+            st = os.stat(p)
+            stat_l.append((os.path.abspath(p), st.st_size, st.st_mtime_ns))
+        memo_fp = self._get_fp(self.make_key(stats=stat_l), suffix='.hash')
+        try:
+            with open(memo_fp, 'r') as f:
+                hexdigest = f.read()
+            os.utime(memo_fp)  #recently used
+            return hexdigest
+        except FileNotFoundError:
+            pass
+
+        h = hashlib.sha256()
+        with open(fp, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                h.update(chunk)
+
+        for src_fp in src_l:
+            h.update(self.file_hash(src_fp, chunk_size=chunk_size).encode())
+
+        self._write_atomic(memo_fp, lambda f: f.write(h.hexdigest().encode()))
+        self.evict()
+        return h.hexdigest()
+
+    #===========================================================================
+    # entries
+    #===========================================================================
+    def get(self, key):
+        """read-only memory map of the entry (or None)"""
+        fp = self._get_fp(key)
+        try:
+            ar = np.load(fp, mmap_mode='r')
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(fp)  #recently used
+        except OSError:
+            pass
+        return ar
+
+    def put(self, key, ar):
+        """store an array (atomic). returns the stored entry as a memory map"""
+        self._write_atomic(self._get_fp(key), lambda f: np.save(f, np.ascontiguousarray(ar)))
+        self.evict()
+        return self.get(key)
+
+    def get_or_compute(self, key, func, feedback=None):
+        """cached entry or func() (stored)"""
+        ar = self.get(key)
+        if ar is None:
+            ar = func()
+            stored = self.put(key, ar)
+            if not feedback is None:
+                feedback.pushDebugInfo(f'cached {ar.shape} entry {key[:12]}')
+            return ar if stored is None else stored
+
+        if not feedback is None:
+            feedback.pushDebugInfo(f'cache hit on {key[:12]}')
+        return ar
+
+    def evict(self):
+        """remove least recently used entries until under max_bytes"""
+        entries = list()
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(entry_suffixes):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:  #removed by another process
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+
+        total = sum(e[1] for e in entries)
+        for _, size, fp in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(fp)
+            except OSError:  #in use (windows) or already removed
+                continue
+            total -= size
+
+    def size(self):
+        """bytes held by the entries (and hash memos)"""
+        return sum(e.stat().st_size for e in os.scandir(self.cache_dir) if e.name.endswith(entry_suffixes))
+
+    def _get_fp(self, key, suffix='.npy'):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _write_atomic(self, fp, write_func):
+        fd, tmp_fp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_func(f)
+            os.replace(tmp_fp, fp)
+        except BaseException:
+            if os.path.exists(tmp_fp):
+                os.remove(tmp_fp)
+            raise
+
+
+def get_vrt_sources(fp):
+    """source files referenced by a VRT (in document order)"""
+    root_dir = os.path.dirname(os.path.abspath(fp))
+    src_l = list()
+    for elem in ET.parse(fp).iter('SourceFilename'):
+        src_fp = elem.text.strip()
+        if elem.get('relativeToVRT', '0') == '1':
+            src_fp = os.path.join(root_dir, src_fp)
+        if os.path.exists(src_fp) and not src_fp in src_l:  #skips /vsi paths
+            src_l.append(src_fp)
+    return src_l
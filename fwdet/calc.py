@@ -0,0 +1,173 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+fused raster calculator (replaces the gdal:rastercalculator chains of the QGIS port)
+
+a chain of steps is evaluated in one pass over row chunks: intermediate steps
+only exist for the current chunk and only the requested outputs are materialized.
+
+formulas use the gdal_calc syntax (NumPy expressions of the input names), e.g.
+    Calc([('diff', 'A - B'), ('wd', 'diff * (diff > 0) * (C == 1)')])
+
+NoData follows gdal:rastercalculator
+    cells where any referenced input (or step) is NoData are NoData
+    a step's NO_DATA value (e.g., 0) is read as NoData by the later steps
+'''
+
+import numpy as np
+
+#functions and constants available to the formulas
+funcs_d = {
+    'where': np.where, 'isnan': np.isnan, 'abs': np.abs, 'round': np.round,
+    'minimum': np.minimum, 'maximum': np.maximum, 'sqrt': np.sqrt,
+    'logical_and': np.logical_and, 'logical_or': np.logical_or, 'logical_not': np.logical_not,
+    'nan': np.nan,
+    }
+
+#default rows per chunk
+chunk_rows_default = 1024
+
+
+class Calc(object):
+    """chain of named raster expressions
+
+    Params
+    ---------
+    steps: list
+        (name, formula) or (name, formula, nodata) tuples evaluated in order.
+        formulas may reference the inputs, earlier steps, and funcs_d
+    """
+
+    def __init__(self, steps):
+        self.steps = list()
+        for step in steps:
+            name, formula, nodata = (tuple(step) + (None,))[:3]
+            code = compile(formula, f'<calc:{name}>', 'eval')
+            self.steps.append((name, formula, code, nodata))
+
+    def check(self, names, outputs):
+        """every formula only references known names and every output is produced"""
+        known = set(names) | set(funcs_d)
+        for name, formula, code, _ in self.steps:
+            missing = set(code.co_names) - known
+            if missing:
+                raise KeyError(f'step \'{name}\' ({formula}) references unknown names {missing}')
+            known.add(name)
+
+        for k in outputs:
+            if not k in known:
+                raise KeyError(f'requested output \'{k}\' is not an input or step')
+
+    def evaluate(self, chunk_d, outputs):
+        """evaluate the chain on one chunk
+
+        Params
+        ---------
+        chunk_d: dict
+            {input name: np.ndarray} (np.nan for NoData)
+        outputs: iterable
+            names to return
+
+        Returns
+        ---------
+        dict
+            {output name: np.ndarray}
+        """
+        ns = dict(funcs_d)
+        ns.update(chunk_d)
+        arrays = set(chunk_d)
+
+        for name, formula, code, nodata in self.steps:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                res_ar = np.asarray(eval(code, {'__builtins__': {}}, ns), dtype=np.float64)
+
+                #NoData of any referenced array
+                for k in set(code.co_names) & arrays:
+                    res_ar = np.where(np.isnan(ns[k]), np.nan, res_ar)
+
+                if not nodata is None:
+                    res_ar[res_ar == nodata] = np.nan
+
+            ns[name] = res_ar
+            arrays.add(name)
+
+        return {k: ns[k] for k in outputs}
+
+    def run(self, input_d, outputs,
+            chunk_rows=chunk_rows_default,
+            dtype=np.float32,
+            ):
+        """evaluate on whole arrays (or memory maps) in row chunks
+
+        Returns
+        ---------
+        dict
+            {output name: np.ndarray}
+        """
+        self.check(input_d.keys(), outputs)
+        shape = _get_shape([ar.shape for ar in input_d.values()])
+
+        res_d = {k: np.empty(shape, dtype=dtype) for k in outputs}
+        for r0 in range(0, shape[0], chunk_rows):
+            r1 = min(r0 + chunk_rows, shape[0])
+            chunk_res_d = self.evaluate({k: ar[r0:r1] for k, ar in input_d.items()}, outputs)
+            for k, ar in chunk_res_d.items():
+                res_d[k][r0:r1] = ar
+
+        return res_d
+
+    def run_files(self, fp_d, ofp_d,
+                  chunk_rows=chunk_rows_default,
+                  options=None,
+                  decimals=None,
+                  ):
+        """evaluate on rasters, reading and writing one row chunk at a time
+
+        Params
+        ---------
+        fp_d: dict
+            {input name: raster filepath} (band 1)
+        ofp_d: dict
+            {output name: filepath} of outputs to write
+        options: tuple, optional
+            GDAL creation options of the outputs (e.g., raster_io.scratch_options)
+        decimals: int, optional
+            round the outputs as they are written (no separate rounding pass)
+
+        Returns
+        ---------
+        dict
+            {output name: filepath}
+        """
+        from . import raster_io
+        self.check(fp_d.keys(), ofp_d.keys())
+
+        ds_d, meta_d = dict(), None
+        for k, fp in fp_d.items():
+            ds_d[k], meta_d_i = raster_io.open_raster(fp)
+            if meta_d is None: meta_d = meta_d_i
+            assert meta_d_i['shape'] == meta_d['shape'], f'grid mismatch on {fp}'
+
+        nrows, ncols = meta_d['shape']
+        kwargs = dict() if options is None else dict(options=options)
+        ods_d = {k: raster_io.create_raster(ofp, meta_d, **kwargs) for k, ofp in ofp_d.items()}
+
+        for r0 in range(0, nrows, chunk_rows):
+            n = min(chunk_rows, nrows - r0)
+            chunk_d = {k: raster_io.read_window(ds, r0, 0, n, ncols) for k, ds in ds_d.items()}
+            for k, ar in self.evaluate(chunk_d, ofp_d.keys()).items():
+                raster_io.write_window(ods_d[k], ar, r0, 0, decimals=decimals)
+
+        for ods in ods_d.values():
+            ods.FlushCache()
+        ods_d, ds_d = None, None
+
+        return dict(ofp_d)
+
+
+def _get_shape(shapes):
+    shapes = set(shapes)
+    assert len(shapes) == 1, f'grid mismatch {shapes}'
+    return shapes.pop()
@@ -0,0 +1,221 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+headless command line runner (GDAL/NumPy only, no QGIS)
+
+    python -m fwdet run --dem DEM.tif --extent flood.geojson --iterations 5 --slope 0.5
+    python -m fwdet run --dem DEM.tif --extent 'events/*.geojson' --out-dir out
+    python -m fwdet run --manifest jobs.csv
+
+--extent is the inundation extent (polygon vector or raster). a glob pattern
+runs every match against the one DEM (see batch.run_batch). only the DEM
+window covering the extent (plus --halo cells) is read. a manifest is a
+CSV (or JSON lines) file with one job per row: columns dem and extent, plus
+any option below (e.g., iterations, slope, out_dir, outputs, cache_dir,
+max_workers) overriding the command line. outputs are space separated in CSV
+
+--report, --memmap, --cost and --mem-limit are single run options: a batch
+(glob pattern) with any of them is rejected (exit code 2)
+
+exit codes
+    0: all jobs finished
+    1: at least one job failed (the others still run)
+    2: bad arguments
+
+the engine is only imported once the arguments are parsed (fast --help and
+argument errors)
+'''
+
+import os, sys, glob, logging, argparse
+
+log = logging.getLogger('fwdet')
+
+#manifest columns {column: (argparse dest, type)}
+manifest_cols = {
+    'dem': ('dem', str), 'extent': ('extent', str), 'out_dir': ('out_dir', str),
+    'iterations': ('iterations', int), 'slope': ('slope', float), 'grow_metric': ('grow_metric', str),
+    'boundary_mode': ('boundary_mode', str), 'connectivity': ('connectivity', int),
+    'cost': ('cost', str), 'mem_limit': ('mem_limit', float), 'report': ('report', str),
+    'codec': ('codec', str), 'quantize': ('quantize', float), 'halo': ('halo', int),
+    'grow_block': ('grow_block', int), 'grow_tol': ('grow_tol', float),
+    'quantize_boundary': ('quantize_boundary', float),
+    'outputs': ('outputs', lambda v: v.split() if isinstance(v, str) else list(v)),
+    'cache_dir': ('cache_dir', str), 'max_workers': ('max_workers', int),
+}
+
+#manifest columns w/ paths (relative to the manifest)
+manifest_path_cols = ('dem', 'extent', 'out_dir', 'cost', 'report', 'cache_dir')
+
+#options w/o a batch equivalent {argparse dest: flag}
+single_run_opts = {'report': '--report', 'memmap': '--memmap', 'cost': '--cost', 'mem_limit': '--mem-limit'}
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='fwdet', description='Floodwater Depth Estimation Tool (FwDET 2.1)')
+    parser.add_argument('--version', action='store_true', help='print the version and exit')
+    sub = parser.add_subparsers(dest='command')
+
+    p = sub.add_parser('run', help='estimate water depths from an inundation extent and a DEM')
+    p.add_argument('--dem', help='DEM raster')
+    p.add_argument('--extent', help='inundation extent (vector or raster). glob patterns run a batch')
+    p.add_argument('--manifest', help='CSV or JSON lines file w/ one job per row (see module help)')
+    p.add_argument('--iterations', type=int, default=10, help='smoothing iterations (numIterations)')
+    p.add_argument('--slope', type=float, default=0.5, help='slope filter threshold in percent (slopeTH)')
+    p.add_argument('--grow-metric', default='euclidean',
+                   help='euclidean, squared, maximum, manhattan, geodesic or cost')
+    p.add_argument('--boundary-mode', default='polyline', help='polyline, outer or inner')
+    p.add_argument('--connectivity', type=int, default=8, choices=[4, 8])
+    p.add_argument('--cost', help='cost raster for --grow-metric cost')
+    p.add_argument('--grow-block', type=int,
+                   help='coarse-to-fine allocation from blocks of this many cells (euclidean metrics)')
+    p.add_argument('--grow-tol', type=float, default=0.0,
+                   help='w/ --grow-block, accepted error (elevation units) of the allocated water surface')
+    p.add_argument('--outputs', nargs='+', default=['water_depth'],
+                   help='water_depth, water_depth_filtered and/or boundary')
+    p.add_argument('--out-dir', default='.', help='outputs are written as {out_dir}/{extent name}_{output}.tif')
+    p.add_argument('--cog', action='store_true', help='write Cloud-Optimized GeoTIFFs')
+    p.add_argument('--codec', default='DEFLATE', help='COG compression (DEFLATE, ZSTD, LZW, LERC, NONE)')
+    p.add_argument('--quantize', type=float, metavar='SCALE',
+                   help='store depths as uint16 multiples of SCALE (e.g., 0.01 for cm). implies --cog')
+    p.add_argument('--quantize-boundary', type=float, metavar='SCALE',
+                   help='store the boundary as int32 multiples of SCALE (e.g., 0.001 for mm). implies --cog')
+    p.add_argument('--halo', type=int, default=0, help='cells read around the inundation extent')
+    p.add_argument('--memmap', action='store_true', help='read the DEM window into a memory map (single runs)')
+    p.add_argument('--mem-limit', type=float, help='memory ceiling (bytes) for the tiled mode')
+    p.add_argument('--cache-dir', help='persistent cache for the DEM products')
+    p.add_argument('--report', help='JSON run report (single runs)')
+    p.add_argument('--max-workers', type=int, help='process pool size for batches')
+    p.add_argument('-v', '--verbose', action='store_true')
+    p.add_argument('-q', '--quiet', action='store_true')
+
+    return parser
+
+
+def main(argv=None):
+    parser = get_parser()
+    args = parser.parse_args(argv)
+
+    if args.version:
+        from . import __version__
+        print(__version__)
+        return 0
+
+    if args.command is None:
+        parser.print_help()
+        return 2
+
+    level = logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+    logging.basicConfig(level=level, format='%(asctime)s %(levelname)s %(message)s')
+
+    if args.manifest is None and (args.dem is None or args.extent is None):
+        parser.error('run requires --dem and --extent (or --manifest)')
+
+    jobs = [args] if args.manifest is None else read_manifest(args.manifest, args)
+    for i, job in enumerate(jobs):
+        if glob.has_magic(job.extent):
+            bad_l = [flag for k, flag in single_run_opts.items() if getattr(job, k)]
+            if len(bad_l) > 0:
+                parser.error(f'{", ".join(bad_l)} not supported for batches (job {i + 1}: {job.extent})')
+
+    failed = 0
+    for i, job in enumerate(jobs):
+        if len(jobs) > 1:
+            log.info(f'job {i + 1}/{len(jobs)}: {job.extent}')
+        try:
+            failed += run_job(job)
+        except Exception as e:
+            log.error(f'job {i + 1}/{len(jobs)} on {job.extent} failed w/\n    {e!r}')
+            failed += 1
+
+    if failed > 0:
+        log.error(f'{failed} failed')
+        return 1
+    return 0
+
+
+def run_job(args):
+    """one run (or a batch for a glob pattern). returns the number of failed events"""
+    from .engine import LogFeedback
+    feedback = LogFeedback(logger=log)
+
+    fp_l = sorted(glob.glob(args.extent)) if glob.has_magic(args.extent) else [args.extent]
+    if len(fp_l) == 0:
+        raise FileNotFoundError(f'no inundation extents match \'{args.extent}\'')
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    mem_limit = None if args.mem_limit is None else int(args.mem_limit)
+    cog_kwargs = get_cog_kwargs(args)
+
+    #single run
+    if not glob.has_magic(args.extent):
+        from .engine import run_algo
+        from .batch import _get_event_name
+        name = _get_event_name(args.extent, dict())
+        run_algo(args.dem, args.extent, args.iterations, args.slope, grow_metric=args.grow_metric,
+                 ofp_d={k: os.path.join(args.out_dir, f'{name}_{k}.tif') for k in args.outputs},
+                 cost_fp=args.cost, boundary_mode=args.boundary_mode, connectivity=args.connectivity,
+                 mem_limit=mem_limit, cache_dir=args.cache_dir, report_fp=args.report, cog_kwargs=cog_kwargs,
+                 halo=args.halo, memmap=args.memmap, grow_block=args.grow_block, grow_tol=args.grow_tol,
+                 feedback=feedback)
+        return 0
+
+    #batch
+    from .batch import run_batch
+    res_d = run_batch(args.dem, fp_l, args.iterations, args.slope, args.out_dir,
+                      grow_metric=args.grow_metric, boundary_mode=args.boundary_mode,
+                      grow_block=args.grow_block, grow_tol=args.grow_tol,
+                      connectivity=args.connectivity, outputs=args.outputs, continue_on_error=True,
+                      cache_dir=args.cache_dir, max_workers=args.max_workers, halo=args.halo, cog_kwargs=cog_kwargs,
+                      feedback=feedback)
+    return sum(v is None for v in res_d.values())
+
+
+def get_cog_kwargs(args):
+    """raster_io.write_cog options from the arguments (None for plain GeoTIFFs)"""
+    if not (args.cog or not args.quantize is None or not args.quantize_boundary is None):
+        return None
+    cog_kwargs = dict(codec=args.codec.upper())
+    if not args.quantize is None:
+        cog_kwargs['quantize'] = args.quantize
+    if not args.quantize_boundary is None:
+        cog_kwargs['quantize_boundary'] = args.quantize_boundary
+    return cog_kwargs
+
+
+def read_manifest(fp, defaults):
+    """jobs (argparse.Namespace) from a CSV or JSON lines manifest
+
+    relative paths are relative to the manifest"""
+    import csv, json
+    base_dir = os.path.dirname(os.path.abspath(fp))
+
+    with open(fp, 'r', newline='') as f:
+        if os.path.splitext(fp)[1].lower() in ('.jsonl', '.json'):
+            row_l = [json.loads(line) for line in f if line.strip()]
+        else:
+            row_l = list(csv.DictReader(f))
+
+    jobs = list()
+    for i, row in enumerate(row_l):
+        job = argparse.Namespace(**vars(defaults))
+        for k, v in row.items():
+            if not k in manifest_cols:
+                raise KeyError(f'unrecognized manifest column \'{k}\' (row {i + 1} of {fp})')
+            if v is None or v == '':
+                continue
+            dest, typ = manifest_cols[k]
+            v = typ(v)
+            if k in manifest_path_cols:
+                v = os.path.join(base_dir, v)
+            setattr(job, dest, v)
+
+        assert not (job.dem is None or job.extent is None), f'row {i + 1} of {fp} needs dem and extent'
+        jobs.append(job)
+
+    return jobs
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+multi-source cost allocation (ArcPy CostAllocation equivalent)
+
+FwDET_2p1_Standalone.py runs CostAllocation on Int(boundary * 10000) with the
+coastal cost surface ((dem <= 0)*999)+1. here the float boundary values are
+carried directly (no integer quantization) and the coastal cost is evaluated
+on the DEM edge by edge (never stored as a raster).
+
+accumulated cost follows ArcGIS: moving between neighbours costs the mean
+of the two cell costs times the distance between their centres (8-connected).
+cells with NoData cost (or NoData DEM) are barriers. zero costs are valid.
+'''
+
+import numpy as np
+
+#(row offset, col offset) of the undirected 8-connected edges (ascending linear offset)
+_edge_offsets = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+#cells per row block of the graph build
+edge_block_cells = 2 ** 20
+
+
+def coastal_cost(dem_ar):
+    """FwDET 2.0 coastal cost surface: 1000 at or below sea level, 1 elsewhere"""
+    with np.errstate(invalid='ignore'):
+        return np.where(np.isnan(dem_ar), np.nan, np.where(dem_ar <= 0, 1000.0, 1.0))
+
+
+def cost_allocation(boundary,
+                    cost_ar=None,
+                    dem_ar=None,
+                    cell_size=(1.0, 1.0),
+                    feedback=None,
+                    ):
+    """assign each cell the value of the boundary cell with the least accumulated cost
+
+    heap-based multi-source Dijkstra (scipy.sparse.csgraph) on the 8-connected grid
+
+    Params
+    ---------
+    boundary: np.ndarray
+        boundary values (np.nan off the boundary)
+    cost_ar: np.ndarray, optional
+        cost surface (np.nan for barriers). if not provided, coastal_cost(dem_ar) is used
+    dem_ar: np.ndarray, optional
+        DEM. NoData cells are treated as barriers
+    cell_size: tuple
+        (dy, dx)
+
+    Returns
+    ---------
+    np.ndarray
+        allocated boundary values (np.nan where no boundary cell can be reached)
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra
+    from .encoding import get_index_dtype
+
+    nrows, ncols = boundary.shape
+    n = nrows * ncols
+
+    if cost_ar is None:
+        assert not dem_ar is None, 'must provide a cost raster or a DEM'
+    elif not dem_ar is None:
+        assert cost_ar.shape == dem_ar.shape, 'cost raster does not match the DEM grid'
+
+    sources = np.flatnonzero(~np.isnan(boundary))
+    if len(sources) == 0:
+        raise AssertionError('no boundary cells left to allocate. check the filter parameters')
+
+    #===========================================================================
+    # build the graph
+    #===========================================================================
+    """CSR filled in place: node i holds its forward edges to i + 1, i + ncols - 1,
+    i + ncols, i + ncols + 1 (ascending columns). directed=False adds the reverse.
+    the edge costs are evaluated from the endpoint cells one row block at a time
+    (pass 1 counts the edges per node, pass 2 fills them)"""
+    idx_dtype = get_index_dtype(n + 1)
+    counts = np.zeros(n, dtype=np.int8)
+    for r0, r1, valid, _ in _iter_edges(cost_ar, dem_ar, cell_size, weights=False):
+        counts[r0 * ncols:r1 * ncols] = valid.sum(axis=2).ravel()
+
+    indptr = np.zeros(n + 1, dtype=idx_dtype)
+    np.cumsum(counts, dtype=idx_dtype, out=indptr[1:])
+    del counts
+
+    data, indices = np.empty(indptr[-1], dtype=np.float64), np.empty(indptr[-1], dtype=idx_dtype)
+    lin_off = np.array([oy * ncols + ox for oy, ox in _edge_offsets], dtype=idx_dtype)
+    for r0, r1, valid, w in _iter_edges(cost_ar, dem_ar, cell_size):
+        i0, i1 = indptr[r0 * ncols], indptr[r1 * ncols]
+        data[i0:i1] = w[valid]
+        node = np.arange(r0 * ncols, r1 * ncols, dtype=idx_dtype).reshape(r1 - r0, ncols, 1)
+        indices[i0:i1] = (node + lin_off)[valid]
+
+    graph = csr_matrix((data, indices, indptr), shape=(n, n))
+    del data, indices, indptr
+
+    if not feedback is None:
+        feedback.pushInfo(f'cost allocation from {len(sources)} boundary cells over {graph.nnz} edges')
+
+    #===========================================================================
+    # allocate
+    #===========================================================================
+    _, _, src_ar = dijkstra(graph, directed=False, indices=sources, min_only=True, return_predecessors=True)
+
+    alloc_ar = np.full(nrows * ncols, np.nan, dtype=boundary.dtype)
+    reached = src_ar >= 0
+    alloc_ar[reached] = boundary.ravel()[src_ar[reached]]
+
+    return alloc_ar.reshape(nrows, ncols)
+
+
+def _iter_edges(cost_ar, dem_ar, cell_size, weights=True):
+    """forward edges of each row block
+
+    the costs of the block (+ 1 row below) are evaluated from the DEM or cost
+    raster on the fly (no full-size cost array)
+
+    Yields
+    ---------
+    r0, r1: int
+        rows of the block
+    valid: np.ndarray
+        bool (r1 - r0, ncols, 4) edge exists (both endpoints on the grid and finite)
+    w: np.ndarray or None
+        float64 (r1 - r0, ncols, 4) edge weights (if weights)
+    """
+    ref_ar = dem_ar if cost_ar is None else cost_ar
+    nrows, ncols = ref_ar.shape
+    dy, dx = cell_size
+    block_rows = max(1, edge_block_cells // ncols)
+
+    for r0 in range(0, nrows, block_rows):
+        r1 = min(r0 + block_rows, nrows)
+        c_ar = _get_cost(cost_ar, dem_ar, slice(r0, min(r1 + 1, nrows)))
+
+        #costs of the far endpoints (NaN off the grid)
+        far = np.full((r1 - r0 + 1, ncols + 2), np.nan)
+        far[:c_ar.shape[0], 1:-1] = c_ar
+
+        w = np.empty((r1 - r0, ncols, 4))
+        for k, (oy, ox) in enumerate(_edge_offsets):
+            w[:, :, k] = c_ar[:r1 - r0] + far[oy:oy + r1 - r0, 1 + ox:1 + ox + ncols]
+
+        with np.errstate(invalid='ignore'):
+            valid = np.isfinite(w) & (w >= 0)  #NaN cost: barrier
+        if not weights:
+            yield r0, r1, valid, None
+            continue
+
+        w *= 0.5 * np.hypot(np.array([oy for oy, _ in _edge_offsets]) * dy,
+                            np.array([ox for _, ox in _edge_offsets]) * dx)
+        yield r0, r1, valid, w
+
+
+def _get_cost(cost_ar, dem_ar, win):
+    """cost of a row window (float64. NaN for barriers)"""
+    if cost_ar is None:
+        return coastal_cost(dem_ar[win])
+    c_ar = cost_ar[win].astype(np.float64)
+    if not dem_ar is None:
+        c_ar[np.isnan(dem_ar[win])] = np.nan
+    return c_ar
@@ -0,0 +1,76 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+compact storage: quantized rasters and index dtypes
+
+quantized storage of float rasters (e.g., depths as uint16 centimetres, or
+elevations as int32 millimetres w/ a fixed offset)
+
+    stored = round((value - offset) / scale)
+    value = stored * scale + offset
+
+the scale and offset are written to the band metadata (GDAL SetScale/SetOffset)
+so readers that honour them (GDAL, QGIS, rasterio, web viewers) get the
+original units back. the largest value of the dtype is NoData
+
+dtype policy of the engine
+    masks: bool (one byte per cell)
+    cell and boundary indices: int32 unless the indexed size needs int64 (get_index_dtype)
+    elevations and depths: float32 in memory. see quantize for storage
+'''
+
+import numpy as np
+
+
+def get_index_dtype(n):
+    """signed integer dtype indexing n positions (int32, else int64)"""
+    return np.int32 if n < 2 ** 31 else np.int64
+
+
+def nonzero(mask, block_rows=4096):
+    """np.nonzero of a 2D mask w/ compact indices (see get_index_dtype)
+
+    filled one row block at a time (no full-size int64 intermediates)"""
+    dtype = get_index_dtype(max(mask.shape))
+    counts = [np.count_nonzero(mask[r0:r0 + block_rows]) for r0 in range(0, mask.shape[0], block_rows)]
+
+    rows, cols = np.empty(sum(counts), dtype=dtype), np.empty(sum(counts), dtype=dtype)
+    i = 0
+    for r0, n in zip(range(0, mask.shape[0], block_rows), counts):
+        rows[i:i + n], cols[i:i + n] = np.nonzero(mask[r0:r0 + block_rows])
+        rows[i:i + n] += r0
+        i += n
+    return rows, cols
+
+
+def get_nodata(dtype):
+    return np.iinfo(dtype).max
+
+
+def quantize(ar, scale=0.01, offset=0.0, dtype=np.uint16):
+    """float array (np.nan for NoData) to integers
+
+    values outside the range of dtype are clipped to it
+
+    Returns
+    ---------
+    q_ar: np.ndarray
+        dtype array
+    nodata: int
+    """
+    info = np.iinfo(dtype)
+    nodata = get_nodata(dtype)
+    valid = ~np.isnan(ar)
+
+    q_ar = np.full(ar.shape, nodata, dtype=dtype)
+    with np.errstate(invalid='ignore'):
+        q_ar[valid] = np.clip(np.round((ar[valid].astype(np.float64) - offset) / scale), info.min, nodata - 1)
+    return q_ar, nodata
+
+
+def dequantize(q_ar, scale=0.01, offset=0.0, nodata=None):
+    """integers back to float32 (np.nan for NoData)"""
+    if nodata is None: nodata = get_nodata(q_ar.dtype)
+    return np.where(q_ar == nodata, np.nan, q_ar * scale + offset).astype(np.float32)
@@ -0,0 +1,475 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+in-memory FwDET 2.1 pipeline
+    port of qgis_port/processing_scripts/fwdet_21.py (FwDET.run_algo) where each
+    processing.run step is replaced by a NumPy operation on arrays read once.
+    only the requested outputs are written.
+'''
+
+import logging
+import numpy as np
+
+from . import boundary
+from .boundary import BoundaryCells
+from .focal import focal_mean
+from . import allocation
+from .allocation import grow_cells
+from .cost import cost_allocation
+from .report import RunReport, NullReport
+from .encoding import nonzero
+
+#output names (match qgis_port.processing_scripts.fwdet_21.FwDET)
+OUTPUT_WSH = 'water_depth'
+OUTPUT_WSH_SMOOTH = 'water_depth_filtered'
+OUTPUT_SHORE = 'boundary'
+
+#decimals of the float outputs (rounded as they are written, not in memory)
+output_decimals = 4
+
+#nearest-boundary metrics (r.grow.distance) + least-cost allocation
+grow_metrics = allocation.grow_metrics + ('cost',)
+
+
+class LogFeedback(object):
+    """minimal stand-in for QgsProcessingFeedback that sends messages to a logger"""
+
+    def __init__(self, logger=None):
+        self.logger = logger if logger is not None else logging.getLogger('fwdet')
+
+    def pushInfo(self, info):
+        self.logger.info(info)
+
+    def pushDebugInfo(self, info):
+        self.logger.debug(info)
+
+    def pushWarning(self, txt):
+        self.logger.warning(txt)
+
+    def isCanceled(self):
+        return False
+
+
+def run_algo(dem_fp, inun_fp, numIterations, slopeTH, grow_metric='euclidean',
+             ofp_d=None,
+             cost_fp=None,
+             boundary_mode='polyline',
+             connectivity=8,
+             neighborhood_size=5,
+             mem_limit=None,
+             cache_dir=None,
+             report_fp=None,
+             log_stages=False,
+             cog_kwargs=None,
+             extent=None,
+             halo=0,
+             memmap=False,
+             grow_block=None,
+             grow_tol=0.0,
+             feedback=None,
+             ):
+    """generate gridded depths from an inundation polygon (file based)
+
+    Params
+    ------------
+    dem_fp: str
+        DEM raster (any GDAL source, e.g., a VRT mosaic). only the window
+        covering extent is read, straight from the source on its grid
+    inun_fp: str
+        inundation polygon vector (QGIS 'path|layername=' sources are accepted)
+        or raster (cells > 0 are inundated. requires an edge boundary_mode)
+    ofp_d: dict
+        {output name: filepath} of outputs to write. see OUTPUT_* for names
+    cost_fp: str, optional
+        cost surface for grow_metric='cost'. if not provided, the coastal
+        cost surface is computed from the DEM. see cost.cost_allocation
+    boundary_mode: str
+        how the shore line cells are found. see boundary.boundary_modes
+    connectivity: int
+        4 or 8 neighbours for the edge boundary modes
+    mem_limit: int, optional
+        memory ceiling (bytes). if provided, the DEM is processed out-of-core
+        in tiles (see tiling.run_tiled)
+    cache_dir: str, optional
+        persistent cache for the DEM products (ocean filter minimum and slope).
+        repeat runs on the same DEM skip these stages. see cache.DiskCache
+    report_fp: str, optional
+        write a JSON run report w/ the time, memory and I/O of each stage. see report.RunReport
+    log_stages: bool
+        push the measurements of each stage (and a summary) to the feedback, even
+        w/o report_fp (e.g., the QGIS log)
+    cog_kwargs: dict, optional
+        write the outputs as Cloud-Optimized GeoTIFFs (see raster_io.write_cog and
+        raster_io.cog_kwargs_default). 'quantize' only applies to the depth outputs.
+        'quantize_boundary' (e.g., 0.001) stores the boundary as int32 multiples
+        of it, offset by 'boundary_offset' (default 0)
+    extent: tuple, optional
+        (xmin, xmax, ymin, ymax) of the DEM window. defaults to the inundation extent
+    halo: int
+        cells added around the extent window
+    memmap: bool
+        read the DEM into a memory map on the scratch directory (see scratch.ScratchStore)
+    grow_block, grow_tol: optional
+        coarse-to-fine allocation. see fwdet_array
+
+    Returns
+    -----------
+    dict
+        {output name: filepath}
+    """
+    if not mem_limit is None:  #checked before any file is opened
+        assert cost_fp is None, 'cost raster not supported by the tiled mode'
+        assert grow_metric != 'cost', 'grow_metric=\'cost\' not supported by the tiled mode (mem_limit)'
+
+    from . import raster_io
+    from .batch import DemProducts
+    from .cache import DiskCache
+    if feedback is None: feedback = LogFeedback()
+    if ofp_d is None: ofp_d = {OUTPUT_WSH: 'water_depth.tif'}
+
+    report = NullReport()
+    if not report_fp is None or log_stages:
+        report = RunReport(feedback=feedback, dem_fp=dem_fp, inun_fp=inun_fp, numIterations=numIterations,
+                           slopeTH=slopeTH, grow_metric=grow_metric, boundary_mode=boundary_mode,
+                           connectivity=connectivity, neighborhood_size=neighborhood_size, mem_limit=mem_limit,
+                           cache_dir=cache_dir, ofp_d=ofp_d)
+
+    if extent is None:
+        extent = raster_io.get_vector_extent(inun_fp)
+
+    if not mem_limit is None:
+        from .tiling import run_tiled
+        from .scratch import ScratchStore
+        with ScratchStore() as scratch:
+            #tiles are written in windows. COGs are copied from these
+            tile_ofp_d = ofp_d if cog_kwargs is None else {k: scratch.path(k) for k in ofp_d.keys()}
+            with report.stage('tiled'):
+                run_tiled(dem_fp, inun_fp, numIterations, slopeTH, grow_metric=grow_metric, ofp_d=tile_ofp_d,
+                          boundary_mode=boundary_mode, connectivity=connectivity,
+                          neighborhood_size=neighborhood_size, mem_limit=mem_limit,
+                          extent=extent, extent_halo=halo, grow_block=grow_block, grow_tol=grow_tol,
+                          feedback=feedback)
+
+            if not cog_kwargs is None:
+                for k, ofp in ofp_d.items():
+                    with report.stage(f'write_{k}'):
+                        raster_io.to_cog(tile_ofp_d[k], ofp, cog_kwargs=get_cog_kwargs(cog_kwargs, k))
+
+        _write_report(report, report_fp, feedback)
+        return dict(ofp_d)
+
+    scratch = None
+    if memmap:
+        from .scratch import ScratchStore
+        scratch = ScratchStore()
+    try:
+        #=======================================================================
+        # load
+        #=======================================================================
+        feedback.pushInfo(f'loading DEM window from {dem_fp}')
+        with report.stage('clip') as rec:
+            prod = DemProducts.from_file(dem_fp, extent=extent, halo=halo, scratch=scratch,
+                                         neighborhood_size=neighborhood_size,
+                                         cache=None if cache_dir is None else DiskCache(cache_dir),
+                                         feedback=feedback)
+            dem_ar, meta_d = prod.dem_ar, prod.meta_d
+            rec['cells'] = dem_ar.size
+
+        feedback.pushInfo(f'rasterizing inundation on {dem_ar.shape} grid')
+        with report.stage('rasterize', cells=dem_ar.size):
+            inun_mask, line_mask = raster_io.read_inundation(inun_fp, meta_d, lines=boundary_mode == 'polyline')
+
+        cost_ar = None
+        if not cost_fp is None:
+            assert grow_metric == 'cost', f'cost raster provided but grow_metric=\'{grow_metric}\''
+            feedback.pushInfo(f'loading cost raster from {cost_fp}')
+            with report.stage('load_cost', cells=dem_ar.size):
+                cost_ar = raster_io.read_raster_like(cost_fp, meta_d)
+
+        #=======================================================================
+        # compute
+        #=======================================================================
+        if cache_dir is None:  #sparse evaluation at the boundary cells
+            res_d = fwdet_array(dem_ar, inun_mask, line_mask, numIterations, slopeTH,
+                                grow_metric=grow_metric, cost_ar=cost_ar,
+                                boundary_mode=boundary_mode, connectivity=connectivity,
+                                slope_cell_size=prod.slope_cell_size,
+                                grow_cell_size=prod.grow_cell_size,
+                                grow_coords=prod.grow_coords,
+                                grow_block=grow_block, grow_tol=grow_tol,
+                                neighborhood_size=neighborhood_size,
+                                outputs=ofp_d.keys(), report=report, feedback=feedback)
+        else:
+            res_d = prod.fwdet_array(inun_mask, line_mask, numIterations, slopeTH,
+                                     grow_metric=grow_metric, cost_ar=cost_ar,
+                                     boundary_mode=boundary_mode, connectivity=connectivity,
+                                     grow_block=grow_block, grow_tol=grow_tol,
+                                     outputs=ofp_d.keys(), report=report, feedback=feedback)
+
+        #=======================================================================
+        # write
+        #=======================================================================
+        for k, ofp in ofp_d.items():
+            with report.stage(f'write_{k}', cells=res_d[k].size):
+                raster_io.write_output(res_d[k], ofp, meta_d, cog_kwargs=get_cog_kwargs(cog_kwargs, k),
+                                       decimals=output_decimals)
+            feedback.pushInfo(f'wrote {k} to {ofp}')
+    finally:
+        if not scratch is None:
+            scratch.close()
+
+    _write_report(report, report_fp, feedback)
+    return dict(ofp_d)
+
+
+def get_cog_kwargs(cog_kwargs, k):
+    """COG options of output k
+
+    depths are quantized to uint16 w/ 'quantize'. the boundary holds elevations
+    (possibly negative): only quantized (int32) w/ 'quantize_boundary'"""
+    if cog_kwargs is None:
+        return cog_kwargs
+    d = {kk: v for kk, v in cog_kwargs.items() if not kk in ('quantize', 'quantize_boundary', 'boundary_offset')}
+    if k != OUTPUT_SHORE:
+        if not cog_kwargs.get('quantize', None) is None:
+            d['quantize'] = cog_kwargs['quantize']
+    elif not cog_kwargs.get('quantize_boundary', None) is None:
+        d.update(quantize=cog_kwargs['quantize_boundary'], quantize_dtype='int32',
+                 quantize_offset=cog_kwargs.get('boundary_offset', 0.0))
+    return d
+
+
+def _write_report(report, report_fp, feedback):
+    if isinstance(report, NullReport):
+        return
+    feedback.pushInfo(f'stage summary\n{report.summary()}')
+    if report_fp is None:
+        return
+    report.write(report_fp)
+    feedback.pushInfo(f'wrote run report to {report_fp}')
+
+
+def fwdet_array(dem_ar, inun_mask, line_mask, numIterations, slopeTH,
+                grow_metric='euclidean',
+                cost_ar=None,
+                boundary_mode='polyline',
+                connectivity=8,
+                slope_cell_size=(1.0, 1.0),
+                grow_cell_size=(1.0, 1.0),
+                grow_coords=None,
+                grow_block=None,
+                grow_tol=0.0,
+                neighborhood_size=5,
+                dem_min_ar=None,
+                slope_ar=None,
+                outputs=(OUTPUT_WSH, OUTPUT_WSH_SMOOTH, OUTPUT_SHORE),
+                report=None,
+                feedback=None,
+                ):
+    """FwDET 2.1 on arrays
+    main steps:
+        1) compute the shore/boundary pixels (filtering, smoothing, etc.)
+        2) grow/extend the shore/boundary pixels onto the inundated cells
+        3) subtract the DEM and mask to the inundation to compute depths
+        4) apply low-pass filter
+
+    Params
+    ------------
+    dem_ar: np.ndarray
+        DEM (float, np.nan for NoData)
+    inun_mask: np.ndarray
+        inundated cells (bool)
+    line_mask: np.ndarray
+        inundation boundary cells (bool). only used with boundary_mode='polyline'
+    grow_metric: str
+        see grow_metrics. 'cost' uses a least-cost allocation instead of the nearest boundary cell
+    cost_ar: np.ndarray, optional
+        cost surface for grow_metric='cost' (defaults to the coastal cost surface)
+    boundary_mode: str
+        'polyline' uses line_mask. 'outer' or 'inner' take the morphological edge
+        of inun_mask (see boundary.mask_edge)
+    connectivity: int
+        4 or 8 neighbours for the edge modes
+    slope_cell_size: tuple
+        (dy, dx) in elevation units for the slope filter
+    grow_cell_size: tuple
+        (dy, dx) sampling for the grow distances
+    grow_coords: tuple, optional
+        (lat, lon) cell centres for the geodesic grow metric. see allocation.grow_cells
+    grow_block: int, optional
+        coarse-to-fine allocation from blocks of grow_block cells (euclidean metrics).
+        refined near the Voronoi edges and the shore. see allocation.BoundaryIndex.query
+    grow_tol: float
+        w/ grow_block, boundary elevations within grow_tol of the exact allocation are
+        accepted (depths are then within grow_tol of the exact ones. 0: exact)
+    dem_min_ar, slope_ar: np.ndarray, optional
+        precomputed DEM products. see CalculateBoundary
+    outputs: iterable
+        output names to return. see OUTPUT_*
+    report: report.RunReport, optional
+        records each stage
+
+    Returns
+    -----------
+    dict
+        {output name: np.ndarray}
+    """
+    if feedback is None: feedback = LogFeedback()
+    if report is None: report = NullReport()
+    if not boundary_mode in boundary.boundary_modes:
+        raise KeyError(f'unrecognized boundary mode \'{boundary_mode}\'. expected one of {boundary.boundary_modes}')
+
+    if boundary_mode != 'polyline':
+        feedback.pushInfo(f'computing {boundary_mode} edge of the inundation w/ connectivity={connectivity}')
+        with report.stage('edge', cells=inun_mask.size):
+            line_mask = boundary.mask_edge(inun_mask, side=boundary_mode, connectivity=connectivity)
+
+    assert dem_ar.shape == inun_mask.shape == line_mask.shape, 'grid mismatch'
+    for k in outputs:
+        assert k in (OUTPUT_WSH, OUTPUT_WSH_SMOOTH, OUTPUT_SHORE), f'unrecognized output \'{k}\''
+
+    res_d = dict()
+
+    #===========================================================================
+    # shore Line/boundary------
+    #===========================================================================
+    bnd = CalculateBoundary(dem_ar, line_mask, numIterations, slopeTH,
+                            cell_size=slope_cell_size,
+                            neighborhood_size=neighborhood_size,
+                            dem_min_ar=dem_min_ar, slope_ar=slope_ar,
+                            report=report, feedback=feedback)
+
+    boundary_ar = bnd.to_dense()
+    if OUTPUT_SHORE in outputs:
+        res_d[OUTPUT_SHORE] = boundary_ar
+
+    #===========================================================================
+    # grow-----
+    #===========================================================================
+    feedback.pushInfo(f'growing {len(bnd)} boundary cells w/ {grow_metric}')
+    #only the inundated cells are allocated
+    rows, cols = nonzero(inun_mask & ~np.isnan(dem_ar))
+
+    with report.stage('grow', cells=len(rows)):
+        if grow_metric == 'cost':
+            cost_alloc = cost_allocation(boundary_ar, cost_ar=cost_ar, dem_ar=dem_ar, cell_size=grow_cell_size,
+                                         feedback=feedback)[rows, cols]
+        else:
+            assert cost_ar is None, f'cost raster provided but grow_metric=\'{grow_metric}\''
+            cost_alloc = grow_cells(bnd, rows, cols, grow_metric, cell_size=grow_cell_size, coords=grow_coords,
+                                    block=grow_block, tol=grow_tol, feedback=feedback)
+
+    #===========================================================================
+    # water depths-----
+    #===========================================================================
+    feedback.pushInfo('computing water_depths on DEM')
+    with report.stage('depth', cells=len(rows)):
+        diff_ar = cost_alloc - dem_ar[rows, cols]
+        water_depth = np.full(dem_ar.shape, np.nan, dtype=np.float32)
+        with np.errstate(invalid='ignore'):
+            water_depth[rows, cols] = np.where(diff_ar > 0, diff_ar, np.nan)
+
+    if OUTPUT_WSH in outputs:
+        res_d[OUTPUT_WSH] = water_depth
+
+    #===========================================================================
+    # low-pass filter-----
+    #===========================================================================
+    if OUTPUT_WSH_SMOOTH in outputs:
+        feedback.pushInfo('applying low-pass filter')
+        with report.stage('low_pass', cells=water_depth.size):
+            wd_smooth = focal_mean(water_depth, size=3)
+            res_d[OUTPUT_WSH_SMOOTH] = np.where(np.isnan(water_depth), np.nan, wd_smooth)
+
+    return res_d
+
+
+def CalculateBoundary(dem_ar, line_mask, numIterations, slopeTH,
+                      cell_size=(1.0, 1.0),
+                      neighborhood_size=5,
+                      dem_min_ar=None,
+                      slope_ar=None,
+                      report=None,
+                      feedback=None,
+                      ):
+    """build, smooth, and filter the shore/boundary cells
+
+    every stage is evaluated only at the boundary cells (see boundary.py)
+
+    Params
+    ---------
+    numIterations: int
+        number of smoothing iterations
+
+    slopeTH: float
+        threshold for slope filter (percent)
+
+    cell_size: tuple
+        (dy, dx) for the slope calculation. see focal.slope_percent
+
+    neighborhood_size: int
+        size of neighbourhood for smoothing kernal
+
+    dem_min_ar, slope_ar: np.ndarray, optional
+        precomputed DEM circular minimum and slope (e.g., shared across events. see batch.DemProducts).
+        otherwise evaluated at the boundary cells
+
+    report: report.RunReport, optional
+        records each stage (and each smoothing iteration)
+
+    Returns
+    ---------
+    BoundaryCells
+        boundary cells with valid elevations
+    """
+    if feedback is None: feedback = LogFeedback()
+    if report is None: report = NullReport()
+
+    #===========================================================================
+    # extract shore values
+    #===========================================================================
+    with report.stage('sample') as rec:
+        bnd = BoundaryCells.from_mask(line_mask, dem_ar)
+        rec['cells'] = len(bnd)
+    feedback.pushInfo(f'sampling DEM values from {len(bnd)} shore line cells')
+
+    #===========================================================================
+    # smooth shore values
+    #===========================================================================
+    if numIterations > 0:
+        feedback.pushInfo(f'smoothing shore values w/ {numIterations} iterations')
+        bnd = boundary.smooth(bnd, numIterations, size=neighborhood_size, report=report)
+
+    bnd = bnd.dropna()
+
+    #===========================================================================
+    # handle ocean boundary
+    #===========================================================================
+    feedback.pushInfo('removing ocean boundary')
+    with report.stage('ocean_filter', cells=len(bnd)):
+        if dem_min_ar is None:
+            dem_min = boundary.focal_min(dem_ar, bnd, size=neighborhood_size, circular=True)
+        else:
+            dem_min = dem_min_ar[bnd.rows, bnd.cols]
+        with np.errstate(invalid='ignore'):
+            bnd = bnd.subset(dem_min > 0)
+
+    #===========================================================================
+    # slope filter
+    #===========================================================================
+    if slopeTH > 0.0:
+        feedback.pushInfo(f'slope filtering w/ threshold={slopeTH}')
+        with report.stage('slope', cells=len(bnd)):
+            if slope_ar is None:
+                slope = boundary.slope_percent(dem_ar, bnd, cell_size)
+            else:
+                slope = slope_ar[bnd.rows, bnd.cols]
+            with np.errstate(invalid='ignore'):
+                bnd = bnd.subset(slope > slopeTH)
+    else:
+        feedback.pushInfo('no slope threshold set to zero... skipping filtering')
+
+    feedback.pushInfo(f'finished constructing shore/boundary w/ {len(bnd)} cells')
+    return bnd
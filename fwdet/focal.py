@@ -0,0 +1,253 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+focal (neighbourhood) filters on NumPy arrays
+    replaces the grass7:r.neighbors and grass7:r.slope.aspect calls of the QGIS port
+
+conventions
+    arrays are 2D float with np.nan for NoData
+    NoData cells are ignored by the filters ('DATA' mode in ArcPy, NULL handling in GRASS)
+    cells outside the raster are treated as NoData
+
+threads
+    the dense filters run over row bands (with a halo of size//2 rows) on a
+    thread pool. the NumPy kernels release the GIL, so bands scale across cores
+'''
+
+import os
+import numpy as np
+
+#default thread count of the banded filters (1: no pool)
+threads_default = os.cpu_count() or 1
+
+#smallest band worth a thread
+band_rows_min = 256
+
+
+def get_footprint(size, circular=False):
+    """offsets (dy, dx) of a square or circular neighbourhood
+
+    circular follows r.neighbors -c and ArcPy 'Circle {size//2} CELL' (cells within a
+    radius of size//2, e.g., 13 cells for size=5)"""
+    assert size % 2 == 1, f'neighbourhood size must be odd (got {size})'
+    pad = size // 2
+
+    dy, dx = np.mgrid[-pad:pad + 1, -pad:pad + 1]
+    if circular:
+        sel = (dy ** 2 + dx ** 2) <= pad ** 2
+        dy, dx = dy[sel], dx[sel]
+
+    return list(zip(dy.ravel().tolist(), dx.ravel().tolist()))
+
+
+def _iter_shifted(ar, footprint, fill=np.nan):
+    """yield views of the padded array shifted by each footprint offset"""
+    pad = max(max(abs(dy), abs(dx)) for dy, dx in footprint)
+    nrows, ncols = ar.shape
+
+    ar_pad = np.pad(ar, pad, mode='constant', constant_values=fill)
+
+    for dy, dx in footprint:
+        yield ar_pad[pad + dy:pad + dy + nrows, pad + dx:pad + dx + ncols]
+
+
+def focal_filter(ar, method='average', size=5, circular=False, threads=None):
+    """r.neighbors equivalent. method: 'average', 'minimum' or 'maximum'"""
+    func = {'average': focal_mean, 'minimum': focal_min, 'maximum': focal_max}[method]
+    return func(ar, size=size, circular=circular, threads=threads)
+
+
+def run_bands(func, ar, halo, threads=None):
+    """apply func to row bands of ar (each w/ halo rows of context) on a thread pool
+
+    func must be a focal operation reaching at most halo rows and treating cells
+    outside its input as outside the raster"""
+    from concurrent.futures import ThreadPoolExecutor
+    threads = threads_default if threads is None else threads
+    nrows = ar.shape[0]
+    nbands = int(min(threads, nrows // band_rows_min))
+    if nbands <= 1:
+        return func(ar)
+
+    bounds = np.linspace(0, nrows, nbands + 1).astype(int)
+    res_ar = None
+
+    def run_band(i):
+        r0, r1 = bounds[i], bounds[i + 1]
+        h0, h1 = max(r0 - halo, 0), min(r1 + halo, nrows)
+        return r0, r1, func(ar[h0:h1])[r0 - h0:r1 - h0]
+
+    with ThreadPoolExecutor(max_workers=nbands) as pool:
+        for r0, r1, band_ar in pool.map(run_band, range(nbands)):
+            if res_ar is None:
+                res_ar = np.empty(ar.shape, dtype=band_ar.dtype)
+            res_ar[r0:r1] = band_ar
+
+    return res_ar
+
+
+def focal_mean(ar, size=5, circular=False, threads=None):
+    """NoData-aware focal mean (r.neighbors method=average)
+
+    cells with no valid neighbours are returned as NoData.
+    rectangular windows use summed-area tables (cost independent of size)"""
+    if threads != 1:
+        return run_bands(lambda a: focal_mean(a, size=size, circular=circular, threads=1), ar, size // 2,
+                         threads=threads)
+
+    if circular:
+        return _focal_mean_shift(ar, size=size, circular=True)
+
+    valid = ~np.isnan(ar)
+    offset = _get_offset(ar, valid)
+
+    sum_ar = box_sum(np.where(valid, ar - offset, 0.0), size)
+    cnt_ar = box_sum(valid, size)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        res_ar = np.where(cnt_ar > 0.5, sum_ar / cnt_ar + offset, np.nan)
+
+    return res_ar.astype(ar.dtype)
+
+
+def smooth_masked(ar, mask, numIterations, size=5):
+    """numIterations passes of the rectangular NoData-aware focal mean, each re-masked to mask
+
+    fuses the CalculateBoundary smoothing loop: the window count table is only
+    rebuilt when the valid cells change (normally only after the first pass)"""
+    valid = mask & ~np.isnan(ar)
+    offset = _get_offset(ar, valid)
+    cur_ar = np.where(valid, ar - offset, 0.0)
+
+    cnt_ar = None
+    for i in range(numIterations):
+        if cnt_ar is None:
+            cnt_ar = box_sum(valid, size)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cur_ar = box_sum(cur_ar, size) / cnt_ar
+
+        #cells with a valid neighbour
+        valid_i = mask & (cnt_ar > 0.5)
+        cur_ar[~valid_i] = 0.0
+
+        if not np.array_equal(valid_i, valid):
+            valid, cnt_ar = valid_i, None
+
+    return np.where(valid, cur_ar + offset, np.nan).astype(ar.dtype)
+
+
+def box_sum(ar, size):
+    """rectangular moving-window sum from a summed-area table (integral image)
+
+    cells outside the raster count as zero"""
+    pad = size // 2
+    nrows, ncols = ar.shape
+
+    sat = np.zeros((nrows + 2 * pad + 1, ncols + 2 * pad + 1), dtype=np.float64)
+    sat[pad + 1:pad + 1 + nrows, pad + 1:pad + 1 + ncols] = ar
+    np.cumsum(sat, axis=0, out=sat)
+    np.cumsum(sat, axis=1, out=sat)
+
+    return sat[size:, size:] - sat[:-size, size:] - sat[size:, :-size] + sat[:-size, :-size]
+
+
+def _get_offset(ar, valid):
+    """shift values near zero so the summed-area table keeps its precision"""
+    return float(np.mean(ar[valid], dtype=np.float64)) if valid.any() else 0.0
+
+
+def _focal_mean_shift(ar, size=5, circular=False):
+    """focal mean by summing shifted copies (any footprint)"""
+    sum_ar = np.zeros(ar.shape, dtype=np.float64)
+    cnt_ar = np.zeros(ar.shape, dtype=np.int32)
+
+    for shift_ar in _iter_shifted(ar, get_footprint(size, circular=circular)):
+        valid = ~np.isnan(shift_ar)
+        sum_ar += np.where(valid, shift_ar, 0.0)
+        cnt_ar += valid
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        res_ar = sum_ar / cnt_ar
+
+    return res_ar.astype(ar.dtype)
+
+
+def focal_min(ar, size=5, circular=False, threads=None):
+    """NoData-aware focal minimum (r.neighbors method=minimum)"""
+    return _focal_reduce(ar, np.fmin, size, circular, threads)
+
+
+def focal_max(ar, size=5, circular=False, threads=None):
+    """NoData-aware focal maximum (r.neighbors method=maximum)"""
+    return _focal_reduce(ar, np.fmax, size, circular, threads)
+
+
+def _focal_reduce(ar, ufunc, size, circular, threads):
+    if threads != 1:
+        return run_bands(lambda a: _focal_reduce(a, ufunc, size, circular, 1), ar, size // 2, threads=threads)
+
+    res_ar = np.full(ar.shape, np.nan, dtype=ar.dtype)
+    for shift_ar in _iter_shifted(ar, get_footprint(size, circular=circular)):
+        ufunc(res_ar, shift_ar, out=res_ar)
+
+    return res_ar
+
+
+def slope_percent(dem_ar, cell_size):
+    """terrain slope in percent rise (r.slope.aspect format=percent)
+
+    Horn's 3x3 method. edge cells and cells next to NoData are returned as NoData
+
+    Params
+    ---------
+    cell_size: tuple
+        (dy, dx) cell size in the same units as the elevations.
+        dx can be an array (one value per row) for geographic grids
+    """
+    dy, dx = cell_size
+    dx = np.reshape(np.asarray(dx, dtype=np.float64), (-1, 1))
+
+    a, b, c, d, _, f, g, h, i = _iter_shifted(dem_ar.astype(np.float64), get_footprint(3))
+
+    dzdx = ((c + 2 * f + i) - (a + 2 * d + g)) / (8.0 * dx)
+    dzdy = ((g + 2 * h + i) - (a + 2 * b + c)) / (8.0 * dy)
+
+    return (100.0 * np.sqrt(dzdx ** 2 + dzdy ** 2)).astype(np.float32)
+
+
+#===============================================================================
+# binary morphology----------
+#===============================================================================
+
+def binary_dilate(mask, connectivity=8):
+    """one-cell binary dilation (r.neighbors method=maximum on a 0/1 raster, GEE focal_max)
+
+    bit-packed: 8 cells per byte along the rows. cells outside the raster are False"""
+    return _morph(mask, connectivity, np.bitwise_or)
+
+
+def binary_erode(mask, connectivity=8):
+    """one-cell binary erosion (bit-packed). cells outside the raster are False"""
+    return _morph(mask, connectivity, np.bitwise_and)
+
+
+def _morph(mask, connectivity, op):
+    assert connectivity in (4, 8), f'connectivity must be 4 or 8 (got {connectivity})'
+    ncols = mask.shape[1]
+    b = np.packbits(mask, axis=1)  #first column in the most significant bit
+
+    #horizontal neighbours (carry the edge bit from the adjacent byte)
+    west, east = b >> 1, b << 1
+    west[:, 1:] |= b[:, :-1] << 7
+    east[:, :-1] |= b[:, 1:] >> 7
+    h = op(op(b, west), east)
+
+    #vertical neighbours (rows outside are zero)
+    v = h if connectivity == 8 else b
+    up, down = np.zeros_like(v), np.zeros_like(v)
+    up[1:], down[:-1] = v[:-1], v[1:]
+
+    return np.unpackbits(op(op(h, up), down), axis=1, count=ncols).astype(bool)
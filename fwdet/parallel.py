@@ -0,0 +1,246 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+process-pool execution of events and parameter sweeps
+
+the DEM window and its derivatives are placed once in shared memory
+(multiprocessing.shared_memory) and mapped read-only by every worker: nothing
+large is pickled or re-read per task. results are collected as tasks finish
+(sweep stacks are written by the workers into a scratch memory map).
+'''
+
+import os, sys
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+#arrays mapped by this worker {name: np.ndarray}
+_worker_d = dict()
+_worker_shm_l = list()  #keep the segments alive
+
+
+class SharedArrays(object):
+    """named arrays in shared memory (owned by the parent process)
+
+    use as a context manager: segments are freed on exit"""
+
+    def __init__(self):
+        self.shm_d, self.desc_d = dict(), dict()
+
+    def put(self, name, ar):
+        """copy an array into a new segment. returns the shared view"""
+        ar = np.ascontiguousarray(ar)
+        shm = shared_memory.SharedMemory(create=True, size=max(ar.nbytes, 1))
+        view = np.ndarray(ar.shape, dtype=ar.dtype, buffer=shm.buf)
+        view[...] = ar
+
+        self.shm_d[name] = shm
+        self.desc_d[name] = (shm.name, ar.shape, ar.dtype.str)
+        return view
+
+    def empty(self, name, shape, dtype=np.float32, fill=np.nan):
+        """new segment (e.g., for workers to write results into)"""
+        return self.put(name, np.full(shape, fill, dtype=dtype))
+
+    def get(self, name):
+        shm_name, shape, dtype = self.desc_d[name]
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm_d[name].buf)
+
+    def close(self):
+        for shm in self.shm_d.values():
+            shm.close()
+            shm.unlink()
+        self.shm_d, self.desc_d = dict(), dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def attach(desc_d, writable=()):
+    """map shared arrays by their descriptors. read-only unless named in writable"""
+    res_d = dict()
+    for name, (shm_name, shape, dtype) in desc_d.items():
+        shm = _open_shm(shm_name)
+        _worker_shm_l.append(shm)
+
+        ar = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        if not name in writable:
+            ar.flags.writeable = False
+        res_d[name] = ar
+    return res_d
+
+
+def _open_shm(shm_name):
+    """attach to a segment owned by the parent process
+
+    pool workers share the parent's resource tracker, so attaching does not
+    change who frees the segment"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=shm_name, track=False)
+    return shared_memory.SharedMemory(name=shm_name)
+
+
+def _init_worker(desc_d, writable, kwargs_d):
+    from . import focal
+    focal.threads_default = 1  #the pool already uses the cores
+    _worker_d.clear()
+    _worker_d.update(attach(desc_d, writable=writable))
+    _worker_d['kwargs'] = kwargs_d
+
+
+def get_max_workers(max_workers=None):
+    return max_workers if not max_workers is None else (os.cpu_count() or 1)
+
+
+#===============================================================================
+# events----------
+#===============================================================================
+
+def run_events(prod, inun_fp_l, numIterations, slopeTH, out_dir,
+               outputs=('water_depth',),
+               max_workers=None,
+               cog_kwargs=None,
+               feedback=None,
+               **kwargs):
+    """batch events on a process pool (see batch.run_batch)
+
+    Params
+    ------------
+    prod: batch.DemProducts
+        DEM window. the DEM, ocean filter minimum and slope are shared
+    kwargs:
+        passed to engine.fwdet_array (e.g., grow_metric, boundary_mode)
+
+    Returns
+    -----------
+    dict
+        {event name: {output name: filepath}} (None for failed events)
+    """
+    from .engine import LogFeedback
+    from .batch import _get_event_name
+    if feedback is None: feedback = LogFeedback()
+    os.makedirs(out_dir, exist_ok=True)
+
+    kwargs_d = dict(meta_d=prod.meta_d, neighborhood_size=prod.neighborhood_size,
+                    slope_cell_size=prod.slope_cell_size, grow_cell_size=prod.grow_cell_size,
+                    grow_coords=prod.grow_coords, numIterations=numIterations, slopeTH=slopeTH,
+                    fwdet_kwargs=kwargs, cog_kwargs=cog_kwargs)
+
+    name_d = dict()
+    for fp in inun_fp_l:
+        name_d[_get_event_name(fp, name_d)] = fp
+
+    res_d = dict()
+    with SharedArrays() as sa:
+        sa.put('dem_ar', prod.dem_ar)
+        sa.put('dem_min_ar', prod.dem_min_ar)
+        if slopeTH > 0.0:
+            sa.put('slope_ar', prod.slope_ar)
+
+        with ProcessPoolExecutor(max_workers=get_max_workers(max_workers), initializer=_init_worker,
+                                 initargs=(sa.desc_d, (), kwargs_d)) as pool:
+            future_d = {pool.submit(_run_event, fp,
+                                    {k: os.path.join(out_dir, f'{name}_{k}.tif') for k in outputs}): name
+                        for name, fp in name_d.items()}
+
+            for i, future in enumerate(as_completed(future_d)):
+                name = future_d[future]
+                try:
+                    res_d[name] = future.result()
+                    feedback.pushInfo(f'({i + 1}/{len(future_d)}) finished {name}')
+                except Exception as e:
+                    feedback.pushWarning(f'({i + 1}/{len(future_d)}) {name} failed w/\n    {e}')
+                    res_d[name] = None
+
+    return {name: res_d[name] for name in name_d.keys()}
+
+
+def _run_event(inun_fp, ofp_d):
+    from . import raster_io
+    from .batch import DemProducts
+    from .engine import get_cog_kwargs, output_decimals
+    d = _worker_d['kwargs']
+
+    prod = DemProducts(_worker_d['dem_ar'], meta_d=d['meta_d'], neighborhood_size=d['neighborhood_size'],
+                       slope_cell_size=d['slope_cell_size'], grow_cell_size=d['grow_cell_size'],
+                       grow_coords=d['grow_coords'])
+    prod._dem_min_ar, prod._slope_ar = _worker_d['dem_min_ar'], _worker_d.get('slope_ar', None)
+
+    fwdet_kwargs = d['fwdet_kwargs']
+    inun_mask, line_mask = raster_io.read_inundation(
+        inun_fp, prod.meta_d, lines=fwdet_kwargs.get('boundary_mode', 'polyline') == 'polyline')
+
+    ar_d = prod.fwdet_array(inun_mask, line_mask, d['numIterations'], d['slopeTH'], outputs=ofp_d.keys(),
+                            **fwdet_kwargs)
+
+    for k, ofp in ofp_d.items():
+        raster_io.write_output(ar_d[k], ofp, prod.meta_d, cog_kwargs=get_cog_kwargs(d['cog_kwargs'], k),
+                               decimals=output_decimals)
+    return ofp_d
+
+
+#===============================================================================
+# sweeps----------
+#===============================================================================
+
+def sweep_parallel(dem_ar, inun_mask, line_mask, combos, scratch,
+                   max_workers=None,
+                   feedback=None,
+                   **kwargs):
+    """sweep.sweep_array on a process pool
+
+    combos are grouped by slope threshold (each group shares its allocations and
+    smoothing inside one worker). workers write their bands straight into a
+    memory-mapped stack (no copy back to the parent)
+
+    Params
+    ------------
+    scratch: scratch.ScratchStore
+        store of the stack. the caller owns (and closes) the store: the stack is
+        valid until then
+
+    Returns
+    -----------
+    np.memmap
+        float32 stack (band, row, col)
+    """
+    from .engine import LogFeedback
+    if feedback is None: feedback = LogFeedback()
+
+    group_d = dict()
+    for i, (th, k) in enumerate(combos):
+        group_d.setdefault(th, list()).append(i)
+
+    with SharedArrays() as sa:
+        sa.put('dem_ar', dem_ar)
+        sa.put('inun_mask', inun_mask)
+        if not line_mask is None:
+            sa.put('line_mask', line_mask)
+        res_ar = scratch.empty('sweep', (len(combos),) + dem_ar.shape, dtype=np.float32, fill=np.nan)
+        res_ar.flush()
+
+        with ProcessPoolExecutor(max_workers=min(get_max_workers(max_workers), len(group_d)),
+                                 initializer=_init_worker,
+                                 initargs=(sa.desc_d, (), kwargs)) as pool:
+            futures = [pool.submit(_run_sweep_group, [combos[i] for i in idx], idx, res_ar.filename)
+                       for idx in group_d.values()]
+            for i, future in enumerate(as_completed(futures)):
+                future.result()
+                feedback.pushInfo(f'({i + 1}/{len(futures)}) sweep groups finished')
+
+    return res_ar
+
+
+def _run_sweep_group(combos, idx, res_fp):
+    """sweep a group and write its bands into the stack (shared file mapping)"""
+    from .sweep import sweep_array
+    res_ar = np.load(res_fp, mmap_mode='r+')
+    res_ar[idx] = sweep_array(_worker_d['dem_ar'], _worker_d['inun_mask'], _worker_d.get('line_mask', None),
+                              combos, **_worker_d['kwargs'])
+    res_ar.flush()
+    return idx
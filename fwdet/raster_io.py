@@ -0,0 +1,552 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+GDAL/OGR reading, rasterizing and writing for the in-memory engine
+
+grid metadata is passed around as a plain dict (meta_d):
+    transform: GDAL geotransform tuple
+    shape: (nrows, ncols)
+    crs: WKT string
+'''
+
+import math
+import numpy as np
+from osgeo import gdal, ogr, osr
+
+gdal.UseExceptions()
+ogr.UseExceptions()
+
+NODATA = -9999.0
+
+#rows per GDAL read in read_window
+read_block_rows = 1024
+
+#creation options for throwaway intermediates (no compression)
+scratch_options = ('COMPRESS=NONE', 'TILED=YES', 'BIGTIFF=IF_SAFER')
+
+#Cloud-Optimized GeoTIFF defaults. see write_cog
+cog_kwargs_default = dict(codec='DEFLATE', level=None, predictor=None, blocksize=512, overviews=True,
+                          resampling='AVERAGE', threads='ALL_CPUS')
+
+
+def open_raster(fp):
+    """open a raster for reading
+
+    Returns
+    ---------
+    ds: gdal.Dataset
+    meta_d: dict
+    """
+    ds = gdal.Open(fp, gdal.GA_ReadOnly)
+    assert not ds is None, f'failed to open raster \'{fp}\''
+
+    meta_d = {'transform': ds.GetGeoTransform(), 'shape': (ds.RasterYSize, ds.RasterXSize),
+              'crs': ds.GetProjection()}
+
+    return ds, meta_d
+
+
+def read_raster(fp, band=1):
+    """load a single band raster into a float32 array (NoData as np.nan)
+
+    Returns
+    ---------
+    ar: np.ndarray
+    meta_d: dict
+    """
+    ds, meta_d = open_raster(fp)
+    ar = read_window(ds, 0, 0, *meta_d['shape'], band=band)
+    ds = None
+
+    return ar, meta_d
+
+
+def read_window(ds, r0, c0, nrows, ncols, band=1, out=None):
+    """read a window of a dataset into a float32 array (NoData as np.nan)
+
+    the window may extend past the raster (e.g., halos). these cells are np.nan.
+    rows are read in blocks of read_block_rows (the native dtype copy is one block)
+
+    Params
+    ---------
+    out: np.ndarray, optional
+        float32 (nrows, ncols) array to fill (e.g., a memory map. see scratch.ScratchStore)
+    """
+    if out is None:
+        ar = np.full((nrows, ncols), np.nan, dtype=np.float32)
+    else:
+        assert out.shape == (nrows, ncols) and out.dtype == np.float32, f'bad out array {out.shape} {out.dtype}'
+        ar = out
+        ar[:] = np.nan
+
+    #intersection with the raster
+    rr0, cc0 = max(r0, 0), max(c0, 0)
+    rr1, cc1 = min(r0 + nrows, ds.RasterYSize), min(c0 + ncols, ds.RasterXSize)
+    if rr1 <= rr0 or cc1 <= cc0:
+        return ar
+
+    bnd = ds.GetRasterBand(band)
+    for br0 in range(rr0, rr1, read_block_rows):
+        br1 = min(br0 + read_block_rows, rr1)
+        ar[br0 - r0:br1 - r0, cc0 - c0:cc1 - c0] = _read_block(bnd, br0, cc0, br1 - br0, cc1 - cc0)
+    return ar
+
+
+def _read_block(bnd, r0, c0, nrows, ncols):
+    sub_ar = bnd.ReadAsArray(c0, r0, ncols, nrows).astype(np.float32)
+
+    nodata = bnd.GetNoDataValue()
+    if nodata is not None:
+        sub_ar[sub_ar == np.float32(nodata)] = np.nan
+
+    #quantized bands (see write_cog)
+    scale, offset = bnd.GetScale(), bnd.GetOffset()
+    if (scale not in (None, 1.0)) or (offset not in (None, 0.0)):
+        sub_ar = (sub_ar * (scale or 1.0) + (offset or 0.0)).astype(np.float32)
+    return sub_ar
+
+
+def get_window_meta(meta_d, r0, c0, nrows, ncols):
+    """grid metadata of a window (r0, c0 may be negative)"""
+    gt = meta_d['transform']
+    return {'transform': (gt[0] + c0 * gt[1] + r0 * gt[2], gt[1], gt[2],
+                          gt[3] + c0 * gt[4] + r0 * gt[5], gt[4], gt[5]),
+            'shape': (nrows, ncols), 'crs': meta_d['crs']}
+
+
+def get_extent_window(meta_d, extent, halo=0):
+    """window (r0, c0, nrows, ncols) of the grid covering an extent (xmin, xmax, ymin, ymax)
+
+    snapped outwards to the cells, padded by halo cells and clipped to the grid"""
+    gt = meta_d['transform']
+    xmin, xmax, ymin, ymax = extent
+    cs = sorted([(xmin - gt[0]) / gt[1], (xmax - gt[0]) / gt[1]])
+    rs = sorted([(ymin - gt[3]) / gt[5], (ymax - gt[3]) / gt[5]])
+
+    nrows, ncols = meta_d['shape']
+    r0, r1 = max(int(math.floor(rs[0])) - halo, 0), min(int(math.ceil(rs[1])) + halo, nrows)
+    c0, c1 = max(int(math.floor(cs[0])) - halo, 0), min(int(math.ceil(cs[1])) + halo, ncols)
+    assert r1 > r0 and c1 > c0, f'extent {extent} does not overlap the grid'
+
+    return r0, c0, r1 - r0, c1 - c0
+
+
+def open_window(fp, extent=None, halo=0, ofp=''):
+    """open the window of a raster covering extent (see get_extent_window) as a VRT
+
+    virtual: no pixels are copied, and the window is on the source grid. works on
+    any GDAL source (e.g., VRT mosaics)
+
+    Params
+    ---------
+    ofp: str
+        write the VRT to this file ('': in memory)
+
+    Returns
+    ---------
+    ds: gdal.Dataset
+    meta_d: dict
+    """
+    ds, meta_d = open_raster(fp)
+    if extent is None:
+        return ds, meta_d
+
+    r0, c0, nrows, ncols = get_extent_window(meta_d, extent, halo=halo)
+    vds = gdal.Translate(ofp, ds, format='VRT', srcWin=[c0, r0, ncols, nrows])
+    assert not vds is None, f'failed to open the window of \'{fp}\''
+    return vds, get_window_meta(meta_d, r0, c0, nrows, ncols)
+
+
+def read_raster_like(fp, meta_d, band=1, resampleAlg='near'):
+    """load a raster resampled onto the grid of meta_d (e.g., a cost raster onto the clipped DEM)"""
+    gt = meta_d['transform']
+    nrows, ncols = meta_d['shape']
+    bounds = (gt[0], gt[3] + nrows * gt[5], gt[0] + ncols * gt[1], gt[3])
+
+    ds = gdal.Warp('', fp, format='MEM', outputBounds=bounds, width=ncols, height=nrows,
+                   dstSRS=meta_d['crs'], resampleAlg=resampleAlg, outputType=gdal.GDT_Float32,
+                   dstNodata=NODATA)
+    assert not ds is None, f'failed to warp raster \'{fp}\''
+
+    ar = ds.GetRasterBand(band).ReadAsArray().astype(np.float32)
+    ar[ar == np.float32(NODATA)] = np.nan
+    ds = None
+
+    return ar
+
+
+def write_raster(ar, ofp, meta_d, nodata=NODATA, driver='GTiff',
+                 options=('COMPRESS=DEFLATE', 'TILED=YES'),
+                 decimals=None):
+    """write an array (NoData as np.nan) to a single band float32 raster
+
+    decimals: rounds the values as they are written (see write_window)"""
+    assert ar.shape == tuple(meta_d['shape']), f'shape mismatch on {ofp}'
+
+    ds = create_raster(ofp, meta_d, nodata=nodata, driver=driver, options=options)
+    write_window(ds, ar, 0, 0, nodata=nodata, decimals=decimals)
+    ds.FlushCache()
+    ds = None
+
+    return ofp
+
+
+def write_raster_stack(ar, ofp, meta_d, band_names=None, nodata=NODATA, driver='GTiff',
+                       options=('COMPRESS=DEFLATE', 'TILED=YES', 'INTERLEAVE=BAND'),
+                       decimals=None):
+    """write a 3D array (band, row, col) to a multi-band float32 raster
+
+    decimals: rounds the values as they are written (see write_window)"""
+    assert ar.shape[1:] == tuple(meta_d['shape']), f'shape mismatch on {ofp}'
+
+    ds = create_raster(ofp, meta_d, nodata=nodata, driver=driver, options=options, bands=ar.shape[0])
+    for i, band_ar in enumerate(ar):
+        write_window(ds, band_ar, 0, 0, nodata=nodata, band=i + 1, decimals=decimals)
+        if not band_names is None:
+            ds.GetRasterBand(i + 1).SetDescription(str(band_names[i]))
+    ds.FlushCache()
+    ds = None
+
+    return ofp
+
+
+def create_raster(ofp, meta_d, nodata=NODATA, driver='GTiff',
+                  options=('COMPRESS=DEFLATE', 'TILED=YES', 'BIGTIFF=IF_SAFER'),
+                  bands=1, dtype=gdal.GDT_Float32):
+    """create an empty raster (float32 by default) for windowed writing"""
+    nrows, ncols = meta_d['shape']
+    ds = gdal.GetDriverByName(driver).Create(ofp, ncols, nrows, bands, dtype,
+                                             options=list(options))
+    assert not ds is None, f'failed to create {ofp}'
+    ds.SetGeoTransform(meta_d['transform'])
+    ds.SetProjection(meta_d['crs'])
+    for i in range(bands):
+        ds.GetRasterBand(i + 1).SetNoDataValue(nodata)
+
+    return ds
+
+
+def write_cog(ar, ofp, meta_d,
+              codec='DEFLATE',
+              level=None,
+              predictor=None,
+              blocksize=512,
+              overviews=True,
+              resampling='AVERAGE',
+              threads='ALL_CPUS',
+              quantize=None,
+              quantize_dtype='uint16',
+              quantize_offset=0.0,
+              decimals=None,
+              nodata=NODATA,
+              ):
+    """write an array (NoData as np.nan) to a Cloud-Optimized GeoTIFF
+
+    tiled, w/ internal overviews, compressed on GDAL's worker threads
+
+    Params
+    ---------
+    codec: str
+        COMPRESS of the COG driver (DEFLATE, ZSTD, LZW, LERC, NONE, ...)
+    level: int, optional
+        compression level
+    predictor: str, optional
+        YES, NO, STANDARD or FLOATING_POINT. defaults to FLOATING_POINT for float32
+        and STANDARD for quantized outputs (none for codec=NONE)
+    overviews: bool
+        build internal overviews (resampled w/ resampling)
+    threads: str or int
+        NUM_THREADS for the compression and overviews
+    quantize: float, optional
+        store as quantize_dtype multiples of quantize (e.g., 0.01 for centimetres) w/
+        the scale in the band metadata. see encoding.quantize
+    quantize_dtype: str
+        uint16 (e.g., depths) or int32 (e.g., elevations in millimetres)
+    quantize_offset: float
+        fixed offset subtracted before scaling
+    decimals: int, optional
+        round float outputs as they are written
+    """
+    nrows, ncols = meta_d['shape']
+    assert ar.shape == (nrows, ncols), f'shape mismatch on {ofp}'
+    enc_d = dict(quantize=quantize, quantize_dtype=quantize_dtype, quantize_offset=quantize_offset,
+                 decimals=decimals, nodata=nodata)
+
+    src_ds = _mem_raster(meta_d, dtype=_get_encoded_dtype(quantize, quantize_dtype))
+    _set_encoding(src_ds, **enc_d)
+    _write_encoded(src_ds, ar, 0, 0, **enc_d)
+
+    return _create_cog(src_ds, ofp, codec=codec, level=level, predictor=predictor, blocksize=blocksize,
+                       overviews=overviews, resampling=resampling, threads=threads)
+
+
+def _get_encoded_dtype(quantize, quantize_dtype):
+    if quantize is None:
+        return gdal.GDT_Float32
+    return {'uint16': gdal.GDT_UInt16, 'int32': gdal.GDT_Int32}[quantize_dtype]
+
+
+def _set_encoding(ds, quantize=None, quantize_dtype='uint16', quantize_offset=0.0, decimals=None, nodata=NODATA):
+    """NoData (and the scale and offset of quantized bands). see write_cog"""
+    band = ds.GetRasterBand(1)
+    if quantize is None:
+        band.SetNoDataValue(nodata)
+        return
+    from .encoding import get_nodata
+    band.SetNoDataValue(int(get_nodata(np.dtype(quantize_dtype))))
+    band.SetScale(quantize)
+    band.SetOffset(quantize_offset)
+
+
+def _write_encoded(ds, ar, r0, c0, quantize=None, quantize_dtype='uint16', quantize_offset=0.0, decimals=None,
+                   nodata=NODATA):
+    """write_window, quantized if quantize is set (see write_cog)"""
+    if quantize is None:
+        return write_window(ds, ar, r0, c0, nodata=nodata, decimals=decimals)
+    from .encoding import quantize as _quantize
+    q_ar, _ = _quantize(ar, scale=quantize, offset=quantize_offset, dtype=np.dtype(quantize_dtype))
+    ds.GetRasterBand(1).WriteArray(q_ar, c0, r0)
+
+
+def _create_cog(src_ds, ofp, codec, level, predictor, blocksize, overviews, resampling, threads):
+    """COG driver copy of a dataset (the driver is CreateCopy only)"""
+    if predictor is None and codec != 'NONE':
+        is_float = src_ds.GetRasterBand(1).DataType in (gdal.GDT_Float32, gdal.GDT_Float64)
+        predictor = 'FLOATING_POINT' if is_float else 'STANDARD'
+
+    options = [f'COMPRESS={codec}', f'BLOCKSIZE={blocksize}', f'NUM_THREADS={threads}', 'BIGTIFF=IF_SAFER',
+               f'OVERVIEWS={"AUTO" if overviews else "NONE"}', f'OVERVIEW_RESAMPLING={resampling}']
+    if not level is None:
+        options.append(f'LEVEL={level}')
+    if not predictor is None:
+        options.append(f'PREDICTOR={predictor}')
+
+    ods = gdal.GetDriverByName('COG').CreateCopy(ofp, src_ds, options=options)
+    assert not ods is None, f'failed to write COG {ofp}'
+    ods = None
+
+    return ofp
+
+
+def write_output(ar, ofp, meta_d, cog_kwargs=None, decimals=None):
+    """write_raster, or write_cog w/ cog_kwargs (see cog_kwargs_default)"""
+    if cog_kwargs is None:
+        return write_raster(ar, ofp, meta_d, decimals=decimals)
+    if not decimals is None:
+        cog_kwargs = dict(cog_kwargs, decimals=decimals)
+    return write_cog(ar, ofp, meta_d, **cog_kwargs)
+
+
+def to_cog(fp, ofp, cog_kwargs=None):
+    """re-write a raster as a COG (e.g., an output written in windows by the tiled mode)
+
+    streamed by GDAL. quantized or rounded outputs are first encoded one row block
+    at a time (read_block_rows) into a scratch GeoTIFF next to ofp (memory does
+    not scale w/ the raster)"""
+    kwargs = dict(cog_kwargs_default, **({} if cog_kwargs is None else cog_kwargs))
+    enc_d = {k: kwargs.pop(k) for k in ('quantize', 'quantize_dtype', 'quantize_offset', 'decimals') if k in kwargs}
+
+    src_ds, meta_d = open_raster(fp)
+    if enc_d.get('quantize', None) is None and enc_d.get('decimals', None) is None:
+        return _create_cog(src_ds, ofp, **kwargs)
+
+    nrows, ncols = meta_d['shape']
+    tmp_fp = f'{ofp}.scratch.tif'
+    tmp_ds = create_raster(tmp_fp, meta_d, options=scratch_options,
+                           dtype=_get_encoded_dtype(enc_d.get('quantize', None), enc_d.get('quantize_dtype', 'uint16')))
+    try:
+        _set_encoding(tmp_ds, **enc_d)
+        for r0 in range(0, nrows, read_block_rows):
+            n = min(read_block_rows, nrows - r0)
+            _write_encoded(tmp_ds, read_window(src_ds, r0, 0, n, ncols), r0, 0, **enc_d)
+        tmp_ds.FlushCache()
+        return _create_cog(tmp_ds, ofp, **kwargs)
+    finally:
+        tmp_ds, src_ds = None, None
+        gdal.GetDriverByName('GTiff').Delete(tmp_fp)
+
+
+def write_window(ds, ar, r0, c0, nodata=NODATA, band=1, decimals=None):
+    """write an array (NoData as np.nan) into a window of a dataset
+
+    decimals: round the values in the same pass (no separate rounding step)"""
+    if not decimals is None:
+        ar = np.round(ar, decimals)
+    ds.GetRasterBand(band).WriteArray(np.where(np.isnan(ar), nodata, ar).astype(np.float32), c0, r0)
+
+
+def _mem_raster(meta_d, dtype=gdal.GDT_Byte):
+    nrows, ncols = meta_d['shape']
+    ds = gdal.GetDriverByName('MEM').Create('', ncols, nrows, 1, dtype)
+    ds.SetGeoTransform(meta_d['transform'])
+    ds.SetProjection(meta_d['crs'])
+    return ds
+
+
+def open_vector(fp):
+    """open an OGR layer from a path or a QGIS-style 'path|layername=name' source"""
+    fp, _, suffix = fp.partition('|')
+    src = ogr.Open(fp)
+    assert not src is None, f'failed to open vector \'{fp}\''
+
+    layerName = None
+    for part in suffix.split('|'):
+        if part.startswith('layername='):
+            layerName = part.split('=', 1)[1]
+
+    layer = src.GetLayerByName(layerName) if layerName else src.GetLayer(0)
+    assert not layer is None, f'no layer found on \'{fp}\''
+
+    #keep the datasource alive with the layer
+    return src, layer
+
+
+def get_vector_extent(fp):
+    """(xmin, xmax, ymin, ymax) of a vector layer (or a raster)"""
+    if is_raster(fp):
+        _, meta_d = open_raster(fp)
+        gt, (nrows, ncols) = meta_d['transform'], meta_d['shape']
+        xs, ys = (gt[0], gt[0] + ncols * gt[1]), (gt[3], gt[3] + nrows * gt[5])
+        return min(xs), max(xs), min(ys), max(ys)
+
+    src, layer = open_vector(fp)
+    extent = layer.GetExtent()
+    del src  #release the dataset
+    return extent
+
+
+def read_inundation(inun_fp, meta_d, lines=True):
+    """inundation mask (and boundary lines) from a polygon vector or a raster
+
+    Returns
+    ---------
+    inun_mask: np.ndarray (bool)
+    line_mask: np.ndarray (bool) or None
+        None for rasters or if lines=False
+    """
+    if is_raster(inun_fp):
+        assert not lines, 'inundation raster has no polygon rings... use an edge boundary_mode'
+        with np.errstate(invalid='ignore'):
+            return read_raster_like(inun_fp, meta_d) > 0, None
+
+    if lines:
+        return rasterize_inundation(inun_fp, meta_d)
+
+    from .rasterize import fill_polygons
+    return fill_polygons(read_edges(inun_fp, meta_d), meta_d['shape']), None
+
+
+def is_raster(fp):
+    """True if GDAL opens fp as a raster"""
+    try:
+        return not gdal.OpenEx(fp.partition('|')[0], gdal.OF_RASTER) is None
+    except RuntimeError:
+        return False
+
+
+def rasterize_inundation(inun_fp, meta_d):
+    """rasterize the inundation polygons and their boundary lines onto the grid
+
+    Returns
+    ---------
+    inun_mask: np.ndarray (bool)
+        cell centres inside the polygons
+    line_mask: np.ndarray (bool)
+        cells touched by the polygon rings (native:polygonstolines + gdal:rasterize)
+    """
+    from .rasterize import rasterize_edges
+    inun_mask, rows, cols = rasterize_edges(read_edges(inun_fp, meta_d), meta_d['shape'])
+
+    line_mask = np.zeros(meta_d['shape'], dtype=bool)
+    line_mask[rows, cols] = True
+    return inun_mask, line_mask
+
+
+def polygonize(fp, ofp, driver='GeoJSON'):
+    """polygons of the valid (not NoData) cells of a raster (gdal.Polygonize, 8-connected)"""
+    ds = gdal.Open(fp)
+    band = ds.GetRasterBand(1)
+
+    srs = osr.SpatialReference()
+    srs.ImportFromWkt(ds.GetProjection())
+
+    dst = ogr.GetDriverByName(driver).CreateDataSource(ofp)
+    layer = dst.CreateLayer('inundation', srs=srs, geom_type=ogr.wkbPolygon)
+    layer.CreateField(ogr.FieldDefn('value', ogr.OFTInteger))
+
+    gdal.Polygonize(band, band.GetMaskBand(), layer, 0, ['8CONNECTED=8'])
+    dst.FlushCache()
+    dst, ds = None, None
+
+    return ofp
+
+
+def read_edges(inun_fp, meta_d):
+    """polygon ring edges (exterior and interior, all parts) in grid coordinates
+
+    Returns
+    ---------
+    rasterize.Edges
+    """
+    from .rasterize import Edges
+    gt = meta_d['transform']
+    assert gt[2] == 0 and gt[4] == 0, 'rotated grids not supported'
+
+    src, layer = open_vector(inun_fp)
+    _set_spatial_filter(layer, meta_d)
+
+    rings = list()
+    for feat in layer:
+        geom = feat.GetGeometryRef()
+        if geom is None:
+            continue
+        geom = ogr.ForceToMultiPolygon(geom.Clone())
+        for i in range(geom.GetGeometryCount()):
+            poly = geom.GetGeometryRef(i)
+            poly_id = len(rings)  #unique per part
+            for j in range(poly.GetGeometryCount()):
+                xy = np.array(poly.GetGeometryRef(j).GetPoints(), dtype=np.float64)[:, :2]
+                rings.append((poly_id, np.column_stack([(xy[:, 1] - gt[3]) / gt[5], (xy[:, 0] - gt[0]) / gt[1]])))
+
+    del src  #release the dataset
+    return Edges.from_rings(rings)
+
+
+def _set_spatial_filter(layer, meta_d):
+    """only visit features that overlap the grid (e.g., one tile)"""
+    gt = meta_d['transform']
+    nrows, ncols = meta_d['shape']
+    xs, ys = (gt[0], gt[0] + ncols * gt[1]), (gt[3], gt[3] + nrows * gt[5])
+    layer.SetSpatialFilterRect(min(xs), min(ys), max(xs), max(ys))
+
+
+def is_geographic(meta_d):
+    if not meta_d['crs']:
+        return False
+    srs = osr.SpatialReference(wkt=meta_d['crs'])
+    return bool(srs.IsGeographic())
+
+
+def get_cell_size(meta_d, ground=False):
+    """cell size as (dy, dx)
+
+    ground=True converts geographic (degree) cells to metres (one dx per row)"""
+    gt = meta_d['transform']
+    dx, dy = abs(gt[1]), abs(gt[5])
+
+    if ground and is_geographic(meta_d):
+        lat_ar = get_cell_coords(meta_d)[0]
+        m_per_deg = 2 * math.pi * 6371008.8 / 360.0
+        return dy * m_per_deg, dx * m_per_deg * np.cos(np.radians(lat_ar))
+
+    return dy, dx
+
+
+def get_cell_coords(meta_d):
+    """cell centre coordinates as (y per row, x per column)"""
+    gt = meta_d['transform']
+    nrows, ncols = meta_d['shape']
+    return (gt[3] + (np.arange(nrows) + 0.5) * gt[5],
+            gt[0] + (np.arange(ncols) + 0.5) * gt[1])
@@ -0,0 +1,158 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+scanline rasterizer for the inundation polygons (NumPy only)
+
+replaces native:polygonstolines (to a .gpkg) + gdal:rasterize of the lines +
+a second gdal:rasterize of the polygons. the polygon rings (exterior and interior,
+any number of parts) are converted once to edges in grid coordinates, then one
+pass gives:
+    inun_mask: cell centres inside the polygons (even-odd rule per polygon, union
+        across polygons. as gdal:rasterize)
+    boundary cells: cells on the rings (8-connected line per edge, one cell per
+        step along the major axis. as gdal:rasterize of the polylines)
+
+grid coordinates are fractional (row, col) from the top-left corner of the grid
+'''
+
+import numpy as np
+
+
+class Edges(object):
+    """polygon ring edges in grid coordinates
+
+    r0, c0, r1, c1: float64 end points of each edge
+    poly_id: int64 polygon each edge belongs to (holes share their exterior's id)
+    """
+
+    __slots__ = ('r0', 'c0', 'r1', 'c1', 'poly_id')
+
+    def __init__(self, r0, c0, r1, c1, poly_id):
+        self.r0, self.c0 = np.asarray(r0, dtype=np.float64), np.asarray(c0, dtype=np.float64)
+        self.r1, self.c1 = np.asarray(r1, dtype=np.float64), np.asarray(c1, dtype=np.float64)
+        self.poly_id = np.asarray(poly_id, dtype=np.int64)
+
+    @classmethod
+    def from_rings(cls, rings):
+        """build from a list of (poly_id, ring) where ring is an (n, 2) array of (row, col)
+
+        rings are closed if needed"""
+        r0_l, c0_l, r1_l, c1_l, id_l = list(), list(), list(), list(), list()
+        for poly_id, ring in rings:
+            ring = np.asarray(ring, dtype=np.float64)
+            if len(ring) < 2:
+                continue
+            if not np.array_equal(ring[0], ring[-1]):
+                ring = np.vstack([ring, ring[:1]])
+
+            r0_l.append(ring[:-1, 0]), c0_l.append(ring[:-1, 1])
+            r1_l.append(ring[1:, 0]), c1_l.append(ring[1:, 1])
+            id_l.append(np.full(len(ring) - 1, poly_id, dtype=np.int64))
+
+        if len(id_l) == 0:
+            return cls(*[np.empty(0)] * 5)
+
+        return cls(*[np.concatenate(l) for l in (r0_l, c0_l, r1_l, c1_l, id_l)])
+
+    def __len__(self):
+        return len(self.poly_id)
+
+    def subset(self, sel):
+        return Edges(self.r0[sel], self.c0[sel], self.r1[sel], self.c1[sel], self.poly_id[sel])
+
+    def shift(self, dr, dc):
+        """edges relative to a window starting at (dr, dc)"""
+        return Edges(self.r0 - dr, self.c0 - dc, self.r1 - dr, self.c1 - dc, self.poly_id)
+
+    def overlaps(self, shape, pad=1.0):
+        """edges whose bounding box touches the grid"""
+        nrows, ncols = shape
+        return ((np.maximum(self.r0, self.r1) >= -pad) & (np.minimum(self.r0, self.r1) <= nrows + pad) &
+                (np.maximum(self.c0, self.c1) >= -pad) & (np.minimum(self.c0, self.c1) <= ncols + pad))
+
+
+def rasterize_edges(edges, shape):
+    """inundation mask and boundary cells in one pass over the edges
+
+    Returns
+    ---------
+    inun_mask: np.ndarray
+        bool, cell centres inside the polygons
+    rows, cols: np.ndarray
+        int32 boundary cells (sorted row-major, unique)
+    """
+    rows, cols = burn_lines(edges.subset(edges.overlaps(shape)), shape)
+    return fill_polygons(edges, shape), rows, cols
+
+
+def fill_polygons(edges, shape, origin=(0, 0)):
+    """cell centres inside the polygons (bool)
+
+    scanline through each row centre: the sorted edge crossings of each polygon
+    are paired (even-odd) and the spans accumulated in a difference array
+
+    origin: (r0, c0) of a window of the edges' grid. the crossings are computed
+    in the grid coordinates (windows match the full grid exactly. Edges.shift
+    may round differently)"""
+    nrows, ncols = shape
+    or0, oc0 = origin
+    res_ar = np.zeros((nrows, ncols + 1), dtype=np.int32)
+
+    #non-horizontal edges
+    edges = edges.subset(edges.r0 != edges.r1)
+    if len(edges) == 0:
+        return res_ar[:, :ncols] > 0
+
+    #rows whose centre (k + 0.5) is in [lo, hi) of each edge
+    lo, hi = np.minimum(edges.r0, edges.r1), np.maximum(edges.r0, edges.r1)
+    k0 = np.clip(np.ceil(lo - 0.5), or0, or0 + nrows).astype(np.int64)
+    k1 = np.clip(np.ceil(hi - 0.5), or0, or0 + nrows).astype(np.int64)
+    cnt = np.maximum(k1 - k0, 0)
+
+    #one crossing per (edge, row)
+    edge_i = np.repeat(np.arange(len(edges)), cnt)
+    row = np.repeat(k0, cnt) + (np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt))
+    e = edges.subset(edge_i)
+    x = e.c0 + (row + 0.5 - e.r0) * (e.c1 - e.c0) / (e.r1 - e.r0)
+
+    #pair the crossings of each polygon on each row
+    order = np.lexsort((x, row, e.poly_id))
+    row, x = row[order], x[order]
+    row, x0, x1 = row[0::2] - or0, x[0::2], x[1::2]
+
+    #cells whose centre is in [x0, x1)
+    cs = np.clip(np.ceil(x0 - 0.5) - oc0, 0, ncols).astype(np.int64)
+    ce = np.clip(np.ceil(x1 - 0.5) - oc0, 0, ncols).astype(np.int64)
+    np.add.at(res_ar, (row, cs), 1)
+    np.add.at(res_ar, (row, ce), -1)
+
+    return np.cumsum(res_ar, axis=1)[:, :ncols] > 0
+
+
+def burn_lines(edges, shape, origin=(0, 0)):
+    """cells on the edges (8-connected, one per step along the major axis)
+
+    origin: (r0, c0) of a window of the edges' grid (see fill_polygons)
+
+    Returns
+    ---------
+    rows, cols: np.ndarray
+        int32 (sorted row-major, unique)
+    """
+    nrows, ncols = shape
+    dr, dc = edges.r1 - edges.r0, edges.c1 - edges.c0
+
+    #samples per edge
+    cnt = np.ceil(np.maximum(np.abs(dr), np.abs(dc))).astype(np.int64) + 1
+    edge_i = np.repeat(np.arange(len(edges)), cnt)
+    t = (np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)) / np.repeat(np.maximum(cnt - 1, 1), cnt)
+
+    rows = np.floor(edges.r0[edge_i] + t * dr[edge_i]).astype(np.int64) - origin[0]
+    cols = np.floor(edges.c0[edge_i] + t * dc[edge_i]).astype(np.int64) - origin[1]
+
+    inside = (rows >= 0) & (rows < nrows) & (cols >= 0) & (cols < ncols)
+    lin = np.unique(rows[inside] * ncols + cols[inside])
+
+    return (lin // ncols).astype(np.int32), (lin % ncols).astype(np.int32)
@@ -0,0 +1,138 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+per-stage instrumentation and the JSON run report
+
+each stage records
+    wall_s, cpu_s: wall clock and process CPU time
+    peak_rss: cumulative process high-water resident set (bytes) at the end of
+        the stage (ru_maxrss: the peak since the process started, not of the stage)
+    rss_growth: bytes the stage raised peak_rss by (0 if an earlier stage
+        already needed more)
+    cells: cells processed (set by the stage)
+    bytes_read, bytes_written: process I/O during the stage (/proc/self/io.
+        None where unavailable)
+'''
+
+import os, sys, time, datetime
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  #windows
+    resource = None
+
+
+class RunReport(object):
+    """measurements of the stages of one run
+
+    Params
+    ---------
+    feedback: optional
+        each finished stage is logged with pushInfo
+    meta_d:
+        run description stored in the report (inputs, parameters)
+    """
+
+    def __init__(self, feedback=None, **meta_d):
+        self.feedback, self.meta_d, self.stages = feedback, meta_d, list()
+        self.start = datetime.datetime.now()
+        self._wall0, self._cpu0 = time.perf_counter(), time.process_time()
+
+    @contextmanager
+    def stage(self, name, cells=None):
+        """measure the enclosed block. yields the record (e.g., to set cells)"""
+        rec = dict(name=name, cells=cells)
+        io0, rss0 = _get_io(), get_peak_rss()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        except BaseException as e:
+            rec['error'] = repr(e)
+            raise
+        finally:
+            io1 = _get_io()
+            rss1 = get_peak_rss()
+            rec.update(wall_s=time.perf_counter() - wall0, cpu_s=time.process_time() - cpu0,
+                       peak_rss=rss1, rss_growth=None if rss1 is None else rss1 - rss0,
+                       bytes_read=None if io0 is None else io1[0] - io0[0],
+                       bytes_written=None if io0 is None else io1[1] - io0[1])
+            self.stages.append(rec)
+
+            if not self.feedback is None:
+                self.feedback.pushInfo(_format_stage(rec))
+
+    #===========================================================================
+    # outputs
+    #===========================================================================
+    def to_dict(self):
+        import platform
+        return dict(meta=self.meta_d,
+                    start=self.start.isoformat(),
+                    wall_s=time.perf_counter() - self._wall0,
+                    cpu_s=time.process_time() - self._cpu0,
+                    peak_rss=get_peak_rss(),
+                    python=sys.version.split()[0], platform=platform.platform(), cpu_count=os.cpu_count(),
+                    stages=self.stages)
+
+    def write(self, ofp):
+        """write the JSON run report"""
+        import json
+        with open(ofp, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return ofp
+
+    def summary(self):
+        """stage table (share of the summed stage wall time)"""
+        total = sum(rec['wall_s'] for rec in self.stages) or 1.0
+        return '\n'.join([f'{"stage":<16}{"wall_s":>10}{"cpu_s":>10}{"share":>8}{"cum_peak_MB":>13}'
+                          f'{"growth_MB":>11}{"cells":>14}'] + [
+            f'{rec["name"]:<16}{rec["wall_s"]:>10.3f}{rec["cpu_s"]:>10.3f}{rec["wall_s"] / total:>8.1%}'
+            f'{_mb(rec["peak_rss"]):>13}{_mb(rec["rss_growth"]):>11}{"" if rec["cells"] is None else rec["cells"]:>14}'
+            for rec in self.stages])
+
+
+class NullReport(object):
+    """stand-in when no report is requested"""
+
+    @contextmanager
+    def stage(self, name, cells=None):
+        yield dict(name=name, cells=cells)
+
+
+#===============================================================================
+# HELPERS----------
+#===============================================================================
+
+def get_peak_rss():
+    """process high-water resident set (bytes). None where unavailable"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024  #kB on linux
+
+
+def _get_io():
+    """(bytes read, bytes written) by this process so far (linux only)"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            d = dict(line.split(':') for line in f.read().splitlines() if ':' in line)
+    except OSError:
+        return None
+    return int(d['rchar']), int(d['wchar'])
+
+
+def _mb(v):
+    return '' if v is None else f'{v / 2 ** 20:.1f}'
+
+
+def _format_stage(rec):
+    txt = f'    [{rec["name"]}] {rec["wall_s"]:.3f}s wall, {rec["cpu_s"]:.3f}s cpu, ' \
+          f'cumulative peak {_mb(rec["peak_rss"])} MB (+{_mb(rec["rss_growth"])})'
+    if not rec['cells'] is None:
+        txt += f', {rec["cells"]} cells'
+    if not rec['bytes_read'] is None:
+        txt += f', {_mb(rec["bytes_read"])}/{_mb(rec["bytes_written"])} MB read/written'
+    return txt
@@ -0,0 +1,109 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+scratch store for intermediate arrays
+
+intermediates are allocated as uncompressed memory-mapped .npy files in a
+private run directory on the scratch volume. later stages get the maps
+themselves (zero-copy views) and the directory is removed when the store is
+closed (or, as a fallback, when it is garbage collected or the interpreter exits).
+
+the scratch volume is the scratch_dir argument, else the FWDET_SCRATCH
+environment variable, else the system temporary directory
+'''
+
+import os, shutil, tempfile, uuid, weakref
+import numpy as np
+
+scratch_dir_default = os.environ.get('FWDET_SCRATCH', None)
+
+
+class ScratchStore(object):
+    """named memory-mapped arrays freed together
+
+    use as a context manager: the run directory is removed on exit
+
+    Params
+    ---------
+    scratch_dir: str, optional
+        volume for the run directory. see scratch_dir_default
+    """
+
+    def __init__(self, scratch_dir=None, prefix='fwdet_'):
+        if scratch_dir is None: scratch_dir = scratch_dir_default
+        if not scratch_dir is None:
+            os.makedirs(scratch_dir, exist_ok=True)
+
+        self.run_dir = tempfile.mkdtemp(prefix=prefix, dir=scratch_dir)
+        self.ar_d = dict()
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.run_dir, True)
+
+    #===========================================================================
+    # arrays
+    #===========================================================================
+    def empty(self, name, shape, dtype=np.float32, fill=None):
+        """allocate a new map (zero filled unless fill is given)"""
+        assert not name in self.ar_d, f'scratch array \'{name}\' already allocated'
+        ar = np.lib.format.open_memmap(self.path(name, suffix='.npy'), mode='w+', dtype=dtype, shape=tuple(shape))
+        if not fill is None:
+            ar[...] = fill
+
+        self.ar_d[name] = ar
+        return ar
+
+    def put(self, name, ar):
+        """copy an array into a new map"""
+        res_ar = self.empty(name, ar.shape, dtype=ar.dtype)
+        res_ar[...] = ar
+        return res_ar
+
+    def get(self, name):
+        return self.ar_d[name]
+
+    def __getitem__(self, name):
+        return self.ar_d[name]
+
+    def __contains__(self, name):
+        return name in self.ar_d
+
+    def release(self, name):
+        """free one array before the end of the run"""
+        ar = self.ar_d.pop(name)
+        fp = ar.filename
+        del ar
+        os.remove(fp)
+
+    def nbytes(self):
+        return sum(ar.nbytes for ar in self.ar_d.values())
+
+    #===========================================================================
+    # files
+    #===========================================================================
+    def path(self, name=None, suffix='.tif'):
+        """new file path in the run directory (e.g., for GDAL outputs). the file is not created"""
+        name = uuid.uuid4().hex if name is None else name
+        return os.path.join(self.run_dir, f'{name}{suffix}')
+
+    #===========================================================================
+    # cleanup
+    #===========================================================================
+    def close(self):
+        """drop the maps and remove the run directory
+
+        views held by the caller remain valid on POSIX until they are released"""
+        for ar in self.ar_d.values():
+            ar.flush()
+        self.ar_d = dict()
+        self._finalizer()
+
+    @property
+    def closed(self):
+        return not self._finalizer.alive
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
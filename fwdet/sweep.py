@@ -0,0 +1,204 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+parameter sweep over slope threshold x smoothing iterations
+
+shares the intermediates that do not depend on the parameters:
+    boundary cells, ocean filter and slope: computed once
+    smoothing: evaluated incrementally (iteration k seeds iteration k+1)
+    slope threshold: a mask over the sorted boundary slopes
+    allocation: once per distinct set of surviving boundary cells (the nearest
+        boundary cell depends on the cell positions only, not on their values)
+
+see the T01-T31 test matrix of FwDET2p1_GEE.txt (gee_tests)
+'''
+
+import numpy as np
+
+from . import boundary
+from .boundary import BoundaryCells
+from .allocation import nearest_boundary
+from .focal import focal_mean
+from .encoding import nonzero
+
+#FwDET2p1_GEE.txt test matrix {name: (slopeTH, numIterations)}. filters off are 0
+gee_tests = {f'T{i + 1:02d}': (th, k) for i, (th, k) in enumerate(
+    [(th, k) for th in (0.5, 1.0, 1.5, 2.0, 2.5) for k in range(1, 6)] + [(0.0, k) for k in range(1, 6)] + [(0.0, 0)])}
+
+
+def get_combos(slopeTH_l, numIterations_l):
+    """every (slopeTH, numIterations) combination"""
+    return [(float(th), int(k)) for th in slopeTH_l for k in numIterations_l]
+
+
+def sweep_array(dem_ar, inun_mask, line_mask, combos,
+                grow_metric='euclidean',
+                boundary_mode='polyline',
+                connectivity=8,
+                slope_cell_size=(1.0, 1.0),
+                grow_cell_size=(1.0, 1.0),
+                grow_coords=None,
+                neighborhood_size=5,
+                output='water_depth',
+                scratch=None,
+                feedback=None,
+                ):
+    """FwDET for many (slopeTH, numIterations) combinations. see engine.fwdet_array
+
+    Params
+    ------------
+    combos: list
+        (slopeTH, numIterations) of each band. see get_combos and gee_tests
+    output: str
+        'water_depth' or 'water_depth_filtered'
+    scratch: scratch.ScratchStore, optional
+        allocate the stack as a memory map in the store (freed w/ the store)
+
+    Returns
+    -----------
+    np.ndarray
+        float32 stack (band, row, col). one band per combo
+    """
+    from .engine import LogFeedback, OUTPUT_WSH, OUTPUT_WSH_SMOOTH
+    if feedback is None: feedback = LogFeedback()
+    assert output in (OUTPUT_WSH, OUTPUT_WSH_SMOOTH), f'unrecognized output \'{output}\''
+    assert grow_metric != 'cost', 'cost allocation not supported by the sweep'
+
+    if boundary_mode != 'polyline':
+        line_mask = boundary.mask_edge(inun_mask, side=boundary_mode, connectivity=connectivity)
+
+    #===========================================================================
+    # parameter independent
+    #===========================================================================
+    bnd = BoundaryCells.from_mask(line_mask, dem_ar)
+    feedback.pushInfo(f'sweeping {len(combos)} combinations on {len(bnd)} shore line cells')
+
+    with np.errstate(invalid='ignore'):
+        ocean_keep = boundary.focal_min(dem_ar, bnd, size=neighborhood_size, circular=True) > 0
+
+    #slopes sorted once (NoData never passes a threshold)
+    slope_order, slope_sorted = None, None
+    if any(th > 0.0 for th, _ in combos):
+        slope = boundary.slope_percent(dem_ar, bnd, slope_cell_size)
+        slope = np.where(np.isnan(slope), -np.inf, slope)
+        slope_order = np.argsort(slope, kind='stable')
+        slope_sorted = slope[slope_order]
+
+    #inundated cells
+    rows, cols = nonzero(inun_mask & ~np.isnan(dem_ar))
+    dem_v = dem_ar[rows, cols]
+
+    #===========================================================================
+    # incremental smoothing
+    #===========================================================================
+    values_d, k_prev, bnd_k = dict(), 0, bnd
+    for k in sorted(set(k for _, k in combos)):
+        bnd_k = boundary.smooth(bnd_k, k - k_prev, size=neighborhood_size)
+        values_d[k], k_prev = bnd_k.values, k
+
+    #===========================================================================
+    # combinations
+    #===========================================================================
+    shape = (len(combos),) + dem_ar.shape
+    if scratch is None:
+        res_ar = np.full(shape, np.nan, dtype=np.float32)
+    else:
+        res_ar = scratch.empty('sweep', shape, dtype=np.float32, fill=np.nan)
+    pos_d = dict()  #allocation per distinct surviving set
+    for i, (th, k) in enumerate(combos):
+        keep = ocean_keep & ~np.isnan(values_d[k])
+        if th > 0.0:
+            slope_keep = np.zeros(len(bnd), dtype=bool)
+            slope_keep[slope_order[np.searchsorted(slope_sorted, th, side='right'):]] = True
+            keep &= slope_keep
+
+        sel = np.flatnonzero(keep)
+        key = sel.tobytes()
+        if not key in pos_d:
+            feedback.pushInfo(f'allocating from {len(sel)} boundary cells (set {len(pos_d) + 1})')
+            pos_d[key] = sel[nearest_boundary(bnd.subset(sel), rows, cols, grow_metric,
+                                              cell_size=grow_cell_size, coords=grow_coords, feedback=feedback)]
+
+        diff_ar = values_d[k][pos_d[key]] - dem_v
+        with np.errstate(invalid='ignore'):
+            res_ar[i, rows, cols] = np.where(diff_ar > 0, diff_ar, np.nan)
+
+        if output == OUTPUT_WSH_SMOOTH:
+            res_ar[i] = np.where(np.isnan(res_ar[i]), np.nan, focal_mean(res_ar[i], size=3))
+
+    feedback.pushInfo(f'finished {len(combos)} combinations w/ {len(pos_d)} allocations')
+    return res_ar
+
+
+def run_sweep(dem_fp, inun_fp, combos, ofp,
+              stack=False,
+              band_names=None,
+              grow_metric='euclidean',
+              boundary_mode='polyline',
+              connectivity=8,
+              neighborhood_size=5,
+              output='water_depth',
+              max_workers=None,
+              scratch_dir=None,
+              halo=0,
+              feedback=None,
+              ):
+    """sweep on files. see sweep_array
+
+    only the DEM window covering the inundation extent is read (as engine.run_algo)
+
+    Params
+    ------------
+    ofp: str
+        multi-band raster (one band per combo). if stack=True, one raster per
+        combo is written as {ofp base}_{band name}.tif
+    band_names: list, optional
+        defaults to slope{slopeTH}_iter{numIterations}
+    max_workers: int, optional
+        run the slope threshold groups on a process pool. see parallel.sweep_parallel
+    scratch_dir: str, optional
+        volume for the (combos x rows x cols) stack. see scratch.ScratchStore
+    halo: int
+        cells added around the extent window
+
+    Returns
+    -----------
+    list
+        filepaths written
+    """
+    import os
+    from . import raster_io
+    from .batch import DemProducts
+    from .engine import output_decimals
+    from .scratch import ScratchStore
+
+    if band_names is None:
+        band_names = [f'slope{th:g}_iter{k}' for th, k in combos]
+    assert len(band_names) == len(combos)
+
+    prod = DemProducts.from_file(dem_fp, extent=raster_io.get_vector_extent(inun_fp), halo=halo,
+                                 neighborhood_size=neighborhood_size)
+    inun_mask, line_mask = raster_io.read_inundation(inun_fp, prod.meta_d, lines=boundary_mode == 'polyline')
+
+    kwargs = dict(grow_metric=grow_metric, boundary_mode=boundary_mode, connectivity=connectivity,
+                  slope_cell_size=prod.slope_cell_size, grow_cell_size=prod.grow_cell_size,
+                  grow_coords=prod.grow_coords, neighborhood_size=neighborhood_size, output=output)
+
+    with ScratchStore(scratch_dir) as scratch:
+        if not max_workers is None and max_workers > 1:
+            from .parallel import sweep_parallel
+            res_ar = sweep_parallel(prod.dem_ar, inun_mask, line_mask, combos, scratch,
+                                    max_workers=max_workers, feedback=feedback, **kwargs)
+        else:
+            res_ar = sweep_array(prod.dem_ar, inun_mask, line_mask, combos, scratch=scratch, feedback=feedback,
+                                 **kwargs)
+
+        if not stack:
+            return [raster_io.write_raster_stack(res_ar, ofp, prod.meta_d, band_names=band_names,
+                                                 decimals=output_decimals)]
+
+        base, ext = os.path.splitext(ofp)
+        return [raster_io.write_raster(ar, f'{base}_{name}{ext}', prod.meta_d, decimals=output_decimals)
+                for ar, name in zip(res_ar, band_names)]
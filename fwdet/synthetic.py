@@ -0,0 +1,186 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+synthetic flood scenarios w/ a known water surface
+
+procedural DEMs of any size (kinds):
+    valley: V-shaped valley sloping down the rows
+    floodplain: channel in a flat floodplain between steep valley walls
+    coastal: slope from below 0 m (sea) up to the hills. the sea is flooded,
+        so the ocean filter is exercised
+
+every cell is a function of its global (row, col) and the seed only: any
+window of a scenario can be generated on its own (identical to the same
+window of the full grid). gigapixel cases are streamed to disk one row block
+at a time (see write_scenario)
+
+the true water surface (wse) is a smooth function. cells below it are
+inundated (inun_mask) and their true depth is wse - dem. see score for the
+depth error of a FwDET result
+'''
+
+import os
+import numpy as np
+
+kinds = ('valley', 'floodplain', 'coastal')
+
+
+def make_scenario(shape, kind='valley', seed=0, noise=0.1, r0=0, nrows=None):
+    """scenario arrays (optionally only the row block r0:r0+nrows)
+
+    Params
+    ---------
+    shape: tuple
+        (nrows, ncols) of the full scenario
+    noise: float
+        standard deviation (m) of the white noise on the DEM
+
+    Returns
+    ---------
+    dict
+        dem: float32 elevations (m)
+        wse: float32 true water surface (NoData off the inundation)
+        inun_mask: bool, dem < water surface
+        depth: float32 true depths (NoData off the inundation)
+    """
+    if not kind in kinds:
+        raise KeyError(f'unrecognized scenario kind \'{kind}\'. expected one of {kinds}')
+    nrows_full, ncols = shape
+    if nrows is None: nrows = nrows_full - r0
+    assert 0 <= r0 and r0 + nrows <= nrows_full, f'row block {r0}:{r0 + nrows} outside {shape}'
+
+    #normalized coordinates: v down the rows [0, 1], u across the columns [-0.5, 0.5]
+    i = np.arange(r0, r0 + nrows, dtype=np.float64)[:, None]
+    j = np.arange(ncols, dtype=np.float64)[None, :]
+    v, u = i / nrows_full, (j + 0.5) / ncols - 0.5
+
+    dem, wse = _get_surfaces(kind, u, v)
+    dem = dem + _get_undulation(i, j, shape, seed) + _get_white_noise(r0, nrows, ncols, seed, noise)
+
+    inun_mask = dem < wse
+    wse = np.where(inun_mask, wse, np.nan)
+    return dict(dem=dem.astype(np.float32), wse=wse.astype(np.float32), inun_mask=inun_mask,
+                depth=(wse - dem).astype(np.float32))
+
+
+def _get_surfaces(kind, u, v):
+    """smooth DEM and water surface of each kind (broadcast against each other)"""
+    au = np.abs(u)
+    fall = 5.0 * (1.0 - v)  #down-valley gradient
+
+    if kind == 'valley':
+        return 20.0 * au + fall, 3.0 + fall
+
+    if kind == 'floodplain':
+        channel = 3.0 * np.maximum(0.0, 1.0 - au / 0.05)
+        walls = 40.0 * np.maximum(au - 0.35, 0.0)
+        return 2.0 * au + walls - channel + fall, 0.6 + fall
+
+    #coastal: sea on the first columns. constant surge level
+    return -5.0 + 30.0 * (u + 0.5), 1.5
+
+
+def _get_undulation(i, j, shape, seed, amplitude=0.5, nwaves=4):
+    """low frequency terrain (sum of plane waves w/ seeded frequencies and phases)"""
+    rng = np.random.default_rng([seed, 0])
+    freq_ar = rng.uniform(1.0, 6.0, size=(nwaves, 2))
+    phase_ar = rng.uniform(0.0, 2 * np.pi, size=nwaves)
+
+    res_ar = np.zeros((i.shape[0], j.shape[1]))
+    for (fi, fj), phase in zip(freq_ar, phase_ar):
+        res_ar += np.sin(2 * np.pi * (fi * i / shape[0] + fj * j / shape[1]) + phase)
+    return amplitude / nwaves * res_ar
+
+
+def _get_white_noise(r0, nrows, ncols, seed, noise):
+    """one generator per row (reproducible for any row block)"""
+    if noise == 0.0:
+        return 0.0
+    return np.vstack([np.random.default_rng([seed, 1, r]).normal(0.0, noise, size=ncols)
+                      for r in range(r0, r0 + nrows)])
+
+
+#===============================================================================
+# files----------
+#===============================================================================
+
+def get_meta(shape, cell_size=10.0, origin=(500000.0, 4000000.0), epsg=32617):
+    """grid metadata (see raster_io.open_raster). origin is the top-left corner"""
+    from osgeo import osr
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(epsg)
+    return dict(transform=(origin[0], cell_size, 0.0, origin[1], 0.0, -cell_size), shape=tuple(shape),
+                crs=srs.ExportToWkt())
+
+
+def write_scenario(out_dir, shape, kind='valley', seed=0, noise=0.1,
+                   block_rows=1024,
+                   polygons=False,
+                   feedback=None,
+                   **kwargs):
+    """stream a scenario to GeoTIFFs one row block at a time (memory ~ block_rows x ncols)
+
+    Params
+    ---------
+    polygons: bool
+        also polygonize the inundation (GeoJSON)
+    kwargs:
+        grid placement. see get_meta
+
+    Returns
+    ---------
+    dict
+        {'dem', 'inundation', 'wse', 'depth' (, 'polygons'): filepath}
+    """
+    from . import raster_io
+    from .engine import LogFeedback
+    if feedback is None: feedback = LogFeedback()
+    os.makedirs(out_dir, exist_ok=True)
+
+    meta_d = get_meta(shape, **kwargs)
+    ofp_d = {k: os.path.join(out_dir, f'{kind}_{k}.tif') for k in ('dem', 'inundation', 'wse', 'depth')}
+    ds_d = {k: raster_io.create_raster(ofp, meta_d) for k, ofp in ofp_d.items()}
+
+    feedback.pushInfo(f'writing {kind} scenario {shape} to {out_dir}')
+    for r0 in range(0, shape[0], block_rows):
+        d = make_scenario(shape, kind=kind, seed=seed, noise=noise, r0=r0, nrows=min(block_rows, shape[0] - r0))
+        d['inundation'] = np.where(d.pop('inun_mask'), 1.0, np.nan)
+        for k, ds in ds_d.items():
+            raster_io.write_window(ds, d[k], r0, 0)
+
+    for ds in ds_d.values():
+        ds.FlushCache()
+    ds_d = None
+
+    if polygons:
+        ofp_d['polygons'] = raster_io.polygonize(ofp_d['inundation'],
+                                                 os.path.join(out_dir, f'{kind}_inundation.geojson'))
+
+    return ofp_d
+
+
+#===============================================================================
+# scoring----------
+#===============================================================================
+
+def score(depth_ar, true_ar):
+    """depth error of a FwDET result against the true depths
+
+    Returns
+    ---------
+    dict
+        rmse, mae, bias: over cells wet in both
+        hit_rate: share of the truly wet cells given a depth
+        false_rate: share of the given depths on truly dry cells
+    """
+    wet, true_wet = ~np.isnan(depth_ar), ~np.isnan(true_ar)
+    both = wet & true_wet
+    err = depth_ar[both].astype(np.float64) - true_ar[both]
+
+    return dict(rmse=float(np.sqrt(np.mean(err ** 2))) if both.any() else np.nan,
+                mae=float(np.mean(np.abs(err))) if both.any() else np.nan,
+                bias=float(np.mean(err)) if both.any() else np.nan,
+                hit_rate=float(both.sum() / max(true_wet.sum(), 1)),
+                false_rate=float((wet & ~true_wet).sum() / max(wet.sum(), 1)))
@@ -0,0 +1,5 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+'''
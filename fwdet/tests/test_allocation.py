@@ -0,0 +1,161 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for nearest-boundary allocation
+'''
+
+
+import pytest
+import numpy as np
+
+from fwdet.allocation import nearest_index, grow_boundary, grow_cells, BoundaryIndex, _get_grid_func, _get_chord_func
+from fwdet.boundary import BoundaryCells
+
+
+#===============================================================================
+# FIXTURES------------
+#===============================================================================
+
+@pytest.fixture(scope='function')
+def nodata_mask(shape):
+    """sparse random seeds (False)"""
+    rng = np.random.default_rng(seed=10)
+    return rng.random(shape) > 0.02
+
+
+#===============================================================================
+# helpers
+#===============================================================================
+
+def brute_force_dist(nodata_mask, dist_func):
+    """distance from every cell to its nearest seed"""
+    seed_r, seed_c = np.nonzero(~nodata_mask)
+    row_ar, col_ar = np.indices(nodata_mask.shape)
+
+    dist_ar = np.full(nodata_mask.shape, np.inf)
+    for r, c in zip(seed_r, seed_c):
+        np.minimum(dist_ar, dist_func(row_ar, col_ar, r, c), out=dist_ar)
+    return dist_ar
+
+
+def assigned_dist(nodata_mask, dist_func, rows, cols):
+    row_ar, col_ar = np.indices(nodata_mask.shape)
+    return dist_func(row_ar, col_ar, rows, cols)
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+@pytest.mark.parametrize('shape', [(40, 53)])
+@pytest.mark.parametrize('grow_metric, cell_size', [
+    ('euclidean', (1.0, 1.0)),
+    ('euclidean', (2.0, 1.0)),
+    ('squared', (1.0, 1.0)),
+    ('manhattan', (1.0, 1.0)),
+    ('maximum', (1.0, 1.0)),
+    ('manhattan', (1.5, 1.0)),
+    ('maximum', (1.0, 3.0)),
+    ])
+def test_nearest_index(nodata_mask, grow_metric, cell_size):
+    rows, cols = nearest_index(nodata_mask, grow_metric, cell_size=cell_size)
+
+    dist_func = _get_grid_func(grow_metric, *cell_size)
+
+    #assigned seeds
+    assert np.all(~nodata_mask[rows, cols])
+
+    #nearest (ties may pick different seeds)
+    np.testing.assert_allclose(assigned_dist(nodata_mask, dist_func, rows, cols),
+                               brute_force_dist(nodata_mask, dist_func))
+
+
+@pytest.mark.parametrize('shape', [(40, 53)])
+def test_nearest_index_geodesic(nodata_mask):
+    coords = (np.linspace(60.0, 59.0, nodata_mask.shape[0]), np.linspace(-100.0, -98.0, nodata_mask.shape[1]))
+    dist_func = _get_chord_func(*coords)
+
+    rows, cols = nearest_index(nodata_mask, 'geodesic', coords=coords)
+
+    np.testing.assert_allclose(assigned_dist(nodata_mask, dist_func, rows, cols),
+                               brute_force_dist(nodata_mask, dist_func))
+
+
+def test_grow_boundary():
+    boundary = np.full((5, 5), np.nan, dtype=np.float32)
+    boundary[0, 0], boundary[4, 4] = 1.0, 2.0
+
+    res_ar = grow_boundary(boundary, 'euclidean')
+
+    assert res_ar.dtype == boundary.dtype
+    assert res_ar[1, 0] == 1.0
+    assert res_ar[4, 3] == 2.0
+
+
+def test_grow_boundary_bad_metric():
+    with pytest.raises(KeyError):
+        grow_boundary(np.ones((3, 3), dtype=np.float32), 'notAMetric')
+
+
+def test_grow_boundary_empty():
+    with pytest.raises(AssertionError):
+        grow_boundary(np.full((3, 3), np.nan, dtype=np.float32), 'euclidean')
+
+
+@pytest.mark.parametrize('shape', [(40, 53)])
+@pytest.mark.parametrize('grow_metric, cell_size', [
+    ('euclidean', (2.0, 1.0)),
+    ('manhattan', (1.0, 1.0)),
+    ('maximum', (1.0, 3.0)),
+    ])
+def test_boundary_index(nodata_mask, grow_metric, cell_size):
+    """KD-tree queries on a window match the full-grid transform"""
+    bnd = BoundaryCells.from_mask(~nodata_mask, np.arange(nodata_mask.size, dtype=np.float32).reshape(nodata_mask.shape))
+    dist_func = _get_grid_func(grow_metric, *cell_size)
+
+    rows, cols = np.nonzero(np.ones((10, 12), dtype=bool))
+    rows, cols = rows + 20, cols + 30
+
+    pos = BoundaryIndex(bnd, grow_metric, cell_size=cell_size).query(rows, cols, batch_size=7)
+
+    np.testing.assert_allclose(dist_func(rows, cols, bnd.rows[pos], bnd.cols[pos]),
+                               brute_force_dist(nodata_mask, dist_func)[rows, cols])
+
+
+@pytest.mark.parametrize('shape', [(40, 53)])
+@pytest.mark.parametrize('grow_metric', ['euclidean', 'maximum'])
+def test_grow_cells(nodata_mask, grow_metric):
+    """KD-tree and dense transform allocate equally near boundary cells"""
+    bnd = BoundaryCells.from_mask(~nodata_mask, np.zeros(nodata_mask.shape, dtype=np.float32))
+    bnd.values = bnd.lin.astype(np.float32)  #value encodes the position
+    rng = np.random.default_rng(seed=11)
+    rows, cols = np.nonzero(rng.random(nodata_mask.shape) > 0.9)
+    dist_func = _get_grid_func(grow_metric, 1.0, 1.0)
+
+    dist_d = dict()
+    for method in ['kdtree', 'transform']:
+        v_ar = grow_cells(bnd, rows, cols, grow_metric, method=method).astype(np.int64)
+        dist_d[method] = dist_func(rows, cols, v_ar // nodata_mask.shape[1], v_ar % nodata_mask.shape[1])
+
+    np.testing.assert_allclose(dist_d['kdtree'], dist_d['transform'])
+
+
+@pytest.mark.parametrize('kind', ['valley', 'floodplain', 'coastal'])
+@pytest.mark.parametrize('grow_tol', [0.0, 0.1])
+@pytest.mark.parametrize('cell_size', [(1.0, 1.0), (2.0, 1.0)])
+def test_boundary_index_coarse(kind, grow_tol, cell_size):
+    """coarse-to-fine allocation is within the tolerance of the exact allocation"""
+    from fwdet.boundary import mask_edge
+    from fwdet.synthetic import make_scenario
+    d = make_scenario((150, 170), kind=kind, seed=4, noise=0.0)
+    #gentle shore (runs of equal values resolve blocks at grow_tol=0)
+    bnd = BoundaryCells.from_mask(mask_edge(d['inun_mask'], side='inner'), np.round(d['dem'] * 0.1, 1))
+    rows, cols = np.nonzero(d['inun_mask'])
+
+    bnd_idx = BoundaryIndex(bnd, 'euclidean', cell_size=cell_size)
+    exact_ar = bnd_idx.allocate(rows, cols)
+    res_ar = bnd_idx.allocate(rows, cols, block=16, tol=grow_tol)
+
+    assert np.abs(res_ar - exact_ar).max() <= grow_tol + 1e-6
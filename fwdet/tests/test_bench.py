@@ -0,0 +1,36 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+smoke tests for the benchmark suite
+'''
+
+
+from fwdet import bench
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+def test_run_suite(tmp_path):
+    ofp = str(tmp_path / 'bench.jsonl')
+    rec_l = bench.run_suite(ofp=ofp, sizes=(400, 1600), cases=(), numIterations_l=(0, 2), slopeTH_l=(0.0,),
+                            grow_metric_l=('euclidean',), isolate=False)
+
+    assert bench.load(ofp) == rec_l
+    stages = {rec['stage'] for rec in rec_l}
+    assert {'generate', 'sample', 'grow', 'depth', 'total'} <= stages
+    assert all(rec['ncells'] in (400, 1600) for rec in rec_l)
+
+    #scaling per stage
+    scaling_d = bench.get_scaling(rec_l)
+    assert (2, 0.0, 'euclidean', 'smooth_1') in scaling_d
+
+    #same commit
+    commit = rec_l[0]['commit']
+    for base, new, ratio in bench.compare(rec_l, commit, commit).values():
+        assert ratio == 1.0
+
+    assert all(0.0 < rec['hit_rate'] <= 1.0 for rec in rec_l)
@@ -0,0 +1,134 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the sparse boundary stages (against the dense focal filters)
+'''
+
+
+import pytest
+import numpy as np
+
+from fwdet import boundary, focal
+from fwdet.focal import binary_dilate, binary_erode
+from fwdet.boundary import BoundaryCells
+
+
+#===============================================================================
+# FIXTURES------------
+#===============================================================================
+
+@pytest.fixture(scope='module')
+def dem_ar():
+    rng = np.random.default_rng(seed=3)
+    ar = rng.uniform(-2.0, 10.0, size=(30, 40)).astype(np.float32)
+    ar[5, 5:9] = np.nan
+    return ar
+
+
+@pytest.fixture(scope='module')
+def line_mask(dem_ar):
+    rng = np.random.default_rng(seed=4)
+    mask = rng.random(dem_ar.shape) > 0.7
+    mask[0, :] = True  #edge cells
+    return mask
+
+
+@pytest.fixture(scope='module')
+def bnd(line_mask, dem_ar):
+    return BoundaryCells.from_mask(line_mask, dem_ar)
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+def test_to_dense(bnd, line_mask, dem_ar):
+    np.testing.assert_array_equal(bnd.to_dense(), np.where(line_mask, dem_ar, np.nan))
+
+
+@pytest.mark.parametrize('numIterations', [1, 3])
+def test_smooth(bnd, line_mask, dem_ar, numIterations):
+    chk_ar = focal.smooth_masked(np.where(line_mask, dem_ar, np.nan), line_mask, numIterations, size=5)
+
+    np.testing.assert_allclose(boundary.smooth(bnd, numIterations, size=5).to_dense(), chk_ar, rtol=1e-5)
+
+
+def test_focal_min(bnd, dem_ar):
+    chk_ar = focal.focal_min(dem_ar, size=5, circular=True)
+
+    np.testing.assert_array_equal(boundary.focal_min(dem_ar, bnd, size=5), chk_ar[bnd.rows, bnd.cols])
+
+
+def test_focal_min_grass_disk(bnd, dem_ar):
+    """circular minimum over the 13-cell disk of r.neighbors -c size=5 (NoData ignored)"""
+    disk = np.array([[0, 0, 1, 0, 0],
+                     [0, 1, 1, 1, 0],
+                     [1, 1, 1, 1, 1],
+                     [0, 1, 1, 1, 0],
+                     [0, 0, 1, 0, 0]], dtype=bool)
+    dem_pad = np.pad(dem_ar, 2, constant_values=np.nan)
+    nrows, ncols = dem_ar.shape
+    with np.errstate(all='ignore'):
+        chk_ar = np.fmin.reduce([dem_pad[dy:dy + nrows, dx:dx + ncols] for dy, dx in zip(*np.nonzero(disk))])
+
+    np.testing.assert_array_equal(focal.focal_filter(dem_ar, method='minimum', size=5, circular=True), chk_ar)
+    np.testing.assert_array_equal(boundary.focal_min(dem_ar, bnd, size=5), chk_ar[bnd.rows, bnd.cols])
+
+
+@pytest.mark.parametrize('method', ['average', 'minimum', 'maximum'])
+@pytest.mark.parametrize('circular', [False, True])
+def test_focal_threads(dem_ar, method, circular, monkeypatch):
+    """row bands on a thread pool match the single pass"""
+    monkeypatch.setattr(focal, 'band_rows_min', 4)
+    chk_ar = focal.focal_filter(dem_ar, method=method, size=5, circular=circular, threads=1)
+
+    np.testing.assert_allclose(focal.focal_filter(dem_ar, method=method, size=5, circular=circular, threads=3),
+                               chk_ar, rtol=1e-5)
+
+
+@pytest.mark.parametrize('cell_size', [(1.0, 2.0), (1.0, np.linspace(1.0, 2.0, 30))])
+def test_slope_percent(bnd, dem_ar, cell_size):
+    chk_ar = focal.slope_percent(dem_ar, cell_size)
+
+    np.testing.assert_allclose(boundary.slope_percent(dem_ar, bnd, cell_size), chk_ar[bnd.rows, bnd.cols],
+                               rtol=1e-6)
+
+
+def test_neighbour_table(bnd):
+    nbr_ar = boundary.neighbour_table(bnd, [(0, 0), (0, 1)])
+
+    #self
+    np.testing.assert_array_equal(nbr_ar[0], np.arange(len(bnd)))
+
+    #right neighbour
+    found = nbr_ar[1] >= 0
+    np.testing.assert_array_equal(bnd.cols[nbr_ar[1][found]], bnd.cols[found] + 1)
+
+
+@pytest.mark.parametrize('shape', [(7, 13), (20, 16), (5, 1)])
+@pytest.mark.parametrize('connectivity', [4, 8])
+def test_binary_morph(shape, connectivity):
+    """bit-packed dilation/erosion match scipy.ndimage"""
+    from scipy import ndimage
+    mask = np.random.default_rng(seed=6).random(shape) > 0.6
+    struct = ndimage.generate_binary_structure(2, {4: 1, 8: 2}[connectivity])
+
+    np.testing.assert_array_equal(binary_dilate(mask, connectivity), ndimage.binary_dilation(mask, struct))
+    np.testing.assert_array_equal(binary_erode(mask, connectivity), ndimage.binary_erosion(mask, struct))
+
+
+@pytest.mark.parametrize('side', ['outer', 'inner'])
+def test_mask_edge(side):
+    inun_mask = np.zeros((7, 9), dtype=bool)
+    inun_mask[2:5, 3:7] = True
+
+    edge_mask = boundary.mask_edge(inun_mask, side=side, connectivity=4)
+
+    if side == 'outer':
+        assert edge_mask.sum() == 2 * (3 + 4)  #no corners w/ 4 neighbours
+        assert not np.any(edge_mask & inun_mask)
+    else:
+        assert edge_mask.sum() == 3 * 4 - 2  #all but the 1x2 interior
+        assert np.all(inun_mask[edge_mask])
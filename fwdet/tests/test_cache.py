@@ -0,0 +1,116 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the on-disk cache of DEM derivatives
+'''
+
+
+import os, time
+import pytest
+import numpy as np
+
+from fwdet.cache import DiskCache
+
+
+#===============================================================================
+# FIXTURES------------
+#===============================================================================
+
+@pytest.fixture(scope='function')
+def cache(tmp_path):
+    return DiskCache(str(tmp_path / 'cache'), max_bytes=3 * (800 + 128))
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+def test_get_or_compute(cache):
+    calls = list()
+
+    def func():
+        calls.append(1)
+        return np.arange(100, dtype=np.float64).reshape(10, 10)
+
+    key = cache.make_key(dem='abc', product='slope', cell_size=np.array([1.0, 2.0]))
+    for i in range(2):
+        ar = cache.get_or_compute(key, func)
+
+    assert len(calls) == 1
+    assert isinstance(ar, np.memmap)
+    np.testing.assert_array_equal(ar[2:4, 5], [25.0, 35.0])  #windowed read
+
+
+def test_evict_lru(cache):
+    for i in range(4):
+        cache.put(str(i), np.zeros(100))
+        os.utime(cache._get_fp(str(i)), ns=(i * 10 ** 9, i * 10 ** 9))
+
+        if i == 2:
+            cache.get('0')  #touch: '1' is now the oldest
+
+    assert cache.size() <= cache.max_bytes
+    assert cache.get('1') is None
+    assert not cache.get('0') is None
+
+
+def test_file_hash(cache, tmp_path):
+    fp = str(tmp_path / 'dem.bin')
+    with open(fp, 'wb') as f:
+        f.write(b'abc')
+
+    h1 = cache.file_hash(fp)
+    assert cache.file_hash(fp) == h1  #memoized
+
+    time.sleep(0.01)
+    with open(fp, 'wb') as f:
+        f.write(b'abd')
+    assert cache.file_hash(fp) != h1
+
+
+def test_file_hash_vrt(cache, tmp_path):
+    """a VRT hash changes with its sources"""
+    src_fp = str(tmp_path / 'tile.bin')
+    with open(src_fp, 'wb') as f:
+        f.write(b'abc')
+
+    fp = str(tmp_path / 'mosaic.vrt')
+    with open(fp, 'w') as f:
+        f.write('<VRTDataset><VRTRasterBand><SimpleSource>'
+                '<SourceFilename relativeToVRT="1">tile.bin</SourceFilename>'
+                '</SimpleSource></VRTRasterBand></VRTDataset>')
+
+    h1 = cache.file_hash(fp)
+    assert cache.file_hash(fp) == h1
+
+    time.sleep(0.01)
+    with open(src_fp, 'wb') as f:
+        f.write(b'abd')
+    assert cache.file_hash(fp) != h1
+
+
+def test_evict_hash_memos(tmp_path):
+    """hash memos count against the budget"""
+    cache = DiskCache(str(tmp_path / 'cache'), max_bytes=3 * 64)
+    for i in range(10):
+        fp = str(tmp_path / f'{i}.bin')
+        with open(fp, 'wb') as f:
+            f.write(bytes([i]))
+        cache.file_hash(fp)
+
+    assert 0 < cache.size() <= cache.max_bytes
+
+
+def test_dem_products_cache(cache):
+    from fwdet.batch import DemProducts
+    dem_ar = np.random.default_rng(seed=7).uniform(-1.0, 5.0, size=(12, 15)).astype(np.float32)
+
+    prod1 = DemProducts(dem_ar, cache=cache, dem_key='dem1')
+    chk_ar = prod1.slope_ar
+
+    #new process: read back from disk
+    prod2 = DemProducts(dem_ar * 0.0, cache=cache, dem_key='dem1')
+    np.testing.assert_array_equal(prod2.slope_ar, chk_ar)
+    np.testing.assert_array_equal(prod2.dem_min_ar, prod1.dem_min_ar)
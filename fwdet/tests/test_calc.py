@@ -0,0 +1,62 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the fused raster calculator
+'''
+
+
+import pytest
+import numpy as np
+
+from fwdet.calc import Calc
+
+
+#===============================================================================
+# FIXTURES------------
+#===============================================================================
+
+@pytest.fixture(scope='module')
+def input_d():
+    rng = np.random.default_rng(seed=5)
+    alloc_ar = rng.uniform(0.0, 5.0, size=(25, 30)).astype(np.float32)
+    dem_ar = rng.uniform(0.0, 5.0, size=(25, 30)).astype(np.float32)
+    dem_ar[3, 4] = np.nan
+    inun_ar = np.where(rng.random((25, 30)) > 0.5, 1.0, np.nan).astype(np.float32)  #NODATA=0
+    return {'alloc': alloc_ar, 'dem': dem_ar, 'inun': inun_ar}
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+@pytest.mark.parametrize('chunk_rows', [1, 7, 100])
+def test_depth_chain(input_d, chunk_rows):
+    """fused depth stage matches the gdal:rastercalculator chain"""
+    calc = Calc([('diff', 'alloc - dem', -9999),
+                 ('water_depth', 'diff * (diff > 0) * (inun == 1)', 0)])
+
+    res_d = calc.run(input_d, ['water_depth'], chunk_rows=chunk_rows)
+
+    #only the requested output
+    assert list(res_d.keys()) == ['water_depth']
+
+    diff_ar = input_d['alloc'] - input_d['dem']
+    with np.errstate(invalid='ignore'):
+        chk_ar = np.where((diff_ar > 0) & (input_d['inun'] == 1), diff_ar, np.nan)
+
+    np.testing.assert_allclose(res_d['water_depth'], chk_ar, rtol=1e-6)
+
+
+def test_nodata_propagation():
+    """NoData of any referenced input is NoData (even under a comparison)"""
+    res_d = Calc([('res', '(B > 0)*A')]).run({'A': np.array([[1.0, 2.0]]), 'B': np.array([[np.nan, 1.0]])}, ['res'])
+
+    np.testing.assert_array_equal(res_d['res'], [[np.nan, 2.0]])
+
+
+@pytest.mark.parametrize('formula', ['A + C', 'A.__class__', '__import__("os")'])
+def test_bad_formula(formula):
+    with pytest.raises(KeyError):
+        Calc([('res', formula)]).run({'A': np.ones((2, 2))}, ['res'])
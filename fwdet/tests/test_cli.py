@@ -0,0 +1,78 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the command line runner (argument handling and exit codes)
+'''
+
+
+import os, subprocess, sys
+import pytest
+
+from fwdet import cli, __version__
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+def test_version(capsys):
+    assert cli.main(['--version']) == 0
+    assert capsys.readouterr().out.strip() == __version__
+
+
+def test_bad_args():
+    with pytest.raises(SystemExit) as e:
+        cli.main(['run', '--dem', 'dem.tif'])  #no extent
+    assert e.value.code == 2
+
+
+def test_failed_job(tmp_path):
+    """missing inputs give a non-zero exit code"""
+    assert cli.main(['run', '--dem', 'dem.tif', '--extent', str(tmp_path / 'none' / '*.geojson'), '-q']) == 1
+
+
+def test_read_manifest(tmp_path):
+    fp = str(tmp_path / 'jobs.csv')
+    with open(fp, 'w') as f:
+        f.write('dem,extent,iterations,slope\n')
+        f.write('dem.tif,a.geojson,3,\n')
+        f.write('/data/dem.tif,b.geojson,,1.5\n')
+
+    defaults = cli.get_parser().parse_args(['run', '--manifest', fp])
+    jobs = cli.read_manifest(fp, defaults)
+
+    assert [job.extent for job in jobs] == [str(tmp_path / 'a.geojson'), str(tmp_path / 'b.geojson')]
+    assert jobs[0].dem == str(tmp_path / 'dem.tif') and jobs[1].dem == '/data/dem.tif'
+    assert (jobs[0].iterations, jobs[0].slope) == (3, defaults.slope)
+    assert (jobs[1].iterations, jobs[1].slope) == (defaults.iterations, 1.5)
+
+
+@pytest.mark.parametrize('opts', [['--report', 'report.json'], ['--memmap'], ['--mem-limit', '1e9']])
+def test_batch_single_run_opts(tmp_path, opts):
+    """single run options are rejected for batches (not silently ignored)"""
+    with pytest.raises(SystemExit) as e:
+        cli.main(['run', '--dem', 'dem.tif', '--extent', str(tmp_path / '*.geojson')] + opts)
+    assert e.value.code == 2
+
+
+def test_read_manifest_batch(tmp_path):
+    fp = str(tmp_path / 'jobs.jsonl')
+    with open(fp, 'w') as f:
+        f.write('{"dem": "dem.tif", "extent": "events/*.geojson", "cache_dir": "cache", "max_workers": 2, '
+                '"outputs": ["water_depth", "boundary"]}\n')
+        f.write('{"dem": "dem.tif", "extent": "a.geojson", "outputs": "water_depth_filtered"}\n')
+
+    defaults = cli.get_parser().parse_args(['run', '--manifest', fp])
+    jobs = cli.read_manifest(fp, defaults)
+
+    assert (jobs[0].cache_dir, jobs[0].max_workers) == (str(tmp_path / 'cache'), 2)
+    assert jobs[0].outputs == ['water_depth', 'boundary'] and jobs[1].outputs == ['water_depth_filtered']
+    assert (jobs[1].cache_dir, jobs[1].max_workers) == (None, None)
+
+
+def test_module_entry():
+    src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    res = subprocess.run([sys.executable, '-m', 'fwdet', 'run', '--help'], cwd=src_dir, capture_output=True)
+    assert res.returncode == 0 and b'--extent' in res.stdout
@@ -0,0 +1,116 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for least-cost allocation
+'''
+
+
+import heapq, math
+import pytest
+import numpy as np
+
+from fwdet.cost import cost_allocation, coastal_cost
+
+
+#===============================================================================
+# helpers
+#===============================================================================
+
+def brute_force_cost(cost_ar, sources):
+    """accumulated cost from the nearest source (simple heapq Dijkstra)"""
+    nrows, ncols = cost_ar.shape
+    acc_ar = np.full(cost_ar.shape, np.inf)
+    heap = [(0.0, r, c) for r, c in sources]
+    for _, r, c in heap:
+        acc_ar[r, c] = 0.0
+
+    while heap:
+        d, r, c = heapq.heappop(heap)
+        if d > acc_ar[r, c]:
+            continue
+        for oy in (-1, 0, 1):
+            for ox in (-1, 0, 1):
+                r1, c1 = r + oy, c + ox
+                if (oy == 0 and ox == 0) or not (0 <= r1 < nrows and 0 <= c1 < ncols):
+                    continue
+                if np.isnan(cost_ar[r1, c1]) or np.isnan(cost_ar[r, c]):
+                    continue
+                d1 = d + 0.5 * (cost_ar[r, c] + cost_ar[r1, c1]) * math.hypot(oy, ox)
+                if d1 < acc_ar[r1, c1]:
+                    acc_ar[r1, c1] = d1
+                    heapq.heappush(heap, (d1, r1, c1))
+    return acc_ar
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_cost_allocation_random(seed):
+    rng = np.random.default_rng(seed=seed)
+    cost_ar = rng.uniform(1.0, 10.0, size=(15, 18))
+    cost_ar[rng.random(cost_ar.shape) > 0.9] = np.nan  #barriers
+
+    boundary = np.full(cost_ar.shape, np.nan)
+    src_r, src_c = rng.integers(0, 15, size=6), rng.integers(0, 18, size=6)
+    boundary[src_r, src_c] = np.arange(6, dtype=float)
+
+    alloc_ar = cost_allocation(boundary, cost_ar=cost_ar)
+
+    #each allocated value comes from a source with the least accumulated cost
+    acc_d = {v: brute_force_cost(cost_ar, [(r, c)]) for r, c, v in zip(src_r, src_c, boundary[src_r, src_c])}
+    best_ar = np.min(np.stack(list(acc_d.values())), axis=0)
+
+    for (r, c), v in np.ndenumerate(alloc_ar):
+        if np.isnan(v):
+            assert np.isinf(best_ar[r, c])
+        else:
+            assert acc_d[v][r, c] == pytest.approx(best_ar[r, c])
+
+
+def test_cost_allocation_zero_cost():
+    """zero cost cells are passable. only NoData is a barrier"""
+    cost_ar = np.array([[1.0, 0.0, 0.0, np.nan, 0.0, 1.0]])
+    boundary = np.array([[2.0, np.nan, np.nan, np.nan, np.nan, np.nan]])
+
+    alloc_ar = cost_allocation(boundary, cost_ar=cost_ar)
+    np.testing.assert_array_equal(alloc_ar, [[2.0, 2.0, 2.0, np.nan, np.nan, np.nan]])
+
+
+@pytest.mark.parametrize('ncols', [1, 7, 30])
+def test_cost_allocation_blocks(ncols, monkeypatch):
+    """the graph built in row blocks matches the one built at once"""
+    from fwdet import cost
+    rng = np.random.default_rng(seed=3)
+    cost_ar = rng.uniform(0.0, 5.0, size=(23, ncols))
+    cost_ar[rng.random(cost_ar.shape) > 0.8] = np.nan
+    boundary = np.where(rng.random(cost_ar.shape) > 0.9, rng.random(cost_ar.shape), np.nan)
+    boundary[0, 0] = 0.5
+
+    chk_ar = cost_allocation(boundary, cost_ar=cost_ar)
+    monkeypatch.setattr(cost, 'edge_block_cells', 2 * ncols)
+    np.testing.assert_array_equal(cost_allocation(boundary, cost_ar=cost_ar), chk_ar)
+
+
+def test_cost_allocation_coastal():
+    """low ground blocks the near boundary cell"""
+    dem_ar = np.full((5, 20), 2.0)
+    dem_ar[:, 3:5] = -1.0  #channel below sea level
+
+    boundary = np.full(dem_ar.shape, np.nan, dtype=np.float32)
+    boundary[2, 0] = 1.5
+    boundary[2, 19] = 3.5
+
+    alloc_ar = cost_allocation(boundary, dem_ar=dem_ar)
+
+    assert alloc_ar.dtype == np.float32
+    assert alloc_ar[2, 1] == pytest.approx(1.5)  #float values carried directly
+    assert alloc_ar[2, 6] == pytest.approx(3.5)  #euclidean would pick 1.5
+
+
+def test_coastal_cost():
+    res_ar = coastal_cost(np.array([-1.0, 0.0, 1.0, np.nan]))
+    np.testing.assert_array_equal(res_ar, [1000.0, 1000.0, 1.0, np.nan])
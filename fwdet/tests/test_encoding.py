@@ -0,0 +1,81 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the quantized storage and compact index dtypes
+'''
+
+
+import pytest
+import numpy as np
+
+from fwdet.encoding import quantize, dequantize, get_nodata, get_index_dtype, nonzero
+from fwdet.engine import get_cog_kwargs, OUTPUT_WSH, OUTPUT_SHORE
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+@pytest.mark.parametrize('scale', [0.01, 0.001])
+def test_quantize_roundtrip(scale):
+    rng = np.random.default_rng(3)
+    ar = rng.uniform(0.0, 50.0, size=(40, 30)).astype(np.float32)
+    ar[rng.random(ar.shape) < 0.2] = np.nan
+
+    q_ar, nodata = quantize(ar, scale=scale)
+    assert q_ar.dtype == np.uint16 and nodata == get_nodata(np.uint16)
+
+    res_ar = dequantize(q_ar, scale=scale, nodata=nodata)
+    assert res_ar.dtype == np.float32
+    np.testing.assert_array_equal(np.isnan(res_ar), np.isnan(ar))
+
+    #within half a step (values past the range are clipped)
+    valid = ~np.isnan(ar) & (ar < (nodata - 1) * scale)
+    assert np.abs(res_ar[valid] - ar[valid]).max() <= scale / 2 + 1e-4
+
+
+def test_quantize_clip():
+    q_ar, nodata = quantize(np.array([-1.0, 1e6, np.nan]), scale=0.01)
+    assert q_ar.tolist() == [0, nodata - 1, nodata]
+
+
+def test_get_cog_kwargs():
+    cog_kwargs = dict(codec='ZSTD', quantize=0.01)
+    assert get_cog_kwargs(cog_kwargs, OUTPUT_WSH) == cog_kwargs
+    assert get_cog_kwargs(cog_kwargs, OUTPUT_SHORE) == dict(codec='ZSTD')  #elevations
+    assert get_cog_kwargs(None, OUTPUT_WSH) is None
+
+
+def test_get_cog_kwargs_boundary():
+    cog_kwargs = dict(codec='ZSTD', quantize=0.01, quantize_boundary=0.001, boundary_offset=-10.0)
+    assert get_cog_kwargs(cog_kwargs, OUTPUT_WSH) == dict(codec='ZSTD', quantize=0.01)
+    assert get_cog_kwargs(cog_kwargs, OUTPUT_SHORE) == dict(codec='ZSTD', quantize=0.001, quantize_dtype='int32',
+                                                            quantize_offset=-10.0)
+
+
+def test_quantize_elevation_mm():
+    """int32 millimetres w/ a fixed offset (negative elevations included)"""
+    ar = np.array([[-12.3456, 0.0, np.nan], [1234.5678, 8000.0001, 5.0]], dtype=np.float32)
+    q_ar, nodata = quantize(ar, scale=0.001, offset=-100.0, dtype=np.int32)
+    assert q_ar.dtype == np.int32
+
+    res_ar = dequantize(q_ar, scale=0.001, offset=-100.0, nodata=nodata)
+    assert np.array_equal(np.isnan(res_ar), np.isnan(ar))
+    assert np.nanmax(np.abs(res_ar - ar)) <= 0.0005 + np.spacing(np.float32(8000.0))
+
+
+@pytest.mark.parametrize('block_rows', [1, 7, 4096])
+def test_nonzero(block_rows):
+    mask = np.random.default_rng(0).random((53, 41)) < 0.3
+    rows, cols = nonzero(mask, block_rows=block_rows)
+    assert rows.dtype == np.int32 and cols.dtype == np.int32
+
+    rows_chk, cols_chk = np.nonzero(mask)
+    assert np.array_equal(rows, rows_chk) and np.array_equal(cols, cols_chk)
+
+
+def test_get_index_dtype():
+    assert get_index_dtype(2 ** 31 - 1) == np.int32
+    assert get_index_dtype(2 ** 31) == np.int64
@@ -0,0 +1,246 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the in-memory engine (arrays only, no GDAL or QGIS needed)
+'''
+
+
+import pytest
+import numpy as np
+
+from fwdet import engine
+from fwdet.focal import focal_mean, focal_min, slope_percent, get_footprint
+
+
+#===============================================================================
+# FIXTURES------------
+#===============================================================================
+
+@pytest.fixture(scope='function')
+def valley(shape):
+    """simple V-shaped valley flooded to 3.0
+
+    Returns
+    ---------
+    dem_ar, inun_mask, line_mask
+    """
+    nrows, ncols = shape
+    x = np.abs(np.arange(ncols) - ncols // 2).astype(np.float32)
+    dem_ar = np.tile(x * 0.5 + 1.0, (nrows, 1)).astype(np.float32)
+
+    inun_mask = dem_ar < 3.0
+
+    #cells inside the polygon that touch a dry cell
+    dry_near = focal_min(np.where(inun_mask, 1.0, 0.0).astype(np.float32), size=3) == 0
+    line_mask = inun_mask & dry_near
+
+    return dem_ar, inun_mask, line_mask
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+def test_focal_mean_nodata():
+    ar = np.array([[1, np.nan, 3],
+                   [np.nan, np.nan, np.nan],
+                   [np.nan, np.nan, np.nan]], dtype=np.float32)
+
+    res_ar = focal_mean(ar, size=3)
+
+    assert res_ar[0, 1] == pytest.approx(2.0)
+    assert res_ar[1, 0] == pytest.approx(1.0)
+    assert np.isnan(res_ar[2, 2])
+
+
+def test_focal_min_circular():
+    ar = np.zeros((5, 5), dtype=np.float32)
+    ar[0, 0] = -1.0  #corner: outside the circle of the centre cell
+
+    assert focal_min(ar, size=5, circular=True)[2, 2] == 0.0
+    assert focal_min(ar, size=5, circular=False)[2, 2] == -1.0
+
+
+@pytest.mark.parametrize('size, count', [(3, 5), (5, 13), (7, 29)])
+def test_get_footprint_circular(size, count):
+    """same disk as r.neighbors -c (radius size//2)"""
+    footprint = get_footprint(size, circular=True)
+    assert len(footprint) == count
+    assert all(dy ** 2 + dx ** 2 <= (size // 2) ** 2 for dy, dx in footprint)
+    assert len(get_footprint(size)) == size ** 2
+
+
+def test_slope_plane():
+    dem_ar = np.tile(np.arange(6, dtype=np.float32), (5, 1))  #1 unit per cell in x
+
+    slope_ar = slope_percent(dem_ar, (1.0, 2.0))
+
+    assert slope_ar[2, 2] == pytest.approx(50.0)
+    assert np.isnan(slope_ar[0, 0])
+
+
+@pytest.mark.parametrize('shape', [(20, 31)])
+@pytest.mark.parametrize('numIterations', [0, 2])
+@pytest.mark.parametrize('slopeTH', [0, 0.5])
+def test_fwdet_array(valley, numIterations, slopeTH):
+    dem_ar, inun_mask, line_mask = valley
+
+    res_d = engine.fwdet_array(dem_ar, inun_mask, line_mask, numIterations, slopeTH)
+
+    #validate
+    assert set(res_d.keys()) == {engine.OUTPUT_WSH, engine.OUTPUT_WSH_SMOOTH, engine.OUTPUT_SHORE}
+
+    wd_ar = res_d[engine.OUTPUT_WSH]
+    assert np.all(np.isnan(wd_ar[~inun_mask]))
+    assert np.nanmin(wd_ar) > 0
+
+    #deepest in the channel
+    assert np.nanargmax(wd_ar[10]) == dem_ar.shape[1] // 2
+
+    #boundary is a subset of the line
+    assert np.all(np.isnan(res_d[engine.OUTPUT_SHORE][~line_mask]))
+
+
+@pytest.mark.parametrize('shape', [(10, 11)])
+def test_fwdet_array_outputs(valley):
+    dem_ar, inun_mask, line_mask = valley
+
+    res_d = engine.fwdet_array(dem_ar, inun_mask, line_mask, 1, 0.0, outputs=[engine.OUTPUT_WSH])
+
+    assert list(res_d.keys()) == [engine.OUTPUT_WSH]
+
+
+
+@pytest.mark.parametrize('shape', [(10, 11)])
+@pytest.mark.parametrize('grow_metric', ['euclidean', 'manhattan', 'cost'])
+def test_fwdet_array_grow_metric(valley, grow_metric):
+    dem_ar, inun_mask, line_mask = valley
+
+    res_d = engine.fwdet_array(dem_ar, inun_mask, line_mask, 1, 0.0, grow_metric=grow_metric)
+
+    assert np.nanmin(res_d[engine.OUTPUT_WSH]) > 0
+
+
+@pytest.mark.parametrize('kwargs', [dict(grow_metric='cost'), dict(cost_fp='cost.tif')])
+def test_run_algo_tiled_cost(kwargs):
+    """cost allocation is rejected up front by the tiled mode"""
+    with pytest.raises(AssertionError, match='tiled mode'):
+        engine.run_algo('dem.tif', 'inun.geojson', 1, 0.5, mem_limit=1e9, **kwargs)
+
+
+@pytest.mark.parametrize('size', [3, 5, 7])
+def test_focal_mean_sat(size):
+    """summed-area table matches the shifted-copies mean"""
+    from fwdet.focal import _focal_mean_shift
+    rng = np.random.default_rng(seed=1)
+    ar = rng.uniform(100.0, 110.0, size=(30, 25)).astype(np.float32)
+    ar[rng.random(ar.shape) > 0.7] = np.nan
+
+    np.testing.assert_allclose(focal_mean(ar, size=size), _focal_mean_shift(ar, size=size), rtol=1e-6)
+
+
+@pytest.mark.parametrize('numIterations', [0, 1, 3])
+def test_smooth_masked(numIterations):
+    """fused loop matches repeated mean + re-mask"""
+    from fwdet.focal import smooth_masked
+    rng = np.random.default_rng(seed=2)
+    mask = rng.random((30, 25)) > 0.6
+    ar = np.where(mask, rng.uniform(100.0, 110.0, size=mask.shape), np.nan).astype(np.float32)
+    ar[3, :] = np.nan  #NoData on the mask
+
+    chk_ar = ar.copy()
+    for i in range(numIterations):
+        chk_ar = np.where(mask, focal_mean(chk_ar, size=5), np.nan)
+
+    np.testing.assert_allclose(smooth_masked(ar, mask, numIterations, size=5), chk_ar, rtol=1e-6)
+
+
+@pytest.mark.parametrize('shape', [(20, 31)])
+@pytest.mark.parametrize('boundary_mode', ['outer', 'inner'])
+def test_fwdet_array_boundary_mode(valley, boundary_mode):
+    dem_ar, inun_mask, _ = valley
+
+    res_d = engine.fwdet_array(dem_ar, inun_mask, None, 1, 0.0, boundary_mode=boundary_mode, connectivity=4)
+
+    assert np.nanmin(res_d[engine.OUTPUT_WSH]) > 0
+    assert np.all(np.isnan(res_d[engine.OUTPUT_WSH][~inun_mask]))
+
+
+@pytest.mark.parametrize('shape', [(20, 31)])
+@pytest.mark.parametrize('slopeTH', [0, 0.5])
+def test_dem_products(valley, slopeTH):
+    """shared DEM products give the same result as the per-event sparse stages"""
+    from fwdet.batch import DemProducts
+    dem_ar, inun_mask, line_mask = valley
+    prod = DemProducts(dem_ar, slope_cell_size=(1.0, 2.0))
+
+    for numIterations in [0, 2]:  #two events
+        res_d = prod.fwdet_array(inun_mask, line_mask, numIterations, slopeTH)
+        chk_d = engine.fwdet_array(dem_ar, inun_mask, line_mask, numIterations, slopeTH, slope_cell_size=(1.0, 2.0))
+
+        for k, chk_ar in chk_d.items():
+            np.testing.assert_array_equal(res_d[k], chk_ar)
+
+
+@pytest.mark.parametrize('shape', [(20, 31)])
+@pytest.mark.parametrize('output', [engine.OUTPUT_WSH, engine.OUTPUT_WSH_SMOOTH])
+def test_sweep_array(valley, output):
+    """each band matches an independent run"""
+    from fwdet.sweep import sweep_array, get_combos
+    dem_ar, inun_mask, line_mask = valley
+    dem_ar = dem_ar + np.random.default_rng(seed=8).uniform(0.0, 0.5, size=dem_ar.shape).astype(np.float32)
+    combos = get_combos([0, 20.0, 40.0], [0, 1, 3])
+
+    res_ar = sweep_array(dem_ar, inun_mask, line_mask, combos, output=output)
+
+    for band_ar, (slopeTH, numIterations) in zip(res_ar, combos):
+        chk_ar = engine.fwdet_array(dem_ar, inun_mask, line_mask, numIterations, slopeTH, outputs=[output])[output]
+        np.testing.assert_allclose(band_ar, chk_ar, rtol=1e-6)
+
+
+def test_gee_tests():
+    from fwdet.sweep import gee_tests
+    assert len(gee_tests) == 31
+    assert gee_tests['T01'] == (0.5, 1) and gee_tests['T25'] == (2.5, 5)
+    assert gee_tests['T26'] == (0.0, 1) and gee_tests['T31'] == (0.0, 0)
+
+
+@pytest.mark.parametrize('shape', [(10, 11)])
+def test_run_report(valley, tmp_path):
+    import json
+    from fwdet.report import RunReport
+    dem_ar, inun_mask, line_mask = valley
+
+    report = RunReport(case='valley')
+    engine.fwdet_array(dem_ar, inun_mask, line_mask, 2, 1.0, report=report)
+
+    assert [rec['name'] for rec in report.stages] == ['sample', 'smooth_table', 'smooth_1', 'smooth_2',
+                                                      'ocean_filter', 'slope', 'grow', 'depth', 'low_pass']
+    assert report.stages[0]['cells'] == line_mask.sum()
+    assert 'low_pass' in report.summary()
+
+    with open(report.write(str(tmp_path / 'report.json')), 'r') as f:
+        d = json.load(f)
+    assert d['meta'] == {'case': 'valley'} and len(d['stages']) == 9
+    assert all(rec['wall_s'] >= 0.0 for rec in d['stages'])
+
+
+def test_run_report_rss():
+    """peak_rss is the cumulative high-water mark. rss_growth is the stage's own rise"""
+    from fwdet.report import RunReport, get_peak_rss
+    if get_peak_rss() is None:
+        pytest.skip('no resource module')
+
+    report = RunReport()
+    with report.stage('alloc'):
+        ar = np.ones(2 ** 26, dtype=np.uint8)  #64 MB
+    with report.stage('noop'):
+        pass
+    del ar
+
+    alloc, noop = report.stages
+    assert alloc['rss_growth'] >= 0 and noop['rss_growth'] == 0
+    assert noop['peak_rss'] >= alloc['peak_rss']
+    assert 'cum_peak_MB' in report.summary()
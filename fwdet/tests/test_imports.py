@@ -0,0 +1,56 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+cold start: what the engine modules import at module load, and how long it takes
+
+each check runs in a fresh interpreter
+'''
+
+
+import os, subprocess, sys, json
+import pytest
+
+src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+#import time budget (ms) of the fwdet modules on top of NumPy
+import_budget_ms = 150
+
+#never loaded at module level
+heavy_pkgs = ('scipy', 'osgeo', 'qgis', 'PyQt5', 'PyQt6', 'processing')
+
+core_modules = ['fwdet.engine', 'fwdet.batch', 'fwdet.sweep', 'fwdet.tiling', 'fwdet.calc', 'fwdet.parallel',
+                'fwdet.cache', 'fwdet.scratch', 'fwdet.synthetic', 'fwdet.bench']
+
+
+def _run(code):
+    res = subprocess.run([sys.executable, '-c', code], cwd=src_dir, capture_output=True, text=True, check=True)
+    return json.loads(res.stdout)
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+@pytest.mark.parametrize('module', core_modules)
+def test_no_heavy_imports(module):
+    loaded = _run(f'import sys, json, {module}; print(json.dumps(sorted(sys.modules)))')
+    assert [m for m in loaded if m.split('.')[0] in heavy_pkgs] == []
+
+
+def test_cli_no_numpy():
+    """--help and argument errors do not load NumPy"""
+    loaded = _run('import sys, json, fwdet.cli; print(json.dumps(sorted(sys.modules)))')
+    assert not 'numpy' in loaded
+
+
+def test_import_budget():
+    code = ('import time, json, numpy\n'
+            't0 = time.perf_counter()\n'
+            f'import {", ".join(core_modules)}\n'
+            'print(json.dumps((time.perf_counter() - t0) * 1000))')
+
+    #best of a few (the first also pays for the bytecode cache)
+    dt = min(_run(code) for i in range(3))
+    assert dt < import_budget_ms, f'fwdet import took {dt:.1f} ms (budget {import_budget_ms} ms)'
@@ -0,0 +1,49 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the process-pool runners
+'''
+
+
+import os
+import pytest
+import numpy as np
+
+from fwdet.parallel import SharedArrays, attach, sweep_parallel
+from fwdet.sweep import sweep_array, get_combos
+from fwdet.scratch import ScratchStore
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+def test_shared_arrays():
+    ar = np.arange(12, dtype=np.float32).reshape(3, 4)
+    with SharedArrays() as sa:
+        sa.put('ar', ar)
+        res_d = attach(sa.desc_d)
+
+        np.testing.assert_array_equal(res_d['ar'], ar)
+        with pytest.raises(ValueError):
+            res_d['ar'][0, 0] = 1.0  #read-only
+
+
+def test_sweep_parallel(tmp_path):
+    rng = np.random.default_rng(seed=9)
+    x = np.abs(np.arange(31) - 15).astype(np.float32)
+    dem_ar = (np.tile(x * 0.5 + 1.0, (20, 1)) + rng.uniform(0.0, 0.5, size=(20, 31))).astype(np.float32)
+    inun_mask = dem_ar < 3.5
+    line_mask = inun_mask & ~np.roll(inun_mask, 1, axis=1) | inun_mask & ~np.roll(inun_mask, -1, axis=1)
+    combos = get_combos([0, 30.0], [0, 2])
+
+    chk_ar = sweep_array(dem_ar, inun_mask, line_mask, combos)
+
+    #written in place in the store (no copy)
+    with ScratchStore(str(tmp_path)) as scratch:
+        res_ar = sweep_parallel(dem_ar, inun_mask, line_mask, combos, scratch, max_workers=2)
+        assert isinstance(res_ar, np.memmap) and res_ar is scratch['sweep']
+        assert os.path.exists(res_ar.filename)
+        np.testing.assert_array_equal(res_ar, chk_ar)
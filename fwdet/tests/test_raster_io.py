@@ -0,0 +1,104 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the file based paths (requires GDAL)
+'''
+
+
+import pytest
+import numpy as np
+
+gdal = pytest.importorskip('osgeo.gdal')
+
+from fwdet import raster_io, engine
+from fwdet.synthetic import write_scenario
+
+
+#===============================================================================
+# FIXTURES------------
+#===============================================================================
+
+@pytest.fixture(scope='module')
+def scenario_fps(tmp_path_factory):
+    """valley scenario files: the inundation covers a strip of the DEM"""
+    return write_scenario(str(tmp_path_factory.mktemp('valley')), (60, 80), kind='valley', polygons=True)
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+@pytest.mark.parametrize('halo', [0, 3])
+def test_sweep_window(scenario_fps, tmp_path, halo):
+    """the sweep reads the same DEM window as the engine"""
+    from fwdet.sweep import run_sweep
+    dem_fp, inun_fp = scenario_fps['dem'], scenario_fps['polygons']
+
+    ofp_d = engine.run_algo(dem_fp, inun_fp, 1, 0.5, ofp_d={engine.OUTPUT_WSH: str(tmp_path / 'wsh.tif')},
+                            halo=halo)
+    sweep_fp = run_sweep(dem_fp, inun_fp, [(0.5, 1)], str(tmp_path / 'sweep.tif'), halo=halo)[0]
+
+    _, meta_d = raster_io.open_raster(ofp_d[engine.OUTPUT_WSH])
+    _, sweep_meta_d = raster_io.open_raster(sweep_fp)
+    _, dem_meta_d = raster_io.open_raster(dem_fp)
+
+    assert sweep_meta_d['shape'] == meta_d['shape']
+    assert sweep_meta_d['transform'] == pytest.approx(meta_d['transform'])
+    assert meta_d['shape'] == raster_io.get_extent_window(
+        dem_meta_d, raster_io.get_vector_extent(inun_fp), halo=halo)[2:]
+    assert meta_d['shape'][1] < dem_meta_d['shape'][1]  #a window, not the whole DEM
+
+
+def test_run_algo_log_stages(scenario_fps, tmp_path):
+    """stage measurements reach the feedback w/o a report file (as in QGIS)"""
+    msg_l = list()
+
+    class Feedback(engine.LogFeedback):
+        def pushInfo(self, info):
+            msg_l.append(info)
+
+    engine.run_algo(scenario_fps['dem'], scenario_fps['polygons'], 1, 0.5,
+                    ofp_d={engine.OUTPUT_WSH: str(tmp_path / 'wsh.tif')}, log_stages=True, feedback=Feedback())
+    assert any(msg.startswith('    [grow]') for msg in msg_l)
+    assert any(msg.startswith('stage summary') for msg in msg_l)
+
+
+def test_run_algo_decimals(scenario_fps, tmp_path):
+    """the float outputs are rounded as they are written"""
+    ofp_d = engine.run_algo(scenario_fps['dem'], scenario_fps['polygons'], 1, 0.5,
+                            ofp_d={k: str(tmp_path / f'{k}.tif') for k in (engine.OUTPUT_WSH, engine.OUTPUT_SHORE)})
+    for k, ofp in ofp_d.items():
+        ar = raster_io.read_raster(ofp)[0]
+        np.testing.assert_allclose(ar, np.round(ar.astype(np.float64), engine.output_decimals), rtol=1e-6,
+                                   err_msg=k)  #float32 storage
+
+
+@pytest.mark.parametrize('cog_kwargs', [dict(quantize=0.01), dict(decimals=2),
+                                        dict(quantize=0.001, quantize_dtype='int32', quantize_offset=-10.0)])
+def test_to_cog_windowed(scenario_fps, tmp_path, monkeypatch, cog_kwargs):
+    """quantized COGs are encoded one row block at a time (no full-size read)"""
+    fp = scenario_fps['depth']
+    ar, meta_d = raster_io.read_raster(fp)
+
+    nrows_l = list()
+    read_window = raster_io.read_window
+
+    def read_window_log(ds, r0, c0, nrows, ncols, **kwargs):
+        nrows_l.append(nrows)
+        return read_window(ds, r0, c0, nrows, ncols, **kwargs)
+
+    monkeypatch.setattr(raster_io, 'read_block_rows', 16)
+    monkeypatch.setattr(raster_io, 'read_window', read_window_log)
+    monkeypatch.setattr(raster_io, 'read_raster', None)  #fails if called
+
+    ofp = raster_io.to_cog(fp, str(tmp_path / 'depth_cog.tif'), cog_kwargs=cog_kwargs)
+    assert len(nrows_l) > 1 and max(nrows_l) <= 16
+
+    monkeypatch.undo()
+    res_ar, res_meta_d = raster_io.read_raster(ofp)
+    assert res_meta_d['shape'] == meta_d['shape']
+    assert np.array_equal(np.isnan(res_ar), np.isnan(ar))
+    assert np.nanmax(np.abs(res_ar - ar)) <= 0.0051
+    assert not (tmp_path / 'depth_cog.tif.scratch.tif').exists()
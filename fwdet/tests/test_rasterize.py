@@ -0,0 +1,108 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the scanline rasterizer
+'''
+
+
+import pytest
+import numpy as np
+
+from fwdet.rasterize import Edges, rasterize_edges, fill_polygons, burn_lines
+
+
+#===============================================================================
+# FIXTURES------------
+#===============================================================================
+
+@pytest.fixture(scope='module')
+def rings():
+    """polygon w/ a hole + a second (multipart) triangle. (row, col) grid coordinates"""
+    return [
+        (0, [(1.2, 1.3), (1.7, 14.6), (12.4, 15.1), (11.8, 2.2)]),  #exterior
+        (0, [(4.5, 5.5), (8.3, 5.1), (8.6, 10.2), (4.1, 9.7)]),  #hole
+        (1, [(14.0, 3.0), (19.6, 3.4), (17.2, 18.9)]),
+        ]
+
+
+#===============================================================================
+# helpers
+#===============================================================================
+
+def brute_force_inside(rings, shape):
+    """even-odd ray test at every cell centre (union across polygons)"""
+    row_ar, col_ar = np.indices(shape) + 0.5
+    res_d = dict()
+    for poly_id, ring in rings:
+        ring = np.asarray(ring)
+        inside = res_d.get(poly_id, np.zeros(shape, dtype=bool))
+        for (ra, ca), (rb, cb) in zip(ring, np.roll(ring, -1, axis=0)):
+            if ra == rb:
+                continue
+            cross = ((ra <= row_ar) & (row_ar < rb)) | ((rb <= row_ar) & (row_ar < ra))
+            x = ca + (row_ar - ra) * (cb - ca) / (rb - ra)
+            inside ^= cross & (col_ar < x)
+        res_d[poly_id] = inside
+    return np.logical_or.reduce(list(res_d.values()))
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+@pytest.mark.parametrize('shape', [(21, 20), (10, 8)])
+def test_fill_polygons(rings, shape):
+    np.testing.assert_array_equal(fill_polygons(Edges.from_rings(rings), shape), brute_force_inside(rings, shape))
+
+
+def test_fill_polygons_window(rings):
+    """a window of the grid matches the same cells of the full grid"""
+    edges = Edges.from_rings(rings)
+    full_ar = fill_polygons(edges, (21, 20))
+
+    np.testing.assert_array_equal(fill_polygons(edges.shift(5, 7), (9, 6)), full_ar[5:14, 7:13])
+    np.testing.assert_array_equal(fill_polygons(edges, (9, 6), origin=(5, 7)), full_ar[5:14, 7:13])
+    np.testing.assert_array_equal(fill_polygons(edges, (4, 5), origin=(-2, -3))[2:, 3:], full_ar[:2, :2])
+
+
+def test_burn_lines_window(rings):
+    edges = Edges.from_rings(rings)
+    full_ar = np.zeros((21, 20), dtype=bool)
+    full_ar[burn_lines(edges, full_ar.shape)] = True
+
+    res_ar = np.zeros((9, 6), dtype=bool)
+    res_ar[burn_lines(edges, res_ar.shape, origin=(5, 7))] = True
+    np.testing.assert_array_equal(res_ar, full_ar[5:14, 7:13])
+
+
+def test_rasterize_edges(rings):
+    inun_mask, rows, cols = rasterize_edges(Edges.from_rings(rings), (21, 20))
+
+    #sorted and unique
+    assert np.all(np.diff(rows.astype(np.int64) * 20 + cols) > 0)
+
+    #every vertex cell is on the boundary
+    lin = set((rows.astype(np.int64) * 20 + cols).tolist())
+    for _, ring in rings:
+        for r, c in ring:
+            assert int(r) * 20 + int(c) in lin
+
+    #boundary cells are near the rings
+    pts = np.column_stack([rows, cols]) + 0.5
+    dist = np.full(len(pts), np.inf)
+    for _, ring in rings:
+        ring = np.asarray(ring)
+        for a, b in zip(ring, np.roll(ring, -1, axis=0)):
+            t = np.clip(((pts - a) @ (b - a)) / ((b - a) @ (b - a)), 0, 1)
+            dist = np.minimum(dist, np.linalg.norm(pts - (a + t[:, None] * (b - a)), axis=1))
+    assert dist.max() <= np.sqrt(2)
+
+    assert inun_mask.dtype == bool
+
+
+def test_rasterize_edges_empty():
+    inun_mask, rows, cols = rasterize_edges(Edges.from_rings([]), (3, 4))
+
+    assert not inun_mask.any() and len(rows) == 0
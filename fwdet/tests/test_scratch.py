@@ -0,0 +1,58 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the memory-mapped scratch store
+'''
+
+
+import os
+import numpy as np
+
+from fwdet.scratch import ScratchStore
+from fwdet.sweep import sweep_array
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+def test_scratch_store(tmp_path):
+    with ScratchStore(str(tmp_path)) as scratch:
+        run_dir = scratch.run_dir
+        assert os.path.dirname(run_dir) == str(tmp_path)
+
+        ar = scratch.empty('a', (10, 20), fill=np.nan)
+        assert isinstance(ar, np.memmap) and np.isnan(ar).all()
+
+        #zero-copy
+        ar[2, 3] = 1.0
+        assert np.shares_memory(scratch['a'], ar)
+
+        scratch.put('b', np.arange(6, dtype=np.int32))
+        assert scratch.nbytes() == 10 * 20 * 4 + 6 * 4
+
+        scratch.release('b')
+        assert not 'b' in scratch
+        assert len(os.listdir(run_dir)) == 1
+
+        assert not os.path.exists(scratch.path())
+
+    assert scratch.closed
+    assert not os.path.exists(run_dir)
+
+
+def test_sweep_scratch(tmp_path):
+    """stack allocated in the store matches the in-memory stack"""
+    rng = np.random.default_rng(seed=5)
+    dem_ar = rng.uniform(0.0, 5.0, size=(20, 25)).astype(np.float32)
+    inun_mask = np.zeros(dem_ar.shape, dtype=bool)
+    inun_mask[4:15, 5:20] = True
+    combos = [(0.0, 1), (1.0, 2)]
+
+    chk_ar = sweep_array(dem_ar, inun_mask, None, combos, boundary_mode='inner')
+    with ScratchStore(str(tmp_path)) as scratch:
+        res_ar = sweep_array(dem_ar, inun_mask, None, combos, boundary_mode='inner', scratch=scratch)
+        assert isinstance(res_ar, np.memmap)
+        np.testing.assert_array_equal(res_ar, chk_ar)
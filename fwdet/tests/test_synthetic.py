@@ -0,0 +1,51 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the synthetic flood scenarios
+'''
+
+
+import pytest
+import numpy as np
+
+from fwdet import engine
+from fwdet.synthetic import make_scenario, score, kinds
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+@pytest.mark.parametrize('kind', kinds)
+def test_make_scenario(kind):
+    shape = (60, 80)
+    d = make_scenario(shape, kind=kind, seed=2)
+
+    assert d['dem'].shape == shape and d['dem'].dtype == np.float32
+    assert d['inun_mask'].any() and not d['inun_mask'].all()
+    assert np.all(d['depth'][d['inun_mask']] > 0)
+    assert np.isnan(d['depth'][~d['inun_mask']]).all()
+    if kind == 'coastal':
+        assert (d['dem'] < 0).any()
+
+    #any row block matches the full grid
+    block_d = make_scenario(shape, kind=kind, seed=2, r0=17, nrows=9)
+    for k, ar in block_d.items():
+        np.testing.assert_array_equal(ar, d[k][17:26])
+
+
+@pytest.mark.parametrize('kind', ['valley', 'floodplain'])
+def test_score(kind):
+    """FwDET recovers the known water surface within a tolerance"""
+    d = make_scenario((100, 150), kind=kind, seed=1)
+    res_ar = engine.fwdet_array(d['dem'], d['inun_mask'], None, 2, 0.0, boundary_mode='inner',
+                                outputs=[engine.OUTPUT_WSH])[engine.OUTPUT_WSH]
+
+    score_d = score(res_ar, d['depth'])
+    assert score_d['false_rate'] == 0.0
+    assert score_d['hit_rate'] > 0.6
+    assert score_d['mae'] < 0.5
+
+    assert score(d['depth'], d['depth'])['rmse'] == 0.0
@@ -0,0 +1,80 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+tests for the tiled (out-of-core) helpers
+'''
+
+
+import pytest
+import numpy as np
+
+from fwdet import boundary, engine, allocation
+from fwdet.rasterize import Edges, fill_polygons, rasterize_edges
+from fwdet.synthetic import make_scenario
+from fwdet.tiling import iter_tiles, get_tile_size, _get_edge_cells, fwdet_tiled_array
+
+
+#===============================================================================
+# TESTS-------------
+#===============================================================================
+
+@pytest.mark.parametrize('shape, tile_size', [((10, 11), 4), ((8, 8), 8), ((3, 50), 16)])
+def test_iter_tiles(shape, tile_size):
+    """tiles cover the grid exactly once"""
+    cnt_ar = np.zeros(shape, dtype=int)
+    for r0, c0, nrows, ncols in iter_tiles(shape, tile_size):
+        assert nrows <= tile_size and ncols <= tile_size
+        cnt_ar[r0:r0 + nrows, c0:c0 + ncols] += 1
+
+    assert np.all(cnt_ar == 1)
+
+
+def test_get_tile_size():
+    assert get_tile_size(2 ** 30) > get_tile_size(2 ** 20) >= 64
+
+
+@pytest.mark.parametrize('side', ['outer', 'inner'])
+def test_get_edge_cells(side):
+    """tile edges match the edge of the full mask (polygon extends past the grid)"""
+    shape, halo, tile_size = (20, 23), 2, 6
+    edges = Edges.from_rings([(0, [(-3.0, 4.2), (12.5, -2.0), (17.3, 15.1), (6.1, 30.0)])])
+    chk_ar = boundary.mask_edge(fill_polygons(edges, shape), side=side)
+
+    res_ar = np.zeros(shape, dtype=bool)
+    for r0, c0, nrows, ncols in iter_tiles(shape, tile_size):
+        rows, cols = _get_edge_cells(edges, shape, r0 - halo, c0 - halo, nrows + 2 * halo, ncols + 2 * halo,
+                                     halo, side, 8)
+        res_ar[rows + r0 - halo, cols + c0 - halo] = True
+
+    np.testing.assert_array_equal(res_ar, chk_ar)
+
+
+@pytest.mark.parametrize('kind', ['valley', 'coastal'])
+@pytest.mark.parametrize('boundary_mode', ['polyline', 'outer'])
+@pytest.mark.parametrize('numIterations, slopeTH', [(0, 0.0), (3, 0.5)])
+def test_fwdet_tiled_array(kind, boundary_mode, numIterations, slopeTH, monkeypatch):
+    """tiles (global smoothing, filter halos, low-pass halo across the seams) match the in-memory engine"""
+    shape, tile_size = (70, 90), 16
+    dem_ar = make_scenario(shape, kind=kind, seed=1)['dem']
+
+    #polygon crossing the grid edges and several tiles (w/ a hole)
+    edges = Edges.from_rings([
+        (0, [(-2.0, 25.5), (20.3, 30.1), (45.7, 22.4), (73.0, 28.0), (73.0, 62.2), (40.1, 66.6), (-2.0, 58.3)]),
+        (0, [(30.2, 40.5), (38.6, 41.2), (35.4, 49.9)]),
+        (1, [(50.5, 70.2), (60.1, 75.4), (55.3, 93.0)]),
+        ])
+    inun_mask, rows, cols = rasterize_edges(edges, shape)
+    line_mask = np.zeros(shape, dtype=bool)
+    line_mask[rows, cols] = True
+
+    #same nearest-neighbour search (tie-breaking) as the tiles
+    monkeypatch.setattr(allocation, 'kdtree_max_frac', np.inf)
+    chk_d = engine.fwdet_array(dem_ar, inun_mask, line_mask, numIterations, slopeTH, boundary_mode=boundary_mode)
+    res_d = fwdet_tiled_array(dem_ar, edges, numIterations, slopeTH, tile_size, boundary_mode=boundary_mode)
+
+    assert len(list(iter_tiles(shape, tile_size))) > 16
+    for k, chk_ar in chk_d.items():
+        assert not np.isnan(chk_ar).all(), k
+        np.testing.assert_allclose(res_d[k], chk_ar, rtol=0, atol=1e-6, equal_nan=True, err_msg=k)
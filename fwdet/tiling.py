@@ -0,0 +1,356 @@
+'''
+Created on Oct. 16, 2026
+
+@author: cefect
+
+out-of-core tiled execution for DEMs larger than RAM
+
+the DEM is streamed in windows (tiles + halo) in two passes:
+    1) boundary: sample the shore cells of each tile and flag the ocean/slope
+        filters (halo sized for the focal kernels). the boundary is O(perimeter)
+        so it is smoothed globally once all tiles are read
+    2) depths: allocate each tile's inundated cells from a global boundary index
+        (KD-tree), subtract the DEM, low-pass filter and write the tile
+peak memory is set by the tile size (see get_tile_size) plus the boundary.
+
+both passes read the DEM through a window reader (r0, c0, nrows, ncols) ->
+float32 array (np.nan off the grid): a GDAL dataset in run_tiled, an array in
+fwdet_tiled_array (same result as the in-memory engine)
+'''
+
+import numpy as np
+
+from . import boundary
+from .boundary import BoundaryCells
+from .allocation import BoundaryIndex
+from .focal import focal_mean
+from .rasterize import fill_polygons, burn_lines
+
+#approximate bytes per tile cell held at once (DEM, masks, allocation, depths, filter)
+_bytes_per_cell = 64
+
+
+def get_tile_size(mem_limit, halo=2):
+    """square tile size (cells) that keeps one tile under mem_limit (bytes)"""
+    return max(int(np.sqrt(mem_limit / _bytes_per_cell)) - 2 * halo, 64)
+
+
+def iter_tiles(shape, tile_size):
+    """(r0, c0, nrows, ncols) of each tile (row-major)"""
+    nrows, ncols = shape
+    for r0 in range(0, nrows, tile_size):
+        for c0 in range(0, ncols, tile_size):
+            yield r0, c0, min(tile_size, nrows - r0), min(tile_size, ncols - c0)
+
+
+def run_tiled(dem_fp, inun_fp, numIterations, slopeTH, grow_metric='euclidean',
+              ofp_d=None,
+              boundary_mode='polyline',
+              connectivity=8,
+              neighborhood_size=5,
+              mem_limit=2 ** 30,
+              tile_size=None,
+              extent=None,
+              extent_halo=0,
+              grow_block=None,
+              grow_tol=0.0,
+              feedback=None,
+              ):
+    """generate gridded depths tile by tile. see engine.run_algo
+
+    Params
+    ------------
+    boundary_mode: str
+        see boundary.boundary_modes. edge modes are evaluated on haloed windows
+    mem_limit: int
+        memory ceiling (bytes) used to size the tiles
+    tile_size: int, optional
+        tile size (cells). overrides mem_limit
+    extent: tuple, optional
+        only tile the DEM window covering (xmin, xmax, ymin, ymax) padded by
+        extent_halo cells (a virtual window. see raster_io.open_window)
+    grow_block, grow_tol: optional
+        coarse-to-fine allocation. see engine.fwdet_array
+
+    Returns
+    -----------
+    dict
+        {output name: filepath}
+    """
+    from . import raster_io
+    from .engine import LogFeedback, OUTPUT_WSH, output_decimals
+    if feedback is None: feedback = LogFeedback()
+    if ofp_d is None: ofp_d = {OUTPUT_WSH: 'water_depth.tif'}
+
+    assert grow_metric != 'cost', 'cost allocation is not tile-correct... use the in-memory engine'
+
+    ds, meta_d = raster_io.open_window(dem_fp, extent=extent, halo=extent_halo)
+    read = lambda r0, c0, nrows, ncols: raster_io.read_window(ds, r0, c0, nrows, ncols)
+    if tile_size is None:
+        tile_size = get_tile_size(mem_limit, halo=max(neighborhood_size // 2, 1))
+
+    feedback.pushInfo(f'tiled run on {meta_d["shape"]} grid w/ tile_size={tile_size}')
+
+    #polygon rings (read once, rasterized per window)
+    edges = raster_io.read_edges(inun_fp, meta_d)
+
+    #===========================================================================
+    # boundary (pass 1)
+    #===========================================================================
+    bnd = CalculateBoundary_tiled(read, meta_d['shape'], edges, numIterations, slopeTH, tile_size,
+                                  cell_size=raster_io.get_cell_size(meta_d, ground=True),
+                                  boundary_mode=boundary_mode, connectivity=connectivity,
+                                  neighborhood_size=neighborhood_size, feedback=feedback)
+
+    #===========================================================================
+    # global boundary index
+    #===========================================================================
+    feedback.pushInfo(f'indexing {len(bnd)} boundary cells w/ {grow_metric}')
+    bnd_idx = BoundaryIndex(bnd, grow_metric=grow_metric,
+                            cell_size=raster_io.get_cell_size(meta_d),
+                            coords=raster_io.get_cell_coords(meta_d) if raster_io.is_geographic(meta_d) else None,
+                            feedback=feedback)
+
+    #===========================================================================
+    # depths (pass 2)
+    #===========================================================================
+    ods_d = {k: raster_io.create_raster(ofp, meta_d) for k, ofp in ofp_d.items()}
+
+    for r0, c0, res_d in iter_depth_tiles(read, meta_d['shape'], edges, bnd, bnd_idx, tile_size,
+                                          outputs=ofp_d.keys(), grow_block=grow_block, grow_tol=grow_tol):
+        for k, ar in res_d.items():
+            raster_io.write_window(ods_d[k], ar, r0, c0, decimals=output_decimals)
+
+    for k, ods in ods_d.items():
+        ods.FlushCache()
+        feedback.pushInfo(f'wrote {k} to {ofp_d[k]}')
+    ods_d, ds = None, None
+
+    return dict(ofp_d)
+
+
+def fwdet_tiled_array(dem_ar, edges, numIterations, slopeTH, tile_size,
+                      grow_metric='euclidean',
+                      boundary_mode='polyline',
+                      connectivity=8,
+                      neighborhood_size=5,
+                      slope_cell_size=(1.0, 1.0),
+                      grow_cell_size=(1.0, 1.0),
+                      grow_block=None,
+                      grow_tol=0.0,
+                      outputs=None,
+                      feedback=None,
+                      ):
+    """run_tiled on arrays (tiles read from dem_ar. outputs assembled in memory)
+
+    Params
+    ------------
+    edges: rasterize.Edges
+        inundation polygon rings in grid coordinates
+
+    Returns
+    -----------
+    dict
+        {output name: np.ndarray}. see engine.fwdet_array
+    """
+    from .engine import LogFeedback, OUTPUT_WSH, OUTPUT_WSH_SMOOTH, OUTPUT_SHORE
+    if feedback is None: feedback = LogFeedback()
+    if outputs is None: outputs = (OUTPUT_WSH, OUTPUT_WSH_SMOOTH, OUTPUT_SHORE)
+
+    read = lambda r0, c0, nrows, ncols: _read_array_window(dem_ar, r0, c0, nrows, ncols)
+
+    bnd = CalculateBoundary_tiled(read, dem_ar.shape, edges, numIterations, slopeTH, tile_size,
+                                  cell_size=slope_cell_size,
+                                  boundary_mode=boundary_mode, connectivity=connectivity,
+                                  neighborhood_size=neighborhood_size, feedback=feedback)
+    bnd_idx = BoundaryIndex(bnd, grow_metric=grow_metric, cell_size=grow_cell_size, feedback=feedback)
+
+    res_d = {k: np.full(dem_ar.shape, np.nan, dtype=np.float32) for k in outputs}
+    for r0, c0, tile_d in iter_depth_tiles(read, dem_ar.shape, edges, bnd, bnd_idx, tile_size,
+                                           outputs=outputs, grow_block=grow_block, grow_tol=grow_tol):
+        for k, ar in tile_d.items():
+            res_d[k][r0:r0 + ar.shape[0], c0:c0 + ar.shape[1]] = ar
+    return res_d
+
+
+def iter_depth_tiles(read, shape, edges, bnd, bnd_idx, tile_size,
+                     outputs=None,
+                     grow_block=None,
+                     grow_tol=0.0,
+                     ):
+    """depths of each tile (pass 2)
+
+    Params
+    ---------
+    read: callable
+        window reader (r0, c0, nrows, ncols) -> float32 DEM (np.nan off the grid)
+    bnd: BoundaryCells
+        global boundary (see CalculateBoundary_tiled)
+    bnd_idx: allocation.BoundaryIndex
+        index of bnd
+
+    Yields
+    ---------
+    r0, c0: int
+        top-left cell of the tile
+    dict
+        {output name: np.ndarray} of the tile
+    """
+    from .engine import OUTPUT_WSH, OUTPUT_WSH_SMOOTH, OUTPUT_SHORE
+    if outputs is None: outputs = (OUTPUT_WSH,)
+
+    #boundary cells grouped by tile for the shore output
+    get_tile_id = lambda r, c: (r // tile_size).astype(np.int64) * (shape[1] // tile_size + 1) + c // tile_size
+    bnd_tile = get_tile_id(bnd.rows, bnd.cols)
+    order = np.argsort(bnd_tile, kind='stable')
+    bnd, bnd_tile = bnd.subset(order), bnd_tile[order]
+
+    for r0, c0, nrows, ncols in iter_tiles(shape, tile_size):
+        #1 cell halo for the low-pass filter
+        wr0, wc0, wnrows, wncols = r0 - 1, c0 - 1, nrows + 2, ncols + 2
+        core = (slice(1, 1 + nrows), slice(1, 1 + ncols))
+
+        dem_ar = read(wr0, wc0, wnrows, wncols)
+        inun_mask = fill_polygons(edges, (wnrows, wncols), origin=(wr0, wc0))
+
+        #allocate and subtract on the inundated cells only
+        rows, cols = np.nonzero(inun_mask & ~np.isnan(dem_ar))
+        wd_ar = np.full(dem_ar.shape, np.nan, dtype=np.float32)
+        if len(rows) > 0:
+            diff_ar = bnd_idx.allocate(rows + wr0, cols + wc0, block=grow_block, tol=grow_tol) - dem_ar[rows, cols]
+            with np.errstate(invalid='ignore'):
+                wd_ar[rows, cols] = np.where(diff_ar > 0, diff_ar, np.nan)
+
+        res_d = dict()
+        if OUTPUT_WSH in outputs:
+            res_d[OUTPUT_WSH] = wd_ar[core]
+
+        if OUTPUT_WSH_SMOOTH in outputs:
+            wd_smooth = np.where(np.isnan(wd_ar), np.nan, focal_mean(wd_ar, size=3))
+            res_d[OUTPUT_WSH_SMOOTH] = wd_smooth[core]
+
+        if OUTPUT_SHORE in outputs:
+            tile_id = get_tile_id(np.array([r0]), np.array([c0]))
+            bnd_i = bnd.subset(slice(*np.searchsorted(bnd_tile, [tile_id[0], tile_id[0] + 1])))
+            shore_ar = np.full((nrows, ncols), np.nan, dtype=np.float32)
+            shore_ar[bnd_i.rows - r0, bnd_i.cols - c0] = bnd_i.values
+            res_d[OUTPUT_SHORE] = shore_ar
+
+        yield r0, c0, res_d
+
+
+def _read_array_window(ar, r0, c0, nrows, ncols):
+    """window of an array (np.nan off the grid). see raster_io.read_window"""
+    res_ar = np.full((nrows, ncols), np.nan, dtype=np.float32)
+    rr0, cc0 = max(r0, 0), max(c0, 0)
+    rr1, cc1 = min(r0 + nrows, ar.shape[0]), min(c0 + ncols, ar.shape[1])
+    if rr1 > rr0 and cc1 > cc0:
+        res_ar[rr0 - r0:rr1 - r0, cc0 - c0:cc1 - c0] = ar[rr0:rr1, cc0:cc1]
+    return res_ar
+
+
+def CalculateBoundary_tiled(read, shape, edges, numIterations, slopeTH, tile_size,
+                            cell_size=(1.0, 1.0),
+                            boundary_mode='polyline',
+                            connectivity=8,
+                            neighborhood_size=5,
+                            feedback=None,
+                            ):
+    """build, smooth, and filter the shore/boundary cells tile by tile
+
+    see engine.CalculateBoundary
+
+    Params
+    ---------
+    read: callable
+        window reader (r0, c0, nrows, ncols) -> float32 DEM (np.nan off the grid)
+    shape: tuple
+        (nrows, ncols) of the grid
+    edges: rasterize.Edges
+        inundation polygon rings on the full grid
+    cell_size: tuple
+        (dy, dx) for the slope filter (dx may be per row. see raster_io.get_cell_size)
+
+    Returns
+    ---------
+    BoundaryCells
+        boundary cells with valid elevations (global grid)
+    """
+    from .engine import LogFeedback
+    if feedback is None: feedback = LogFeedback()
+
+    halo = max(neighborhood_size // 2, 1)
+    dy, dx = cell_size
+    nrows_g = shape[0]
+
+    #===========================================================================
+    # sample and flag each tile
+    #===========================================================================
+    rows_l, cols_l, values_l, keep_l = list(), list(), list(), list()
+    for r0, c0, nrows, ncols in iter_tiles(shape, tile_size):
+        wr0, wc0, wnrows, wncols = r0 - halo, c0 - halo, nrows + 2 * halo, ncols + 2 * halo
+
+        #only the core cells belong to this tile
+        if boundary_mode == 'polyline':
+            rows, cols = burn_lines(edges.subset(edges.shift(r0, c0).overlaps((nrows, ncols))), (nrows, ncols),
+                                    origin=(r0, c0))
+            rows, cols = rows + halo, cols + halo
+        else:
+            rows, cols = _get_edge_cells(edges, shape, wr0, wc0, wnrows, wncols, halo,
+                                         boundary_mode, connectivity)
+        if len(rows) == 0:
+            continue
+
+        dem_ar = read(wr0, wc0, wnrows, wncols)
+        bnd_t = BoundaryCells(rows, cols, dem_ar[rows, cols], dem_ar.shape)
+
+        #ocean filter
+        with np.errstate(invalid='ignore'):
+            keep = boundary.focal_min(dem_ar, bnd_t, size=neighborhood_size, circular=True) > 0
+
+        #slope filter
+        if slopeTH > 0.0:
+            dx_t = dx[np.clip(np.arange(wr0, wr0 + wnrows), 0, nrows_g - 1)] if np.ndim(dx) else dx
+            with np.errstate(invalid='ignore'):
+                keep &= boundary.slope_percent(dem_ar, bnd_t, (dy, dx_t)) > slopeTH
+
+        rows_l.append(bnd_t.rows + wr0)
+        cols_l.append(bnd_t.cols + wc0)
+        values_l.append(bnd_t.values)
+        keep_l.append(keep)
+
+    if len(rows_l) == 0:
+        raise AssertionError('no boundary cells found on the DEM')
+
+    #===========================================================================
+    # global boundary
+    #===========================================================================
+    rows, cols = np.concatenate(rows_l), np.concatenate(cols_l)
+    order = np.lexsort((cols, rows))
+    bnd = BoundaryCells(rows[order], cols[order], np.concatenate(values_l)[order], shape)
+    keep = np.concatenate(keep_l)[order]
+    feedback.pushInfo(f'sampled {len(bnd)} shore line cells from the DEM')
+
+    if numIterations > 0:
+        feedback.pushInfo(f'smoothing shore values w/ {numIterations} iterations')
+        bnd = boundary.smooth(bnd, numIterations, size=neighborhood_size)
+
+    bnd = bnd.subset(keep & ~np.isnan(bnd.values))
+
+    feedback.pushInfo(f'finished constructing shore/boundary w/ {len(bnd)} cells')
+    return bnd
+
+
+def _get_edge_cells(edges, shape, wr0, wc0, wnrows, wncols, halo, side, connectivity):
+    """morphological edge cells in the core of a haloed window (window coordinates)"""
+    inun_mask = fill_polygons(edges, (wnrows, wncols), origin=(wr0, wc0))
+
+    #cells outside the raster are dry (as the in-memory engine)
+    row_ar, col_ar = np.arange(wr0, wr0 + wnrows), np.arange(wc0, wc0 + wncols)
+    inun_mask &= ((row_ar >= 0) & (row_ar < shape[0]))[:, None] & ((col_ar >= 0) & (col_ar < shape[1]))[None, :]
+
+    edge_mask = boundary.mask_edge(inun_mask, side=side, connectivity=connectivity)
+    core_mask = np.zeros(edge_mask.shape, dtype=bool)
+    core_mask[halo:wnrows - halo, halo:wncols - halo] = True
+
+    return np.nonzero(edge_mask & core_mask)
@@ -17,7 +17,8 @@ __date__ = 'October 2023'
 __version__ = '2024.05.18'
 
 
-import pprint, os, datetime, tempfile
+import pprint, os, datetime, tempfile, re, shutil, uuid, importlib.util
+from contextlib import contextmanager
 from qgis import processing
 from qgis.PyQt.QtCore import QCoreApplication
 from qgis.core import (QgsProcessing,
@@ -26,6 +27,7 @@ from qgis.core import (QgsProcessing,
                        QgsProcessingAlgorithm,
                        QgsProcessingParameterRasterLayer,
                        QgsProcessingParameterRasterDestination,
+                       QgsProcessingParameterFileDestination,
                        QgsProcessingParameterVectorLayer,
                        QgsProcessingParameterNumber,
                        QgsProcessingParameterString,
@@ -42,7 +44,30 @@ from qgis.core import (QgsProcessing,
 
 from qgis.analysis import QgsNativeAlgorithms, QgsRasterCalculatorEntry, QgsRasterCalculator
 
+"""in-memory engine (./fwdet). only available when the repo is on the path
+when loaded as a toolbox script, falls back to the processing.run chain"""
+try:
+    from fwdet import calc as fwdet_calc #NumPy + GDAL only
+    from fwdet import focal as fwdet_focal
+    from fwdet import raster_io as fwdet_raster_io
+except ImportError:
+    fwdet_calc, fwdet_focal, fwdet_raster_io = None, None, None
+
+try:
+    #scipy is not shipped with every QGIS install. only check it is there (loaded when the engine needs it)
+    if importlib.util.find_spec('scipy') is None:
+        raise ImportError('scipy not installed')
+    from fwdet import engine as fwdet_engine
+except ImportError:
+    fwdet_engine = None
+
 #import pandas as pd
+#volume for the intermediates of a run (removed at the end of the run). defaults to the system temp
+scratch_dir_default = os.environ.get('FWDET_SCRATCH', None)
+
+#algorithms w/ vector outputs
+vector_algos = ('native:savefeatures', 'native:polygonstolines', 'native:fixgeometries')
+
 descriptions_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'descriptions')
 
  
@@ -54,19 +79,24 @@ class FwDET(QgsProcessingAlgorithm):
     #input layers
     INPUT_DEM = 'INPUT_DEM'
     INUN_VLAY = 'INUN_VLAY'
+    COST_RASTER = 'COST_RASTER'
     
     #input parameters
     numIterations = 'numIterations' #number of smoothing iterations
     slopeTH = 'slopeTH' #filtering slope threshold
     grow_metric='grow_metric'
+    boundary_mode='boundary_mode'
  
     #outputs
     OUTPUT_WSH = 'water_depth'
     OUTPUT_WSH_SMOOTH = 'water_depth_filtered'
     OUTPUT_SHORE='boundary'
+    REPORT='report' #JSON run report (engine only)
  
     #options
-    grow_metric_d = {'euclidean': 0,'squared': 1,'maximum': 2,'manhattan': 3,'geodesic': 4}
+    grow_metric_d = {'euclidean': 0,'squared': 1,'maximum': 2,'manhattan': 3,'geodesic': 4,
+                     'cost':None, #least-cost allocation (engine only)
+                     }
  
     def tr(self, string):
         """
@@ -166,13 +196,24 @@ class FwDET(QgsProcessingAlgorithm):
         self.addParameter(param)
  
  
-        param = QgsProcessingParameterString(self.grow_metric, 'r.grow.distance metric', defaultValue='euclidean', optional=False)
+        param = QgsProcessingParameterString(self.grow_metric, 'r.grow.distance metric (or \'cost\')', defaultValue='euclidean', optional=False)
         
         param.setMetadata( {'widget_wrapper':
                   { 'value_hints': list(self.grow_metric_d.keys()) }
                 })
         
         self.addParameter(param)
+        
+        self.addParameter(
+            QgsProcessingParameterRasterLayer(self.COST_RASTER, self.tr('Cost Raster (for metric=cost)'), optional=True)
+        )
+        
+        param = QgsProcessingParameterString(self.boundary_mode, 'Boundary mode (polyline, or outer/inner mask edge)', 
+                                             defaultValue='polyline', optional=True)
+        param.setMetadata( {'widget_wrapper':
+                  { 'value_hints': ['polyline', 'outer', 'inner'] }
+                })
+        self.addParameter(param)
  
         #=======================================================================
         # OUTPUTS------
@@ -194,6 +235,12 @@ class FwDET(QgsProcessingAlgorithm):
                                                     optional=True)
         )
         
+        self.addParameter(
+            QgsProcessingParameterFileDestination(self.REPORT, self.tr('Run Report (per-stage time and memory)'),
+                                                  fileFilter='JSON files (*.json)', optional=True, 
+                                                  createByDefault=False)
+        )
+        
         
         
         
@@ -202,7 +249,23 @@ class FwDET(QgsProcessingAlgorithm):
         self.proc_kwargs = dict(feedback=feedback, context=context, is_child_algorithm=True)
         self.context, self.feedback, self.params = context, feedback, params
         
-        #self.feedback.pushInfo(f'initalized w/ v{__version__}')
+    @contextmanager
+    def _scratch(self):
+        """private directory for the intermediates of a run (removed on exit)
+        
+        nested calls share the outer directory (e.g., processAlgorithm > run_algo)"""
+        if not getattr(self, 'scratch_dir', None) is None:
+            yield self.scratch_dir
+            return
+        
+        if not scratch_dir_default is None:
+            os.makedirs(scratch_dir_default, exist_ok=True)
+        self.scratch_dir = tempfile.mkdtemp(prefix='fwdet_', dir=scratch_dir_default)
+        try:
+            yield self.scratch_dir
+        finally:
+            scratch_dir, self.scratch_dir = self.scratch_dir, None
+            shutil.rmtree(scratch_dir, ignore_errors=True)
 
     def processAlgorithm(self, params, context, feedback):
         """
@@ -214,7 +277,10 @@ class FwDET(QgsProcessingAlgorithm):
         feedback.pushInfo(f'\n\nv{__version__} starting w/ \n%s\n\n'%(pprint.pformat(params, width=30)))
         
         self._init_algo(params, context, feedback)
+        with self._scratch():
+            return self._processAlgorithm(params, context, feedback)
         
+    def _processAlgorithm(self, params, context, feedback):
         #=======================================================================
         # retrieve inputs---
         #=======================================================================
@@ -231,6 +297,9 @@ class FwDET(QgsProcessingAlgorithm):
  
  
         input_dem = get_rlay(self.INPUT_DEM)
+        
+        #optional (None if not provided)
+        cost_raster = self.parameterAsRasterLayer(params, self.COST_RASTER, context)
  
         #=======================================================================
         # inundation polygon
@@ -267,6 +336,10 @@ class FwDET(QgsProcessingAlgorithm):
         numIterations = self.parameterAsInt(params, self.numIterations,context)
         slopeTH = self.parameterAsDouble(params, self.slopeTH, context)
         grow_metric = self.parameterAsString(params, self.grow_metric, context)
+        boundary_mode = self.parameterAsString(params, self.boundary_mode, context)
+        if boundary_mode=='': boundary_mode='polyline'
+        report_fp = self.parameterAsFileOutput(params, self.REPORT, context)
+        if report_fp=='': report_fp=None
         
  
  
@@ -280,14 +353,24 @@ class FwDET(QgsProcessingAlgorithm):
         #=======================================================================.
  
  
-        return self.run_algo(input_dem, inun_vlay, numIterations, slopeTH, grow_metric)
+        return self.run_algo(input_dem, inun_vlay, numIterations, slopeTH, grow_metric, cost_raster=cost_raster,
+                             boundary_mode=boundary_mode, report_fp=report_fp)
         
 
         
         
-    def run_algo(self, dem_rlay_raw, inun_vlay, numIterations, slopeTH, grow_distance,
-                 #cost_raster=None,
-                 ):
+    def run_algo(self, dem_rlay_raw, inun_vlay, numIterations, slopeTH, grow_distance, **kwargs):
+        """generate gridded depths from inundation polygon (see _run_algo)
+        
+        the intermediates are written to a scratch directory removed on return"""
+        with self._scratch():
+            return self._run_algo(dem_rlay_raw, inun_vlay, numIterations, slopeTH, grow_distance, **kwargs)
+        
+    def _run_algo(self, dem_rlay_raw, inun_vlay, numIterations, slopeTH, grow_distance,
+                  cost_raster=None,
+                  boundary_mode='polyline',
+                  report_fp=None,
+                  ):
         """generate gridded depths from inundation polygon
         FwDET QGIS port from ArcMap script ./FwDET_2p1_Standalone.py
         main steps:
@@ -302,8 +385,17 @@ class FwDET(QgsProcessingAlgorithm):
         Params
         ------------
         cost_raster: QgsRasterLayer, optional
-            cost surface. if not provided, all 1s where DEM>0
-            NOT IMPLEMENTED: see note below
+            cost surface for grow_distance='cost' (least-cost allocation, engine only). 
+            if not provided, the coastal cost surface ((DEM <= 0)*999)+1 is used
+            
+        boundary_mode: str
+            'polyline': cells touched by the polygon rings (default)
+            'outer', 'inner': morphological edge of the rasterized inundation 
+            (engine only. 'outer' matches FwDET2p1_GEE.txt)
+            
+        report_fp: str, optional
+            JSON run report (engine only). the stage measurements are pushed to 
+            the feedback either way
             
         inun_vlay: QgsVectorLayer
             inundation polygon
@@ -329,6 +421,14 @@ class FwDET(QgsProcessingAlgorithm):
         if not inun_vlay.crs()==dem_rlay_raw.crs():
             raise AssertionError(f'crs must match between DEM and inundation polygon')
         
+        #cost allocation
+        if not cost_raster is None:
+            if not cost_raster.crs()==dem_rlay_raw.crs():
+                raise AssertionError(f'crs must match between DEM and cost raster')
+            if not grow_distance=='cost':
+                feedback.pushInfo(f'cost raster provided... switching grow metric from \'{grow_distance}\' to \'cost\'')
+                grow_distance='cost'
+        
         if inun_vlay.crs().isGeographic():
             feedback.pushWarning(f'{inun_vlay.name()}s CRS ({inun_vlay.crs()}) is Geographic. this may lead to unexpected results. consider re-projecting')
             
@@ -338,20 +438,29 @@ class FwDET(QgsProcessingAlgorithm):
                                  '\nthis may lead to unexpected results. \nconsider trimming the inundation polygon')
             
         
+        #=======================================================================
+        # in-memory engine------
+        #=======================================================================
+        #reads the DEM window straight from the source (no clipped copy)
+        if (fwdet_engine is not None) and (grow_distance in fwdet_engine.grow_metrics):
+            return self._run_engine(dem_rlay_raw, inun_vlay, numIterations, slopeTH, grow_distance, 
+                                    cost_raster=cost_raster, boundary_mode=boundary_mode, report_fp=report_fp)
+
         #=======================================================================
         # clip
         #=======================================================================
-        #clip DEM raster
-        #TODO: fix clipping
- 
-        dem_rlay_fp = self._algo('gdal:cliprasterbyextent', 
-                       { 'DATA_TYPE' : 0, 'EXTRA' : '', 
-                        'INPUT' : dem_rlay_raw, 'NODATA' : -9999, 
-                        'OUTPUT' : 'TEMPORARY_OUTPUT', 'OVERCRS' : False, 
-                        'PROJWIN' : get_extent_str(inun_vlay) })['OUTPUT']
-                        
-        dem_rlay = QgsRasterLayer(dem_rlay_fp, 'DEM_clipped')
+        dem_rlay = self._clip_dem(dem_rlay_raw, inun_vlay)
+            
+        if grow_distance=='cost':
+            raise QgsProcessingException(f'cost allocation requires the in-memory engine (./fwdet)')
+        
+        if not boundary_mode=='polyline':
+            raise QgsProcessingException(f'boundary_mode=\'{boundary_mode}\' requires the in-memory engine (./fwdet)')
         
+        if not report_fp is None:
+            feedback.pushWarning(f'run report requires the in-memory engine (./fwdet)... not written')
+
+        feedback.pushInfo(f'engine not available for \'{grow_distance}\'... using processing algorithms')
         #=======================================================================
         # shore Line/boundary------
         #=======================================================================
@@ -400,14 +509,9 @@ class FwDET(QgsProcessingAlgorithm):
         #=======================================================================
         feedback.pushInfo(f'computing water_depths on DEM\n\n')
         
-        #compute difference
-        diff_rlay = self._gdal_calc({'FORMULA':'A - B', 
-                                'INPUT_A':cost_alloc, 'BAND_A':1, 'INPUT_B':dem_rlay, 'BAND_B':1,
-                                'NO_DATA':-9999,'OUTPUT':'TEMPORARY_OUTPUT', 'RTYPE':5})
-        
-        #rasterize inundation
+        #rasterize inundation (mask: Byte)
         inun_rlay = self._algo('gdal:rasterize', 
-                   { 'BURN' : 1, 'DATA_TYPE' : 5, 
+                   { 'BURN' : 1, 'DATA_TYPE' : 0, 
                     'EXTENT' : get_extent_str(dem_rlay),
                     #'EXTENT':'-80.118404571,-79.972518169,35.048219968,35.201742050 [EPSG:4326]', 
                     'EXTRA' : '', 'FIELD' : '', 'INIT' : None, 
@@ -417,12 +521,12 @@ class FwDET(QgsProcessingAlgorithm):
                     'WIDTH' : dem_rlay.width(),  'HEIGHT' : dem_rlay.height(),}
                    )['OUTPUT']
         
-        #mask negatives and inundation
-        water_depth = self._gdal_calc({'FORMULA':'A * (A > 0) * (B == 1)', 
-                                'INPUT_A':diff_rlay, 'BAND_A':1, 
-                                #'INPUT_B':dem_rlay, 'BAND_B':1,
-                                'INPUT_B':inun_rlay, 'BAND_B':1,
-                                'NO_DATA':0,'OUTPUT':self._get_out(self.OUTPUT_WSH), 'RTYPE':5})
+        #compute difference then mask negatives and inundation (one pass)
+        water_depth = self._calc_fused(
+            [('diff', 'alloc - dem', -9999),
+             ('water_depth', 'diff * (diff > 0) * (inun == 1)', 0)],
+            {'alloc':cost_alloc, 'dem':dem_rlay, 'inun':inun_rlay},
+            {'water_depth':self._get_out(self.OUTPUT_WSH)})['water_depth']
         
  
         res_d[self.OUTPUT_WSH] = water_depth
@@ -443,7 +547,49 @@ class FwDET(QgsProcessingAlgorithm):
  
             
         return res_d
-                            
+
+    def _clip_dem(self, dem_rlay_raw, inun_vlay):
+        """DEM clipped to the inundation extents
+        
+        with fwdet.raster_io, a VRT of the grid-aligned window (no pixels are copied).
+        otherwise a clipped GeoTIFF (gdal:cliprasterbyextent)"""
+        if fwdet_raster_io is not None:
+            ofp = self._tfp(suffix='.vrt')
+            ds, _ = fwdet_raster_io.open_window(dem_rlay_raw.source(), extent=get_extent(inun_vlay), ofp=ofp)
+            ds = None #flush
+            return QgsRasterLayer(ofp, 'DEM_clipped')
+        
+        dem_rlay_fp = self._algo('gdal:cliprasterbyextent', 
+                       { 'DATA_TYPE' : 0, 'EXTRA' : '', 
+                        'INPUT' : dem_rlay_raw, 'NODATA' : -9999, 
+                        'OUTPUT' : 'TEMPORARY_OUTPUT', 'OVERCRS' : False, 
+                        'PROJWIN' : get_extent_str(inun_vlay) })['OUTPUT']
+                        
+        return QgsRasterLayer(dem_rlay_fp, 'DEM_clipped')
+
+    def _run_engine(self, dem_rlay, inun_vlay, numIterations, slopeTH, grow_distance,
+                    cost_raster=None, boundary_mode='polyline', report_fp=None):
+        """run the FwDET pipeline in memory with fwdet.engine
+
+        only the DEM window covering the inundation is read (from the raw DEM)
+        and only the requested outputs are written. the time and memory of each 
+        stage are pushed to the feedback (and written to report_fp)"""
+
+        #requested outputs
+        ofp_d = {attn:self._get_out(attn) for attn in [self.OUTPUT_WSH, self.OUTPUT_WSH_SMOOTH, self.OUTPUT_SHORE]
+                 if attn in self.params}
+
+        self.feedback.pushInfo(f'running in-memory engine on {dem_rlay.source()}\n    {list(ofp_d.keys())}')
+
+        res_d = fwdet_engine.run_algo(dem_rlay.source(), inun_vlay.source(), numIterations, slopeTH,
+                                      grow_metric=grow_distance, ofp_d=ofp_d, feedback=self.feedback,
+                                      cost_fp=None if cost_raster is None else cost_raster.source(),
+                                      boundary_mode=boundary_mode, extent=get_extent(inun_vlay),
+                                      report_fp=report_fp, log_stages=True)
+        if not report_fp is None:
+            res_d[self.REPORT] = report_fp
+        return res_d
+
 
     def CalculateBoundary(self, dem_rlay, inun_vlay, numIterations, slopeTH,
                           neighborhood_size=5,
@@ -471,11 +617,11 @@ class FwDET(QgsProcessingAlgorithm):
         feedback.pushInfo(f'rasterizing inundation boundary\n\n')
         #convert polygons to lines
         polyline = self._algo('native:polygonstolines', 
-                                  {'INPUT':inun_vlay, 'OUTPUT':tfp('.gpkg')})['OUTPUT']
+                                  {'INPUT':inun_vlay, 'OUTPUT':'TEMPORARY_OUTPUT'})['OUTPUT']
                                   
-        #rasterize        
+        #rasterize (mask: Byte)
         raster_polyline = self._algo('gdal:rasterize', 
-                   { 'BURN' : 1, 'DATA_TYPE' : 5, 
+                   { 'BURN' : 1, 'DATA_TYPE' : 0, 
                     'EXTENT' : get_extent_str(dem_rlay),
                     #'EXTENT':'-80.118404571,-79.972518169,35.048219968,35.201742050 [EPSG:4326]', 
                     'EXTRA' : '', 'FIELD' : '', 'INIT' : None, 
@@ -522,10 +668,17 @@ class FwDET(QgsProcessingAlgorithm):
         dem_min_fp = self._r_neighbors(dem_rlay, neighborhood_size=neighborhood_size,
                           circular=True, method='minimum')
         
+        #with fwdet.calc, the last calculation writes the output rounded inline
+        #otherwise rounded in a separate pass (see below)
+        out_d = dict()
+        if not fwdet_calc is None:
+            out_d = {'OUTPUT':self._get_out(self.OUTPUT_SHORE), 'DECIMALS':4}
+        
         #mask out any negatives from the boundary        
         boundary1 = self._gdal_calc({'FORMULA':'A*(B > 0)', 
                                 'INPUT_A':boundary_fp_i, 'BAND_A':1, 'INPUT_B':dem_min_fp, 'BAND_B':1,
-                                'NO_DATA':0.0,'OUTPUT':'TEMPORARY_OUTPUT', 'RTYPE':5})
+                                'NO_DATA':0.0,'OUTPUT':'TEMPORARY_OUTPUT', 'RTYPE':5,
+                                **(out_d if slopeTH<=0.0 else {})})
         
         
  
@@ -560,7 +713,7 @@ class FwDET(QgsProcessingAlgorithm):
             boundary2 = self._gdal_calc({'FORMULA':f'B*(A > {slopeTH})', 
                                 'INPUT_A':slope_fp, 'BAND_A':1, 
                                 'INPUT_B':boundary1, 'BAND_B':1,
-                                'NO_DATA':0.0,'OUTPUT':'TEMPORARY_OUTPUT', 'RTYPE':5})
+                                'NO_DATA':0.0,'OUTPUT':'TEMPORARY_OUTPUT', 'RTYPE':5, **out_d})
             
         else:
             
@@ -571,10 +724,13 @@ class FwDET(QgsProcessingAlgorithm):
         # rounding
         #=======================================================================
         #mostly doing this to get a consistent output name
-        boundary3 = self._algo('native:roundrastervalues', 
-                   { 'BAND' : 1, 'BASE_N' : 10, 'DECIMAL_PLACES' : 4,
-                    'INPUT' : boundary2, 'OUTPUT' : self._get_out(self.OUTPUT_SHORE), 'ROUNDING_DIRECTION' : 1 }
-                   )['OUTPUT']
+        if out_d:
+            boundary3 = boundary2 #already rounded and written
+        else:
+            boundary3 = self._algo('native:roundrastervalues', 
+                       { 'BAND' : 1, 'BASE_N' : 10, 'DECIMAL_PLACES' : 4,
+                        'INPUT' : boundary2, 'OUTPUT' : self._get_out(self.OUTPUT_SHORE), 'ROUNDING_DIRECTION' : 1 }
+                       )['OUTPUT']
             
         feedback.pushInfo(f'finished constructing shore/boundary raster\n    {boundary3} \n\n')
         #assert isinstance(boundary2, QgsRasterLayer)
@@ -598,15 +754,72 @@ class FwDET(QgsProcessingAlgorithm):
         - 4: Int32
         - 5: Float32
         - 6: Float64
+        
+        DECIMALS (fwdet.calc only): round the result as it is written
         """
  
-        ofp =  processing.run('gdal:rastercalculator', pars_d, **self.proc_kwargs)['OUTPUT']
+        if not fwdet_calc is None:
+            #in-process (no subprocess)
+            letters = [k[-1] for k in pars_d.keys() if k.startswith('INPUT_')]
+            return self._calc_fused([('OUTPUT', pars_d['FORMULA'], pars_d.get('NO_DATA', None))],
+                                    {l:pars_d['INPUT_'+l] for l in letters},
+                                    {'OUTPUT':pars_d['OUTPUT']}, decimals=pars_d.get('DECIMALS', None))['OUTPUT']
+        
+        assert not 'DECIMALS' in pars_d, 'DECIMALS requires fwdet.calc'
+ 
+        ofp =  self._algo('gdal:rastercalculator', pars_d)['OUTPUT']
         
         if not os.path.exists(ofp):
             raise QgsProcessingException('gdal:rastercalculator failed to get a result for \n%s'%pars_d['FORMULA'])
         
         return ofp
     
+    def _calc_fused(self, steps, layers_d, outputs_d, decimals=None):
+        """chain of raster calculator steps (see fwdet.calc.Calc)
+        
+        with fwdet.calc, the chain is one chunked in-process pass and only 
+        outputs_d are written. otherwise each step is a gdal:rastercalculator call
+        
+        Params
+        ---------
+        steps: list
+            (name, formula, NO_DATA) evaluated in order. formulas reference 
+            layers_d keys and earlier step names
+        layers_d: dict
+            {name: QgsRasterLayer or filepath}
+        outputs_d: dict
+            {step name: OUTPUT} ('TEMPORARY_OUTPUT' for a temporary file)
+        decimals: int, optional
+            round the outputs as they are written (fwdet.calc only)
+        """
+        if not fwdet_calc is None:
+            fp_d = {k:v.source() if isinstance(v, QgsRasterLayer) else v for k,v in layers_d.items()}
+            ofp_d = {k:self._tfp() if v=='TEMPORARY_OUTPUT' else v for k,v in outputs_d.items()}
+            
+            #intermediates only: uncompressed
+            options = None
+            if all(v=='TEMPORARY_OUTPUT' for v in outputs_d.values()):
+                options = fwdet_raster_io.scratch_options
+            
+            return fwdet_calc.Calc(steps).run_files(fp_d, ofp_d, options=options, decimals=decimals)
+        
+        #one gdal:rastercalculator call per step
+        assert decimals is None, 'decimals requires fwdet.calc'
+        layers_d = layers_d.copy()
+        for name, formula, nodata in steps:
+            refs = [k for k in layers_d.keys() if re.search(r'\b%s\b'%k, formula)]
+            letters = 'ABCDEF'[:len(refs)]
+            
+            pars_d = {'FORMULA':re.sub(r'\b(%s)\b'%'|'.join(refs), lambda m:letters[refs.index(m.group(1))], formula),
+                      'NO_DATA':-9999 if nodata is None else nodata, 'RTYPE':5,
+                      'OUTPUT':outputs_d.get(name, 'TEMPORARY_OUTPUT')}
+            for l, k in zip(letters, refs):
+                pars_d.update({'INPUT_'+l:layers_d[k], 'BAND_'+l:1})
+                
+            layers_d[name] = self._algo('gdal:rastercalculator', pars_d)['OUTPUT']
+            
+        return {k:layers_d[k] for k in outputs_d.keys()}
+    
     def _gdal_calc_mask_apply(self, rlay, mask, OUTPUT='TEMPORARY_OUTPUT'):
         return self._gdal_calc({'FORMULA':'A*B', 
                                 'INPUT_A':rlay, 'BAND_A':1, 'INPUT_B':mask, 'BAND_B':1,
@@ -622,6 +835,20 @@ class FwDET(QgsProcessingAlgorithm):
                      output='TEMPORARY_OUTPUT',
                      circular=False,
                      ):
+        """focal filter (grass7:r.neighbors)
+        
+        with fwdet.focal, runs in-process on a thread pool (no GRASS session)"""
+        if not fwdet_focal is None:
+            fp = input_rlay.source() if isinstance(input_rlay, QgsRasterLayer) else input_rlay
+            ar, meta_d = fwdet_raster_io.read_raster(fp)
+            
+            kwargs = dict()
+            if output=='TEMPORARY_OUTPUT':
+                output, kwargs = self._tfp(), dict(options=fwdet_raster_io.scratch_options)
+                
+            return fwdet_raster_io.write_raster(
+                fwdet_focal.focal_filter(ar, method=method, size=neighborhood_size, circular=circular),
+                output, meta_d, **kwargs)
  
         return self._algo('grass7:r.neighbors', 
                           {'-a':False, '-c':circular, #Use circular neighborhood
@@ -633,7 +860,14 @@ class FwDET(QgsProcessingAlgorithm):
                             'size':neighborhood_size})['output']
     
     def _algo(self, algoName, pars_d):
+        """processing.run w/ TEMPORARY_OUTPUT written to the scratch directory of the run"""
+        suffix = '.gpkg' if algoName in vector_algos else '.tif'
+        pars_d = {k:self._tfp(suffix) if v=='TEMPORARY_OUTPUT' else v for k,v in pars_d.items()}
+        
         return processing.run(algoName, pars_d, **self.proc_kwargs)
+    
+    def _tfp(self, suffix='.tif'):
+        return tfp(suffix=suffix, dir=getattr(self, 'scratch_dir', None))
         
  
 
@@ -648,8 +882,12 @@ class FwDET(QgsProcessingAlgorithm):
 def now():
     return datetime.datetime.now()
 
-def tfp(suffix='.tif'):
-    return tempfile.NamedTemporaryFile(suffix=suffix).name
+def tfp(suffix='.tif', dir=None):
+    """new (not yet created) temporary file path
+    
+    unique name in dir (the run's scratch directory), else in the system temp"""
+    if dir is None: dir = tempfile.gettempdir()
+    return os.path.join(dir, 'fwdet_%s%s'%(uuid.uuid4().hex, suffix))
 
 def get_resolution_ratio( 
                              rlay_s1, #fine
@@ -686,6 +924,12 @@ def assert_extent_equal(left, right, msg='',):
                 left.name(),   right.name(), left.extent(), right.extent()) +msg) 
 
 
+def get_extent(layer):
+    """(xmin, xmax, ymin, ymax) of a layer"""
+    rect = layer.extent()
+    return (rect.xMinimum(), rect.xMaximum(), rect.yMinimum(), rect.yMaximum())
+
+
 def get_extent_str(layer):
     rect = layer.extent()
     return '%.8f,%.8f,%.8f,%.8f [%s]'%(
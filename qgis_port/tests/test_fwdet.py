@@ -5,7 +5,8 @@ Created on Oct. 17, 2023
 '''
 
 
-import pytest, copy, os, gc
+import pytest, copy, os, gc, glob, tempfile
+import numpy as np
 from qgis.core import (
     QgsRasterLayer, QgsProject,
     QgsProcessingOutputLayerDefinition, QgsApplication,
@@ -91,6 +92,28 @@ def test_grass7_provider_available(qgis_app, qgis_processing):
 
  
 
+@pytest.mark.parametrize('caseName',['FtMac'])
+def test_r_neighbors_circular(INPUT_DEM_LAYER, caseName,
+        output_params, context, feedback, qgis_app, qgis_processing):
+    """in-process circular minimum (fwdet.focal) matches grass7:r.neighbors -c (13-cell disk)"""
+    from fwdet import raster_io
+    algo=AlgoClass()
+    algo.initAlgorithm()
+    algo._init_algo(output_params, context, feedback)
+    
+    with algo._scratch():
+        fp = algo._r_neighbors(INPUT_DEM_LAYER, neighborhood_size=5, method='minimum', circular=True)
+        chk_fp = algo._algo('grass7:r.neighbors', 
+                          {'-a':False, '-c':True, 
+                            'GRASS_REGION_CELLSIZE_PARAMETER':0, 'GRASS_REGION_PARAMETER':None, 
+                            'gauss':None, 'input':INPUT_DEM_LAYER, 'method':3, 
+                            'output':'TEMPORARY_OUTPUT', 'selection':None, 'size':5})['output']
+        
+        ar, chk_ar = raster_io.read_raster(fp)[0], raster_io.read_raster(chk_fp)[0]
+    
+    np.testing.assert_allclose(ar, chk_ar, rtol=1e-6, equal_nan=True)
+
+
 @pytest.mark.dev
 @pytest.mark.parametrize('caseName, grow_distance',[
     ('PeeDee','geodesic'),
@@ -124,10 +147,13 @@ def test_runner(
     algo=AlgoClass()
     algo.initAlgorithm()
     algo._init_algo(output_params, context, feedback)
+    scratch_l = glob.glob(os.path.join(tempfile.gettempdir(), 'fwdet_*'))
     res_d = algo.run_algo(INPUT_DEM_LAYER, INUN_LAYER, numIterations, slopeTH, grow_distance)
      
     #validate
     assert isinstance(res_d, dict)
+    assert algo.scratch_dir is None #intermediates removed
+    assert set(glob.glob(os.path.join(tempfile.gettempdir(), 'fwdet_*')))<=set(scratch_l)
     assert set(res_d.keys()).symmetric_difference(output_params.keys())==set()
     
     #todo: add quantiative validation